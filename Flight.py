@@ -1,35 +1,443 @@
-#!/usr/bin/env python
-# coding: utf-8
+#%% Script information
+# Name: Flight.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is running a whole flight as a sequence of phases
+# (stage 1 burn, separation, stage 2 burn, coast) with a single calculation
+# engine.
+#
+# There is no separate code for the powered and the unpowered flight: each
+# phase builds its derivative with dynamics.derivative when it starts, and
+# everything that belongs to the phase (thrust, mass flow, ISP, steering) is
+# bound to it there, once. A coast is just a phase with no mass flow, whose
+# derivative has no thrust term.
+#
+# A phase ends when one of its events with the action 'switch' happens (e.g.
+# the burnout of a stage), when its duration is over or at the end of the
+# flight. An event with the action 'stop' (e.g. the impact) ends the flight.
+# All the phases store their steps in the same buffers (a Trajectory, with
+# the recording policy of choice, and a Dense), which belong to the flight
+# and are allocated once for the whole run.
+#
+# The flight can save snapshots of its whole state (checkpoints) every some
+# seconds of flight time and at the end of each phase, and a new Flight
+# built with the same inputs can go on from any of them (restore). The run
+# goes on exactly as it would have without stopping: the integration is
+# always split at the checkpoints, whether the run is resumed or not.
+#
+#%% Packages
+import os
+import pickle
+import numpy as np
+import fnc as f
+import c
+import engine as e
+import dynamics as d
+import accel as a
+import trajectory as tr
+import vehicle as vh
 
-# In[ ]:
+#%% Phases
 
+class Phase:
+    # The aim of this class is describing a phase of the flight.
+    # === INPUTS ===
+    # name [str]        Name of the phase
+    # m_dot [kg/s]      Mass flow of propellant (0 for a coast)
+    # isp_v [s]         ISP in vacuum
+    # isp_sl [s]        ISP at sea level (isp_v if None)
+    # steer [function]  Steering law (see dynamics.derivative)
+    # mass [kg]         Mass at the start of the phase (None to keep it),
+    #                   e.g. the mass of the upper stages after a separation
+    # duration [s]      Longest duration of the phase (None: no limit)
+    # events [list]     Events of the phase. An item can also be a function
+    #                   of the derivative and the atmosphere of the phase
+    #                   that builds the event (e.g. dynamics.max_q)
+    # cd [adim]         Drag coefficient
+    # area [m^2]        Reference area
+    # length [m]        Reference length of the Reynolds number
+    # aero [Aero]       Database of the aerodynamic coefficients (see
+    #                   aero.py), None for the constant cd and no lift
+    # profile [tuple]   Throttle table of the mass flow (see propulsion.py).
+    #                   Its time starts at the ignition: at the start of the
+    #                   phase, unless the phase before has the same profile
+    #                   (the same burn goes on)
 
-import numpy as np
-import environment
-import vehicle
-
-class flight:
-    
-    def __init__(self, environment, vehicle, """dependecies"""):
-        """
-        posible dependencies:
-        - number of stages
-        - max times of simulation
-        - time steps
-        - 
-        """
-        #variable initialization
-        #introduce time passage function
-        #define how to pass from one stage to the next
-        #set simulation termination events (h=0, t=tmax, etc)
-    
-    def flight_powered:
-        #powered flight calculations
-    
-    def flight_unpowered:
-        #unpowered flight calculations
-        #Is it really necessary? After all, the only difference is that there is no thrust
-        #How can the same "calculation engine" be set so that some aspects (such as thrust) can be determined beforehand?
-        #Idea: set the function with a dependency where this is set
-            #such as: powered=true/false
+    def __init__(self, name, m_dot=0., isp_v=0., isp_sl=None, steer=None,
+                 mass=None, duration=None, events=(), cd=c.Cd, area=c.A_ref,
+                 profile=None, length=c.D_ref, aero=None):
+        self.name = name
+        self.m_dot = m_dot
+        self.isp_v = isp_v
+        self.isp_sl = isp_sl
+        self.steer = steer
+        self.cd = cd
+        self.area = area
+        self.length = length
+        self.aero = aero
+        self.profile = profile
+        self.mass = mass
+        self.duration = duration
+        self.events = list(events)
+
+    def bind(self, atm, degree, t_on=0.):
+        # The aim of this method is to build the derivative, the outputs
+        # and the events of the phase, when the phase starts.
+        # === INPUTS ===
+        # t_on [s]          Time of the ignition (see profile)
+        # === OUTPUTS ===
+        # deriv [function]  Derivative of the state
+        # outputs [function] Outputs of each step (see dynamics.outputs)
+        # events [list]     Events of the phase
+        deriv = d.derivative(self.m_dot, self.isp_v, self.isp_sl, self.cd, self.area,
+                             steer=self.steer, atm=atm, degree=degree,
+                             profile=self.profile, t_on=t_on, aero=self.aero, length=self.length)
+        outputs = d.outputs(self.m_dot, self.isp_v, self.isp_sl, self.cd, area=self.area,
+                            length=self.length, atm=atm, profile=self.profile, t_on=t_on,
+                            aero=self.aero, steer=self.steer)
+        events = [ev if isinstance(ev, e.Event) else ev(deriv, atm)
+                  for ev in self.events]
+        return deriv, outputs, events
+
+# Constants of the vehicle that can be changed in ascent (see
+# vehicle.NAMES)
+ASCENT = ('M_st1_i', 'M_st1_f', 'bt_st1', 'm_dot_st1', 'ISP_st1_SL', 'ISP_st1_V', 't_kick',
+          'M_st2_i', 'M_st2_f', 'bt_st2', 'm_dot_st2', 'ISP_st2_V', 'pitch_st2')
+
+def ascent(v=None, aero=None, **const):
+    # The aim of this function is to build the phases of the flight of a
+    # two stage vehicle: a vertical rise until the pitch kick, the burn of
+    # stage #1 until it runs out of propellant, the separation, the burn of
+    # stage #2 and the coast until the impact. All the constants come from
+    # the vehicle.
+    # === INPUTS ===
+    # v [Vehicle]       Vehicle (vehicle.VEHICLE, the one of c.py, if None)
+    # aero [Aero]       Database of the aerodynamic coefficients (see
+    #                   aero.py), None for the Cd of the vehicle
+    # const             Constants to be changed, e.g. ascent(M_st2_i=1600.)
+    #                   (see ASCENT and vehicle.update). The mass flows are
+    #                   obtained from the masses and burning times given
+    #                   unless they are given too. pitch_st2 [deg] pitches
+    #                   the thrust of stage #2 up from the velocity (0 by
+    #                   default, i.e. the gravity turn goes on)
+    # === OUTPUTS ===
+    # phases [list]
+    for name in const:
+        if name not in ASCENT:
+            raise f.InputError('Fn: ascent. ' + str(name) + ' is not one of ' + ', '.join(ASCENT) + '.')
+    v = vh.update(vh.VEHICLE if v is None else v, **const)
+    if len(v.stages) != 2:
+        raise f.InputError('Fn: ascent. The vehicle must have 2 stages.')
+    st1, st2 = v.stages
+    turn = d.gravity_turn(v.kick, v.azimuth)
+    body = dict(cd=v.Cd, area=v.A_ref, length=v.D_ref, aero=aero)
+    # The rise starts with the mass of the vehicle (its launch mass)
+    return [Phase('rise', st1.m_dot, st1.ISP_V, st1.ISP_SL, steer=d.vertical, mass=st1.M_i,
+                  duration=v.t_kick, profile=st1.profile, **body),
+            Phase('stage 1', st1.m_dot, st1.ISP_V, st1.ISP_SL, steer=turn, profile=st1.profile,
+                  events=[lambda deriv, atm: d.mach_one(atm), d.max_q,
+                          d.depletion(st1.M_f, 'burnout #1')], **body),
+            Phase('separation', mass=st2.M_i, duration=0., **body),
+            Phase('stage 2', st2.m_dot, st2.ISP_V, st2.ISP_SL, profile=st2.profile,
+                  steer=d.pitch_offset(v.pitch) if v.pitch else turn,
+                  events=[d.depletion(st2.M_f, 'burnout #2')], **body),
+            Phase('coast', events=[d.apogee(), d.altitude()], **body)]
+
+#%% Flight
+
+class Flight:
+    # The aim of this class is running the phases of a flight, one after
+    # the other, from the launch pad. The flight can be run at once (run),
+    # up to a given time (advance) or as a stream of blocks (stream).
+    # === INPUTS ===
+    # phases [list]     Phases of the flight, in order (ascent() if None)
+    # t_max [s]         End of the flight, if it was not stopped before
+    # y0 [n_state]      Initial state (on the launch pad, with the mass of
+    #                   the first phase, or of vehicle.VEHICLE if it has
+    #                   none, if None)
+    # method [str]      Integrator, 'rk4' or 'dopri' (see engine.integrate)
+    # dt [s]            Time step (rk4)
+    # rtol, atol        Tolerances (dopri)
+    # atm [function]    Atmosphere (accel.atmosphere if None)
+    # degree [adim]     Highest zonal harmonic of the gravity
+    # policy [str]      Recording policy of the steps (see Trajectory)
+    # every [adim]      N of the policy 'nth'
+    # threshold [dict]  Thresholds of the policy 'threshold'
+    # capacity [adim]   Number of steps the buffers are allocated for
+    # dense [bool]      Keep the interpolants of the steps (they are not
+    #                   needed to find the events)
+    # seed [int]        Seed of the random numbers of the flight (rng)
+    # epoch [days]      Julian date at t = 0 (J2000.0 by default)
+    # checkpoint [str]  Directory of the checkpoints (None for no checkpoints)
+    # interval [s]      Flight time between checkpoints (None: only at the
+    #                   end of each phase)
+    # === ATTRIBUTES ===
+    # out [Trajectory]  Steps of the whole flight
+    # dense [Dense]     Interpolants of the steps (None if not kept)
+    # hits [list]       Events found (engine.Hit)
+    # log [list]        (name, start, end, stats) of each phase run
+    # k [adim]          Index of the current phase
+    # t, y              Current time and state
+    # t_on [s]          Time of the ignition of the current burn
+    # done [bool]       True once the flight is over
+    # rng [Generator]   Random numbers of the flight
+    # saves [adim]      Number of checkpoints saved
+
+    def __init__(self, phases=None, t_max=10000., y0=None, method='dopri',
+                 dt=0.25, rtol=0., atol=(10**-5,)*3 + (10**-7,)*3 + (10**-6,),
+                 atm=None, degree=4, policy='step', every=1, threshold=None,
+                 capacity=4096, dense=True, seed=None, epoch=2451545.,
+                 checkpoint=None, interval=None):
+        self.phases = ascent() if phases is None else list(phases)
+        self.t_max = t_max
+        self.opts = dict(method=method, dt=dt, rtol=rtol, atol=atol)
+        self.atm = a.atmosphere if atm is None else atm
+        self.degree = degree
+        self.out = tr.Trajectory(policy, every, threshold, capacity)
+        self.dense = e.Dense(len(d.STATE), capacity) if dense else None
+        self.hits = []
+        self.log = []
+        self.k = 0
+        self.t = 0.
+        self.t_on = 0.
+        if y0 is None:
+            m0 = self.phases[0].mass
+            y0 = d.launch_state(vh.VEHICLE.stages[0].M_i if m0 is None else m0)
+        self.y = np.array(y0, dtype=float)
+        self.h = None
+        self.done = False
+        self.current = None
+        self.rng = np.random.default_rng(seed)
+        self.epoch = epoch
+        self.checkpoint = checkpoint
+        self.interval = interval
+        self.saves = 0
+        self.next_save = np.inf if checkpoint is None or interval is None else float(interval)
+        if checkpoint is not None:
+            os.makedirs(checkpoint, exist_ok=True)
+
+    def enter(self):
+        # The aim of this method is to start the current phase: the mass is
+        # set, and the derivative, the outputs and the events of the phase
+        # are built, once for the whole phase.
+        phase = self.phases[self.k]
+        if phase.mass is not None:
+            self.y = self.y.copy()
+            self.y[6] = phase.mass
+        end = self.t_max
+        if phase.duration is not None:
+            end = min(end, self.t + phase.duration)
+        if self.k == 0 or phase.profile is None or phase.profile != self.phases[self.k-1].profile:
+            self.t_on = self.t
+        deriv, outputs, events = phase.bind(self.atm, self.degree, self.t_on)
+        self.out.bind(outputs)
+        self.current = {'deriv': deriv, 'events': events, 'start': self.t, 'end': end,
+                        'first': True, 'stats': None}
+
+    def leave(self, stop):
+        # The aim of this method is to end the current phase, after the hit
+        # stop (None if its duration or the flight time is over).
+        phase = self.phases[self.k]
+        self.log.append((phase.name, self.current['start'], self.t, self.current['stats']))
+        self.current = None
+        self.k += 1
+        if (stop is not None and stop.action == 'stop') or self.t >= self.t_max \
+                or self.k == len(self.phases):
+            self.done = True
+
+    def advance(self, t_stop=np.inf, until=None):
+        # The aim of this method is to run the flight from the current time
+        # up to t_stop, going through as many phases as needed. It can be
+        # called again to go on from there.
+        # === INPUTS ===
+        # t_stop [s]        Time to stop at (the end of the flight if inf)
+        # until [str]       Name of a phase to stop at, before it starts
+        # === OUTPUTS ===
+        # self
+        while not self.done:
+            if self.current is None:
+                if self.phases[self.k].name == until:
+                    break
+                self.enter()
+            cur = self.current
+            t_end = min(cur['end'], t_stop, self.next_save)
+            stop = None
+            if t_end > self.t:
+                self.t, self.y, stats = e.integrate(cur['deriv'], self.t, self.y, t_end,
+                                                    self.out, h0=self.h, dense=self.dense,
+                                                    events=cur['events'], start=cur['first'],
+                                                    **self.opts)
+                cur['first'] = False
+                self.h = stats['h']
+                self.hits += stats['hits']
+                for hit in stats['hits']:
+                    self.out.event(hit)
+                if cur['stats'] is None:
+                    cur['stats'] = {'nfev': 0, 'naccept': 0, 'nreject': 0}
+                for key in cur['stats']:
+                    cur['stats'][key] += stats[key]
+                stop = stats['stop']
+            if stop is not None or self.t >= cur['end']:
+                self.leave(stop)
+                if self.checkpoint is not None:
+                    self.save()
+            else:
+                if self.t >= self.next_save:
+                    self.save()
+                if self.t >= t_stop:
+                    break
+        if self.done:
+            self.out.finish()
+        return self
+
+    def run(self):
+        # The aim of this method is to run every phase, until the flight is
+        # stopped by an event or reaches t_max.
+        # === OUTPUTS ===
+        # self
+        return self.advance()
+
+    def stream(self, span=100.):
+        # The aim of this generator is to run the flight in slices of span
+        # seconds, and to give the steps stored in each slice as a block
+        # (see Trajectory.take), so that the whole history is never held in
+        # memory. The slices do not change the steps of rk4 when span is a
+        # multiple of dt (dopri shortens one step at the end of each slice).
+        # The interpolants are kept as usual, so a long flight is streamed
+        # with dense=False.
+        # === INPUTS ===
+        # span [s]          Flight time of each slice
+        # === OUTPUTS ===
+        # block [n_ch x n]  Channels of the steps of a slice, one row per
+        #                   channel (see trajectory.CHANNELS)
+        while not self.done:
+            self.advance(self.t + span)
+            block = self.out.take()
+            if block.shape[1]:
+                yield block
+
+    def tjd(self):
+        # Current time as Julian centuries since J2000.0 (the input of
+        # fnc.tjd2gmst).
+        return f.jd2tjd(self.epoch + self.t/86400, checked=False)
+
+    def snapshot(self):
+        # The aim of this method is to collect the whole state of the
+        # flight: time, state and step of the integrator, current phase,
+        # random numbers, epoch, events, log and the steps buffered in out
+        # and dense. The functions of the phases are not part of it, they
+        # are built again by restore.
+        # === OUTPUTS ===
+        # snap [dict]       State of the flight (can be pickled)
+        cur = self.current
+        out = self.out
+        snap = {'t': self.t, 'y': self.y.copy(), 'h': self.h, 'k': self.k, 'done': self.done,
+                't_on': self.t_on,
+                'current': None if cur is None else
+                           {key: cur[key] for key in ('start', 'end', 'first', 'stats')},
+                'rng': self.rng.bit_generator.state, 'epoch': self.epoch, 'tjd': self.tjd(),
+                'hits': list(self.hits), 'log': list(self.log),
+                'saves': self.saves, 'next_save': self.next_save,
+                'out': {'data': out.data[:,:out.n].copy(), 'calls': out.calls,
+                        'pending': out.pending, 'ref': out.ref},
+                'dense': None}
+        if self.dense is not None:
+            n = self.dense.n
+            snap['dense'] = (self.dense.tdata[:n].copy(), self.dense.hdata[:n].copy(),
+                             self.dense.rdata[:n].copy())
+        return snap
+
+    def restore(self, snap):
+        # The aim of this method is to set the state of the flight to a
+        # snapshot, so that the flight goes on from there. The Flight must
+        # have been built with the same inputs as the one of the snapshot.
+        # === INPUTS ===
+        # snap [dict]       Snapshot (see snapshot and load)
+        # === OUTPUTS ===
+        # self
+        self.t = snap['t']
+        self.t_on = snap['t_on']
+        self.y = snap['y'].copy()
+        self.h = snap['h']
+        self.k = snap['k']
+        self.done = snap['done']
+        self.rng.bit_generator.state = snap['rng']
+        self.epoch = snap['epoch']
+        self.hits = list(snap['hits'])
+        self.log = list(snap['log'])
+        self.saves = snap['saves']
+        self.next_save = snap['next_save']
+        # Buffered output
+        out = self.out
+        data = snap['out']['data']
+        if data.shape[1] > out.data.shape[1]:
+            out.data = np.empty((len(tr.CHANNELS), data.shape[1]))
+        out.data[:,:data.shape[1]] = data
+        out.n = data.shape[1]
+        out.calls = snap['out']['calls']
+        out.pending = snap['out']['pending']
+        out.ref = snap['out']['ref']
+        if self.dense is not None:
+            t0, h, r = snap['dense']
+            self.dense.n = 0
+            for k in range(len(t0)):
+                self.dense.append(t0[k], h[k], r[k])
+        # Functions of the current phase (or of the last one, for the
+        # outputs of a step still pending in out)
+        self.current = None
+        k = self.k if snap['current'] is not None else self.k - 1
+        if 0 <= k < len(self.phases):
+            deriv, outputs, events = self.phases[k].bind(self.atm, self.degree, self.t_on)
+            out.bind(outputs)
+            if snap['current'] is not None:
+                self.current = dict(snap['current'], deriv=deriv, events=events)
+        return self
+
+    def save(self):
+        # The aim of this method is to write a snapshot to the directory of
+        # the checkpoints, as flight_<number>.ckpt. The file is written
+        # under another name first, so that a run killed while writing never
+        # leaves a broken checkpoint.
+        # === OUTPUTS ===
+        # path [str]        Path of the checkpoint
+        self.saves += 1
+        if self.interval is not None:
+            self.next_save = float((np.floor(self.t/self.interval) + 1)*self.interval)
+        path = os.path.join(self.checkpoint, 'flight_%05d.ckpt' % self.saves)
+        with open(path + '.tmp', 'wb') as file:
+            pickle.dump(self.snapshot(), file, pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+        return path
+
+    def hit(self, name):
+        # Time and state of the first event called name (None if not found).
+        for hit in self.hits:
+            if hit.name == name:
+                return hit
+        return None
+
+#%% Checkpoints
+
+def checkpoints(path):
+    # The aim of this function is to list the checkpoints of a directory,
+    # from the first to the last one.
+    # === INPUTS ===
+    # path [str]        Directory of the checkpoints
+    # === OUTPUTS ===
+    # files [list]      Paths of the checkpoints
+    return [os.path.join(path, name) for name in sorted(os.listdir(path))
+            if name.startswith('flight_') and name.endswith('.ckpt')]
 
+def load(path):
+    # The aim of this function is to read a checkpoint.
+    # === INPUTS ===
+    # path [str]        Path of the checkpoint
+    # === OUTPUTS ===
+    # snap [dict]       Snapshot, to be given to Flight.restore
+    if not os.path.isfile(path):
+        raise f.InputError('Fn: load. ' + str(path) + ' is not a checkpoint.')
+    with open(path, 'rb') as file:
+        return pickle.load(file)
@@ -0,0 +1,227 @@
+#%% Script information
+# Name: accel.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is providing fast versions of the scalar functions
+# of fnc.py that the integrator calls at every step: the atmosphere (the
+# full chain table4 - tm - p - rho - Vs - visc - g, fused as in
+# fnc.atmosphere), g, mach, re and the matrices Tge, Tei, Tmv and Tvg.
+#
+# When numba is installed, the functions are compiled to machine code the
+# first time they are called (and, but for atmosphere, cached on disk).
+# Compiled functions can also be called from other compiled functions,
+# such as a compiled derivative for the integrator, without going through
+# Python.
+# When numba is not installed, the functions of this module are the ones
+# of fnc.py in unchecked mode, so the results are the same either way.
+#
+# The backend is chosen when the module is imported, from the environment
+# variable LIA_BACKEND:
+#   auto      numba if it is installed, numpy otherwise (default)
+#   numba     numba, falling back to numpy with a warning if it is missing
+#   numpy     the functions of fnc.py
+# info() reports the backend in use, to be stored with the results of a run.
+#
+# None of these functions validate their inputs.
+#
+#%% Packages
+import os
+import math
+import warnings
+from functools import partial
+import numpy as np
+import fnc as f
+
+#%% Backend
+
+BACKENDS = ('auto', 'numba', 'numpy')
+REQUESTED = os.environ.get('LIA_BACKEND', 'auto').strip().lower()
+if REQUESTED not in BACKENDS:
+    raise f.InputError('Fn: accel. LIA_BACKEND must be one of ' + ', '.join(BACKENDS) + '.')
+numba = None
+if REQUESTED != 'numpy':
+    try:
+        import numba
+    except ImportError:
+        if REQUESTED == 'numba':
+            warnings.warn('accel: numba is not installed, using the numpy backend.')
+BACKEND = 'numpy' if numba is None else 'numba'
+
+def info():
+    # The aim of this function is to describe the backend in use.
+    # === OUTPUTS ===
+    # info [dict]      Backend in use, backend requested and package versions
+    return {'backend': BACKEND, 'requested': REQUESTED, 'numpy': np.__version__,
+            'numba': None if numba is None else numba.__version__}
+
+#%% Constants
+
+# Copies of the constants of fnc.py, as plain floats and float arrays, so
+# that the compiler can embed them in the compiled code.
+ro = float(f.atm_ro)                # [m] - Earth's radius - (Page 4)
+go = float(f.atm_go)                # [m/s^2] - Gravity @ SL (Page 2)
+R = float(f.atm_R)                  # [Nm / (kmol.K)] - Gas constant (Page 2)
+Mo = float(f.atm_Mo)                # [kg/kmol] - Mean Molecular Weight (Page 9)
+gamma = float(f.atm_gamma)          # [adim] - Ratio of Cp/Cv
+beta = float(f.atm_beta)            # [kg/s.m.K^0.5] - Sutherland's "Constant"
+S = float(f.atm_S)                  # [K] - Sutherland's constant
+Hb = f.Hb_layer.astype(float)       # [m'] - Bottom of each layer
+Lm = f.atm_Lm.astype(float)         # [K/m'] - Temperature gradient
+Tmb = f.Tmb_vec.astype(float)       # [K] - Temperature at the bottom
+Pb = f.pb_vec.astype(float)         # [N/m^2] - Pressure at the bottom
+expo = f.atm_expo.astype(float)     # [adim] - Exponent of (33a)
+kiso = f.atm_kiso.astype(float)     # [1/m'] - Coefficient of (33b)
+if BACKEND == 'numba':
+    # Segments of the upper atmosphere (built when the module is imported)
+    (up_Z, up_T, up_lnP, up_lnrho), up_lists, up_inv_dz = f.up_segments()
+    up_n = len(up_Z)
+
+#%% Kernels
+
+# The functions below are written with plain floats and loops so that numba
+# can compile them. They follow fnc.py line by line.
+
+def atmosphere_k(Z):
+    # The aim of this function is the same as fnc.atmosphere, for a single
+    # value of the geometric height (0-1000km).
+    # === INPUTS ===
+    # Z [m]          Geometric height
+    # === OUTPUTS ===
+    # T, P, rho, a, mu, nu, g    (see fnc.Air)
+    ratio = ro/(ro + Z)
+    H = Z*ratio                     # [m'] - Geopotential height
+    if H < Hb[7]:
+        b = 0
+        while b < 6 and H >= Hb[b+1]:
+            b += 1
+        dH = H - Hb[b]
+        if Lm[b] != 0:
+            T = Tmb[b] + Lm[b]*dH
+            P = Pb[b]*(Tmb[b]/T)**expo[b]
+        else:
+            T = Tmb[b]
+            P = Pb[b]*math.exp(kiso[b]*dH)
+        rho = P*Mo/(R*T)
+        a = (gamma*R*T/Mo)**0.5
+    else:
+        Zu = max(Z, 86000.)
+        i = min(int((Zu - 86000)*up_inv_dz), up_n - 2)
+        w = (Zu - up_Z[i])*up_inv_dz
+        T = up_T[i] + w*(up_T[i+1] - up_T[i])
+        P = math.exp(up_lnP[i] + w*(up_lnP[i+1] - up_lnP[i]))
+        rho = math.exp(up_lnrho[i] + w*(up_lnrho[i+1] - up_lnrho[i]))
+        a = (gamma*P/rho)**0.5
+    mu = beta*T**1.5/(T + S)
+    return T, P, rho, a, mu, mu/rho, go*ratio*ratio
+
+def g_k(Z):
+    # Same as fnc.g, for a single value.
+    return go * (ro / (ro+Z))**2
+
+def mach_k(V, Vs):
+    # Same as fnc.mach, for a single value.
+    return V/Vs
+
+def re_k(V, kvisc, L):
+    # Same as fnc.re, for a single value.
+    return V * L / kvisc
+
+def Tge_k(long, lat):
+    # Same as fnc.Tge.
+    slon = math.sin(long)
+    clon = math.cos(long)
+    slat = math.sin(lat)
+    clat = math.cos(lat)
+    tge = np.empty((3, 3))
+    tge[0, 0] = -slat*clon
+    tge[0, 1] = -slat*slon
+    tge[0, 2] = clat
+    tge[1, 0] = -slon
+    tge[1, 1] = clat
+    tge[1, 2] = 0.
+    tge[2, 0] = -clat*clon
+    tge[2, 1] = -clat*slon
+    tge[2, 2] = -slon
+    return tge
+
+def Tei_k(hangle):
+    # Same as fnc.Tei.
+    sha = math.sin(hangle)
+    cha = math.cos(hangle)
+    tei = np.zeros((3, 3))
+    tei[0, 0] = cha
+    tei[0, 1] = sha
+    tei[1, 0] = -sha
+    tei[1, 1] = cha
+    tei[2, 2] = 1.
+    return tei
+
+def Tmv_k(bang):
+    # Same as fnc.Tmv.
+    sba = math.sin(bang)
+    cba = math.cos(bang)
+    tmv = np.zeros((3, 3))
+    tmv[0, 0] = 1.
+    tmv[1, 1] = -cba
+    tmv[1, 2] = sba
+    tmv[2, 1] = -sba
+    tmv[2, 2] = cba
+    return tmv
+
+def Tvg_k(gamma, chi):
+    # Same as fnc.Tvg.
+    schi = math.sin(chi)
+    cchi = math.cos(chi)
+    sgamma = math.sin(gamma)
+    cgamma = math.cos(gamma)
+    tvg = np.empty((3, 3))
+    tvg[0, 0] = cchi*cgamma
+    tvg[0, 1] = cgamma*schi
+    tvg[0, 2] = -sgamma
+    tvg[1, 0] = -schi
+    tvg[1, 1] = -cchi
+    tvg[1, 2] = 0.
+    tvg[2, 0] = sgamma*cchi
+    tvg[2, 1] = sgamma*schi
+    tvg[2, 2] = cchi
+    return tvg
+
+#%% Functions
+
+# Functions to be used by the rest of the code, from the backend in use.
+if BACKEND == 'numba':
+    jit = numba.njit(cache=True)
+    # The segments of the upper atmosphere are too large to be cached
+    atmosphere = numba.njit(atmosphere_k)
+    g = jit(g_k)
+    mach = jit(mach_k)
+    re = jit(re_k)
+    Tge = jit(Tge_k)
+    Tei = jit(Tei_k)
+    Tmv = jit(Tmv_k)
+    Tvg = jit(Tvg_k)
+else:
+    atmosphere = partial(f.atmosphere, checked=False)
+    g = partial(f.g, checked=False)
+    mach = partial(f.mach, checked=False)
+    re = partial(f.re, checked=False)
+    Tge = partial(f.Tge, checked=False)
+    Tei = partial(f.Tei, checked=False)
+    Tmv = partial(f.Tmv, checked=False)
+    Tvg = partial(f.Tvg, checked=False)
+
+def warmup():
+    # The aim of this function is to compile every function in advance, so
+    # that the first step of a run does not pay for the compilation.
+    atmosphere(1000.)
+    atmosphere(100000.)
+    g(1000.)
+    mach(1., 1.)
+    re(1., 1., 1.)
+    Tge(0., 0.)
+    Tei(0.)
+    Tmv(0.)
+    Tvg(0., 0.)
@@ -0,0 +1,187 @@
+#%% Script information
+# Name: archive.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is storing the results of a run in a compact
+# binary file, that can be read through a memory map: any channel, or any
+# time window of it, is read without loading the rest of the file.
+#
+# Layout of a file (.trj):
+#   magic       8 bytes, b'LIATRJ01'
+#   size        8 bytes, size of the header in bytes (unsigned, little endian)
+#   header      JSON (UTF-8), padded with spaces so that the data starts at
+#               a multiple of 64 bytes. It holds the number of steps, the
+#               channels, their units, the data type, the offset of each
+#               array, the constants of c.py, the backend of accel.py and
+#               any other information given when the file was written
+#   channels    One contiguous array of n values per channel
+#   index       Time of one step out of every 'every' steps (coarse index,
+#               used to find a time window without reading all the times)
+#
+# The time must not decrease from one step to the next (two steps at the
+# same time, at the change of phase, are fine).
+#
+#%% Packages
+import os
+import json
+import shutil
+import numpy as np
+import c
+import fnc as f
+import accel as a
+import trajectory as tr
+import stream as st
+
+#%% Constants
+
+MAGIC = b'LIATRJ01'
+ALIGN = 64                          # [bytes] - Alignment of the arrays
+EVERY = 1024                        # [adim] - Steps per entry of the index
+
+def constants():
+    # The aim of this function is to collect the constants of c.py, to be
+    # stored with the results.
+    # === OUTPUTS ===
+    # const [dict]      {name: value}
+    return {name: float(value) for (name, value) in vars(c).items()
+            if not name.startswith('_') and isinstance(value, (int, float, np.number))
+            and not isinstance(value, bool)}
+
+#%% Writing
+
+class Archive(st.Writer):
+    # The aim of this class is writing a stream of blocks (see stream.py)
+    # to a .trj file. The blocks go to one temporary file per channel (see
+    # stream.Writer), which are packed into the final file by close().
+    # === INPUTS ===
+    # path [str]        Path of the file
+    # every [adim]      Steps per entry of the time index
+    # meta [dict]       Other information to be stored in the header (must
+    #                   be JSON serializable)
+
+    def __init__(self, path, every=EVERY, meta=None):
+        st.Writer.__init__(self, path + '.parts')
+        self.file = path
+        self.every = every
+        self.meta = {} if meta is None else meta
+
+    def close(self):
+        st.Writer.close(self)
+        parts = self.path
+        n = self.n
+        dtype = np.dtype(float)
+        header = {'version': 1, 'n': n, 'channels': list(tr.CHANNELS), 'units': list(tr.UNITS),
+                  'dtype': dtype.str, 'every': self.every, 'constants': constants(),
+                  'backend': a.info(), 'meta': self.meta}
+        # The offsets depend on the size of the header, which depends on the
+        # offsets: the header is sized with room for them first
+        header['offsets'] = {name: 0 for name in tr.CHANNELS}
+        header['index'] = 0
+        size = len(json.dumps(header)) + 64*(len(tr.CHANNELS) + 1)
+        start = -(-(len(MAGIC) + 8 + size) // ALIGN)*ALIGN
+        step = -(-n*dtype.itemsize // ALIGN)*ALIGN
+        header['offsets'] = {name: start + k*step for (k, name) in enumerate(tr.CHANNELS)}
+        header['index'] = start + len(tr.CHANNELS)*step
+        text = json.dumps(header).encode()
+        text += b' '*(start - len(MAGIC) - 8 - len(text))
+        with open(self.file, 'wb') as out:
+            out.write(MAGIC)
+            out.write(len(text).to_bytes(8, 'little'))
+            out.write(text)
+            for name in tr.CHANNELS:
+                with open(os.path.join(parts, name + '.f8'), 'rb') as part:
+                    shutil.copyfileobj(part, out)
+                out.write(b'\0'*(step - n*dtype.itemsize))
+            t = np.fromfile(os.path.join(parts, 't.f8'), dtype=dtype)
+            out.write(t[::self.every].tobytes())
+        shutil.rmtree(parts)
+        return self.file
+
+def save(path, traj, every=EVERY, meta=None):
+    # The aim of this function is to write the steps of a Trajectory (e.g.
+    # Flight(...).run().out) to a .trj file.
+    # === INPUTS ===
+    # path [str]        Path of the file
+    # traj [Trajectory] Steps to be written
+    # every, meta       See Archive
+    # === OUTPUTS ===
+    # path [str]
+    out = Archive(path, every, meta)
+    out(traj.data[:,:len(traj)])
+    return out.close()
+
+#%% Reading
+
+class Run:
+    # The aim of this class is reading a .trj file through memory maps.
+    # === INPUTS ===
+    # path [str]        Path of the file
+    # === ATTRIBUTES ===
+    # header [dict]     Header of the file
+    # n [adim]          Number of steps
+    # channels [tuple]  Names of the channels
+    # units [dict]      {channel: unit}
+    # constants [dict]  Constants of c.py when the file was written
+    # index [n_index]   Coarse time index (memory map)
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise f.InputError('Fn: Run. ' + path + ' is not a .trj file.')
+            size = int.from_bytes(file.read(8), 'little')
+            self.header = json.loads(file.read(size))
+        self.path = path
+        self.n = self.header['n']
+        self.channels = tuple(self.header['channels'])
+        self.units = dict(zip(self.channels, self.header['units']))
+        self.constants = self.header['constants']
+        self.every = self.header['every']
+        self.dtype = np.dtype(self.header['dtype'])
+        self.maps = {}
+        self.index = self.map(self.header['index'], -(-self.n // self.every))
+
+    def map(self, offset, n):
+        # Memory map of n values from offset.
+        if n == 0:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode='r', offset=offset, shape=(n,))
+
+    def __getitem__(self, name):
+        # Channel name, as a memory map (nothing is read until it is used).
+        if name not in self.units:
+            raise f.InputError('Fn: Run. ' + str(name) + ' is not a channel of the file.')
+        if name not in self.maps:
+            self.maps[name] = self.map(self.header['offsets'][name], self.n)
+        return self.maps[name]
+
+    def __len__(self):
+        return self.n
+
+    def window(self, t0=-np.inf, t1=np.inf):
+        # The aim of this method is to find the steps between the times t0
+        # and t1 (both included). Only the index and the times of at most two
+        # entries of it around each end are read.
+        # === OUTPUTS ===
+        # window [slice]    Steps of the window
+        if t0 > t1:
+            raise f.RangeError('Fn: Run. t0 must not be greater than t1.')
+        K = self.every
+        t = self['t']
+        j = max(int(np.searchsorted(self.index, t0, 'left')) - 1, 0)*K
+        i0 = j + int(np.searchsorted(t[j:j+2*K], t0, 'left'))
+        j = max(int(np.searchsorted(self.index, t1, 'right')) - 1, 0)*K
+        i1 = j + int(np.searchsorted(t[j:j+K], t1, 'right'))
+        return slice(i0, max(i0, i1))
+
+    def read(self, channels=None, t0=-np.inf, t1=np.inf):
+        # The aim of this method is to read some channels in a time window.
+        # === INPUTS ===
+        # channels [list]   Names of the channels (all if None)
+        # t0, t1 [s]        Time window
+        # === OUTPUTS ===
+        # data [dict]       {channel: values in the window (memory map)}
+        window = self.window(t0, t1)
+        return {name: self[name][window] for name in (self.channels if channels is None else channels)}
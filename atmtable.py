@@ -0,0 +1,219 @@
+#%% Script information
+# Name: atmtable.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is providing a tabulated version of the
+# atmospheric model implemented in fnc.py. The properties are computed
+# once with the analytic chain (table4 - tm - p - rho - Vs - visc) over a
+# dense grid of geometric heights, and afterwards they are obtained by
+# linear interpolation. The grid spacing is chosen so that the interpolation
+# error stays below a user-supplied maximum relative error.
+# Tables can be saved to disk and loaded again by later processes.
+#
+# The grid is uniform within each layer of Table 4 and has a node on every
+# layer boundary. This way, the changes of temperature gradient and the
+# small jumps of pressure between layers (Table 4 lists rounded values of
+# Pb) never fall inside a cell.
+#
+#%% Packages
+import os
+from bisect import bisect_right
+import numpy as np
+import fnc as f
+
+#%% Constants
+
+# Version of the tables. It must be increased whenever the atmospheric
+# model of fnc.py changes, so that tables cached on disk are rebuilt.
+TABLE_VERSION = 1
+# Properties stored in each row of the table, in this order.
+FIELDS = ('T', 'P', 'rho', 'Vs', 'dvisc', 'kvisc')
+# [m] - Earth's radius - (Page 4)
+ro = 6356.766 * 10**3
+# [m] - Geometric heights of the layer boundaries of Table 4
+Zb_layer = (f.Hb_layer*ro) / (ro - f.Hb_layer)
+# [m] - Smallest grid spacing the table is allowed to use
+DZ_MIN = 0.01
+
+#%% Functions
+
+def analytic(Z, b=None):
+    # The aim of this function is to evaluate the analytic atmospheric
+    # model of fnc.py, stacking the results as the columns of a table.
+    # === INPUTS ===
+    # Z [m]                Geometric height (array)
+    # b [adim]             Layer to be used. If None, it is obtained from Z.
+    #                      Forcing it allows evaluating a layer at its top.
+    # === OUTPUTS ===
+    # props [N x 6]        T, P, rho, Vs, dvisc, kvisc at each Z
+    Z = np.asarray(Z, dtype=float)
+    if b is None:
+        b, Lmb, Tmb, Hb, H, Pb = f.table4(Z)
+    else:
+        b, Lmb, Tmb, Hb, H, Pb = f.table4(0.5*(Zb_layer[b]+Zb_layer[b+1]))
+        H = 0.001*(Z*ro) / (ro + Z)
+    T = f.tm(Tmb,Lmb,H,Hb)
+    P = f.p(Tmb,Lmb,H,Hb,Pb)
+    rho = f.rho(P,T)
+    Vs = f.Vs(T)
+    dvisc, kvisc = f.visc(T,rho)
+    return np.column_stack(np.broadcast_arrays(T, P, rho, Vs, dvisc, kvisc))
+
+def npz(path):
+    # Path of a table file, with the extension that np.savez adds to it.
+    return path if path.endswith('.npz') else path + '.npz'
+
+#%% Tabulated atmosphere
+
+class AtmTable:
+    # The aim of this class is storing the atmospheric properties over a
+    # grid of geometric heights and interpolating them.
+    # === ATTRIBUTES ===
+    # max_rel_err [adim]   Maximum relative interpolation error allowed
+    # dz [m]               Target grid spacing
+    # z_max [m]            Highest geometric height covered by the table
+    # Zn [m]               Nodes of the grid
+    # table [N x 6]        Properties at each node (see FIELDS)
+    # slope [N-1 x 6]      Derivative of the properties within each cell
+
+    def __init__(self, max_rel_err=1e-6, dz=None):
+        # The table is built from the analytic model. If dz is given, it is
+        # used as is. Otherwise, the spacing is halved from 1 km until the
+        # interpolation error is below max_rel_err, and an error that is
+        # not reached at DZ_MIN is a RangeError.
+        self.max_rel_err = max_rel_err
+        if dz is None:
+            dz = 1000.
+            err = self.max_error(dz)
+            while err > max_rel_err and dz > DZ_MIN:
+                dz = dz/2
+                err = self.max_error(dz)
+            if err > max_rel_err:
+                raise f.RangeError('Fn: AtmTable. max_rel_err = ' + str(max_rel_err) + ' is not reached (the error is '
+                                   + str(err) + ' with dz = ' + str(dz) + ' m).')
+        else:
+            self.set(dz)
+
+    def set(self, dz, table=None):
+        # Builds the grid for the spacing dz. Every layer is divided into
+        # an integer number of cells, so the actual spacing of each layer
+        # is slightly smaller than dz.
+        self.dz = dz
+        self.z_max = Zb_layer[-1]
+        n = np.maximum(np.ceil(np.diff(Zb_layer)/dz).astype(int), 1)
+        self.first = np.concatenate(([0], np.cumsum(n+1)))[:-1]
+        self.ncell = n
+        self.inv_dz = n/np.diff(Zb_layer)
+        self.Zn = np.concatenate([np.linspace(Zb_layer[k], Zb_layer[k+1], n[k]+1)
+                                  for k in range(len(n))])
+        if table is None:
+            table = np.concatenate([analytic(self.Zn[self.first[k]:
+                                                     self.first[k]+n[k]+1], k)
+                                    for k in range(len(n))])
+        self.table = table
+        # The cell joining two layers has zero width, it is never used.
+        dZn = np.diff(self.Zn)
+        dZn[dZn==0] = 1
+        self.slope = np.diff(table, axis=0)/dZn[:,None]
+        # Scalar lookup data, as Python lists
+        self.lists = None
+
+    def max_error(self, dz):
+        # Largest relative error of the interpolation with spacing dz,
+        # checked at the midpoint of every cell of every layer.
+        self.set(dz)
+        Zm = 0.5*(self.Zn[1:] + self.Zn[:-1])
+        k = np.searchsorted(Zb_layer, Zm, side='right') - 1
+        err = 0
+        for b in range(len(self.ncell)):
+            Zc = Zm[k==b]
+            err = max(err, np.max(np.abs(self.interp(Zc)/analytic(Zc, b) - 1)))
+        return err
+
+    def interp(self, Z):
+        # The aim of this method is to interpolate the table at the given
+        # geometric heights, without input control.
+        # === INPUTS ===
+        # Z [m]              Geometric height (array)
+        # === OUTPUTS ===
+        # props [N x 6]      T, P, rho, Vs, dvisc, kvisc at each Z
+        Z = np.asarray(Z, dtype=float)
+        k = np.clip(np.searchsorted(Zb_layer, Z, side='right') - 1,
+                    0, len(self.ncell)-1)
+        i = self.first[k] + np.minimum(((Z - Zb_layer[k])*self.inv_dz[k])
+                                       .astype(np.intp), self.ncell[k]-1)
+        dZ = (Z - self.Zn[i])[...,None]
+        return self.table[i] + dZ*self.slope[i]
+
+    def __call__(self, Z, checked=None):
+        # The aim of this method is to obtain the atmospheric properties at
+        # the given geometric height from the table.
+        # === INPUTS ===
+        # Z [m]              Geometric height (value or array)
+        # checked [bool]     Input control (None to use the mode of fnc.py)
+        # === OUTPUTS ===
+        # T [K]              Temperature
+        # P [N/m^2]          Pressure
+        # rho [kg/m^3]       Density
+        # Vs [m/s]           Speed of sound
+        # dvisc [N.s/m^2]    Dynamic viscosity
+        # kvisc [m^2/s]      Kinematic viscosity
+        if checked is None:
+            checked = f.CHECKED
+        if isinstance(Z, (int, float)):
+            # Scalar path - plain Python floats, no arrays are created
+            if checked and not 0 <= Z <= self.z_max:
+                raise f.AltitudeError('Fn: AtmTable. Z must be a value between 0m and '
+                                      + str(self.z_max) + 'm.')
+            if self.lists is None:
+                self.lists = (Zb_layer.tolist(), self.first.tolist(),
+                               self.ncell.tolist(), self.inv_dz.tolist(),
+                               self.Zn.tolist(), self.table.tolist(),
+                               self.slope.tolist())
+            Zb, first, ncell, inv_dz, Zn, table, slope = self.lists
+            k = min(bisect_right(Zb, Z) - 1, len(ncell) - 1)
+            i = first[k] + min(int((Z - Zb[k])*inv_dz[k]), ncell[k] - 1)
+            dZ = Z - Zn[i]
+            return tuple([v + dZ*s for (v, s) in zip(table[i], slope[i])])
+        # Input control
+        if checked:
+            Z = f.number('AtmTable', Z)
+            if not np.all((Z>=0) & (Z<=self.z_max)):
+                raise f.AltitudeError('Fn: AtmTable. Z must be a value between 0m and '
+                                      + str(self.z_max) + 'm.')
+        return tuple(self.interp(Z).T)
+
+    def save(self, path):
+        # The aim of this method is to store the table on disk (.npz, added
+        # to path if it does not end with it).
+        np.savez(npz(path), version=TABLE_VERSION, max_rel_err=self.max_rel_err,
+                 dz=self.dz, table=self.table)
+
+    @classmethod
+    def load(cls, path):
+        # The aim of this method is to load a table stored with save().
+        # None is returned if the file was written by another version.
+        with np.load(npz(path)) as data:
+            if int(data['version']) != TABLE_VERSION:
+                return
+            tab = cls.__new__(cls)
+            tab.max_rel_err = float(data['max_rel_err'])
+            tab.set(float(data['dz']), data['table'])
+        return tab
+
+    @classmethod
+    def cached(cls, path, max_rel_err=1e-6):
+        # The aim of this method is to load the table stored in path if it
+        # is at least as accurate as requested. Otherwise, a new table is
+        # built and saved to path for later processes.
+        path = npz(path)
+        if os.path.exists(path):
+            tab = cls.load(path)
+            if tab is not None and tab.max_rel_err<=max_rel_err:
+                return tab
+        tab = cls(max_rel_err)
+        tab.save(path)
+        return tab
@@ -0,0 +1,435 @@
+#%% Script information
+# Name: dynamics.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is building the derivative of the state of the
+# vehicle, to be integrated with engine.py. The vehicle is a point mass
+# (3 degrees of freedom) flying over a spherical, rotating Earth.
+#
+# The state vector is y = [x, y, z, vx, vy, vz, m], position [m] and
+# velocity [m/s] in the ECI frame and mass [kg]. The ECI frame is aligned
+# with the ECEF frame at t = 0. The forces are:
+#   - Thrust, from the mass flow and the ISP, which goes from its sea level
+#     value to its vacuum value as the ambient pressure drops. The mass
+#     flow can follow a throttle table (see propulsion.py).
+#   - Drag, opposed to the velocity relative to the air, which rotates
+#     with the Earth. With a database of coefficients (see aero.py), the
+#     drag and the lift depend on the Mach number, the Reynolds number and
+#     the angle of attack.
+#   - Gravity, from gravity.py (J2-J4).
+# The air comes from the atmosphere of fnc.py (or any function of Z with
+# the same outputs, e.g. the one of accel.py).
+#
+# The events of the flight (impact, burnout, apogee, Mach 1 and maximum
+# dynamic pressure) are built here too, as engine.Event objects, and so are
+# the outputs of each step that are not part of the state (forces, Mach,
+# Reynolds and dynamic pressure), to be stored by trajectory.py.
+#
+#%% Packages
+import math
+from functools import partial
+import numpy as np
+import c
+import fnc as f
+import gravity as gr
+import engine as e
+import propulsion as pr
+
+#%% Constants
+
+STATE = ('x', 'y', 'z', 'vx', 'vy', 'vz', 'm')   # Variables of the state
+P_SL = 101325.                   # [N/m^2] - Pressure at SL (ISP_SL reference)
+Z_TOP = 1000000.                 # [m] - No drag above this height
+
+#%% Initial state
+
+def launch_state(m, lat=c.lat_0, long=c.long_0, Z=c.Z_0):
+    # The aim of this function is to obtain the state of the vehicle
+    # standing on the launch pad at t = 0.
+    # === INPUTS ===
+    # m [kg]            Initial mass
+    # lat [deg]         Latitude of the launch site
+    # long [deg]        Longitude of the launch site
+    # Z [m]             Height of the launch site over SL
+    # === OUTPUTS ===
+    # y0 [7]            Initial state
+    lat = math.radians(lat)
+    long = math.radians(long)
+    r = c.R_E + Z
+    x = r*math.cos(lat)*math.cos(long)
+    y = r*math.cos(lat)*math.sin(long)
+    z = r*math.sin(lat)
+    # The pad moves with the Earth
+    return np.array([x, y, z, -c.w_E*y, c.w_E*x, 0., m])
+
+#%% Steering
+
+def vertical(t, x, y, z, ux, uy, uz):
+    # Steering law of the vertical rise: the thrust points up.
+    ir = 1/math.sqrt(x*x + y*y + z*z)
+    return x*ir, y*ir, z*ir
+
+def gravity_turn(kick=c.kick, azimuth=c.azimuth_0):
+    # The aim of this function is to build the steering law of a gravity
+    # turn: the thrust is tilted by the kick angle towards the azimuth, and
+    # once the velocity has turned as much as the kick, the thrust follows
+    # the velocity relative to the air. The turn starts with the phase that
+    # uses it, after a vertical rise (the change of direction must fall
+    # between two phases, never inside a step of the integrator).
+    # === INPUTS ===
+    # kick [deg]        Pitch kick angle
+    # azimuth [deg]     Direction of the kick, from North
+    # === OUTPUTS ===
+    # steer [function]  steer(t, x, y, z, ux, uy, uz) -> unit vector (ECI)
+    ck = math.cos(math.radians(kick))
+    sk = math.sin(math.radians(kick))
+    ca = math.cos(math.radians(azimuth))
+    sa = math.sin(math.radians(azimuth))
+
+    def steer(t, x, y, z, ux, uy, uz):
+        ir = 1/math.sqrt(x*x + y*y + z*z)
+        upx, upy, upz = x*ir, y*ir, z*ir
+        u = math.sqrt(ux*ux + uy*uy + uz*uz)
+        if u > 0 and ux*upx + uy*upy + uz*upz <= ck*u:
+            return ux/u, uy/u, uz/u
+        # East and North at the position of the vehicle
+        rxy = math.sqrt(x*x + y*y)
+        ex, ey = (-y/rxy, x/rxy) if rxy > 0 else (0., 1.)
+        nx, ny, nz = -upz*ey, upz*ex, upx*ey - upy*ex
+        return (ck*upx + sk*(ca*nx + sa*ex),
+                ck*upy + sk*(ca*ny + sa*ey),
+                ck*upz + sk*ca*nz)
+    return steer
+
+def pitch_offset(offset=0.):
+    # The aim of this function is to build a steering law that keeps the
+    # thrust at a fixed angle over the velocity relative to the air, in the
+    # vertical plane that contains it (0 to follow the velocity, as at the
+    # end of a gravity turn).
+    # === INPUTS ===
+    # offset [deg]      Angle of the thrust over the velocity (up > 0)
+    # === OUTPUTS ===
+    # steer [function]  steer(t, x, y, z, ux, uy, uz) -> unit vector (ECI)
+    co = math.cos(math.radians(offset))
+    so = math.sin(math.radians(offset))
+
+    def steer(t, x, y, z, ux, uy, uz):
+        iu = 1/math.sqrt(ux*ux + uy*uy + uz*uz)
+        ex, ey, ez = ux*iu, uy*iu, uz*iu
+        ir = 1/math.sqrt(x*x + y*y + z*z)
+        # Up, without its component along the velocity
+        k = (x*ex + y*ey + z*ez)*ir
+        nx, ny, nz = x*ir - k*ex, y*ir - k*ey, z*ir - k*ez
+        n = math.sqrt(nx*nx + ny*ny + nz*nz)
+        if n == 0:
+            return ex, ey, ez
+        return co*ex + so*nx/n, co*ey + so*ny/n, co*ez + so*nz/n
+    return steer
+
+#%% Aerodynamics
+
+def aerodynamics(aero, area=c.A_ref, length=c.D_ref):
+    # The aim of this function is to build the function that gives the
+    # aerodynamic forces from a database of coefficients. The angle of
+    # attack is the one between the thrust (the axis of the vehicle) and
+    # the velocity relative to the air, and the lift is normal to the
+    # velocity, towards the thrust. With no thrust the vehicle is taken
+    # along the velocity (no angle of attack). The database keeps the
+    # cells of the last lookup (see aero.Cursor) from one call to the next.
+    # === INPUTS ===
+    # aero [Aero]       Database of the coefficients
+    # area [m^2]        Reference area
+    # length [m]        Reference length of the Reynolds number
+    # === OUTPUTS ===
+    # fn [function]     fn(air, ux, uy, uz, e) -> drag [N], lift [N],
+    #                   Mach [adim], Reynolds [adim], q [N/m^2] and the
+    #                   direction of the lift (ECI), for the air of the
+    #                   atmosphere, the velocity relative to it and the
+    #                   direction of the thrust e (None for no thrust)
+    lookup = aero.lookup
+    cursor = aero.cursor()
+
+    def fn(air, ux, uy, uz, e=None):
+        u = math.sqrt(ux*ux + uy*uy + uz*uz)
+        if u == 0:
+            return 0., 0., 0., 0., 0., (0., 0., 0.)
+        alpha = 0.
+        n = (0., 0., 0.)
+        if e is not None:
+            ex, ey, ez = e
+            ca = (ex*ux + ey*uy + ez*uz)/u
+            # Thrust, without its component along the velocity (its size is
+            # the sine of alpha, better conditioned than acos(ca) at small
+            # angles)
+            nx, ny, nz = ex - ca*ux/u, ey - ca*uy/u, ez - ca*uz/u
+            s = math.sqrt(nx*nx + ny*ny + nz*nz)
+            alpha = math.degrees(math.atan2(s, ca))
+            if s > 0:
+                n = (nx/s, ny/s, nz/s)
+        M = u/air[3]
+        Re = u*length/air[5]
+        q = 0.5*air[2]*u*u
+        cd, cl, cm = lookup(M, Re, alpha, cursor)
+        return q*cd*area, q*cl*area, M, Re, q, n
+    return fn
+
+#%% Derivative
+
+def derivative(m_dot=0., isp_v=0., isp_sl=None, cd=c.Cd, area=c.A_ref,
+               steer=None, atm=None, degree=4, profile=None, t_on=0.,
+               aero=None, length=c.D_ref):
+    # The aim of this function is to build the derivative of the state for
+    # a phase of the flight. Everything that is constant during the phase
+    # is computed here, once, and the returned function only computes what
+    # changes from one step to the next. m_dot = 0 gives a coast, whose
+    # derivative has no thrust term at all (it is chosen here, not tested
+    # at every step).
+    # === INPUTS ===
+    # m_dot [kg/s]      Mass flow of propellant
+    # isp_v [s]         ISP in vacuum
+    # isp_sl [s]        ISP at sea level (isp_v if None)
+    # cd [adim]         Drag coefficient
+    # area [m^2]        Reference area
+    # steer [function]  Steering law (gravity_turn() if None)
+    # atm [function]    Atmosphere, atm(Z) -> T, P, rho, a, mu, nu, g
+    #                   (fnc.atmosphere in unchecked mode if None)
+    # degree [adim]     Highest zonal harmonic of the gravity
+    # profile [tuple]   Throttle table of the mass flow (see propulsion.py),
+    #                   None for a constant m_dot
+    # t_on [s]          Time of the ignition (start of the profile)
+    # aero [Aero]       Database of the coefficients (see aerodynamics),
+    #                   None for a constant cd and no lift
+    # length [m]        Reference length of the Reynolds number (aero)
+    # === OUTPUTS ===
+    # deriv [function]  deriv(t, y) -> dy/dt
+    if isp_sl is None:
+        isp_sl = isp_v
+    if steer is None:
+        steer = gravity_turn()
+    if atm is None:
+        atm = partial(f.atmosphere, checked=False)
+    F_v = m_dot*c.g0*isp_v                  # [N] - Thrust in vacuum
+    k_P = m_dot*c.g0*(isp_v - isp_sl)/P_SL  # [m^2] - Thrust lost per unit of P
+    k_D = 0.5*cd*area                       # [m^2] - Drag per unit of q
+    w = c.w_E
+    R_E = c.R_E
+    gravity = gr.gravity
+
+    if aero is not None:
+        air_forces = aerodynamics(aero, area, length)
+        throttle = pr.Engine(m_dot, F_v, k_P, profile).throttle
+
+        def deriv(t, state):
+            x, y, z, vx, vy, vz, m = state.tolist()
+            h = math.sqrt(x*x + y*y + z*z) - R_E
+            ux = vx + w*y
+            uy = vy - w*x
+            uz = vz
+            e = steer(t, x, y, z, ux, uy, uz) if m_dot else None
+            ax, ay, az = gravity((x, y, z), degree, False).tolist()
+            P = 0.
+            if h < Z_TOP:
+                air = atm(h if h > 0 else 0.)
+                P = air[1]
+                D, L, M, Re, q, (nx, ny, nz) = air_forces(air, ux, uy, uz, e)
+                if D or L:
+                    kD = D/(m*math.sqrt(ux*ux + uy*uy + uz*uz))
+                    kL = L/m
+                    ax, ay, az = ax - kD*ux + kL*nx, ay - kD*uy + kL*ny, az - kD*uz + kL*nz
+            if not m_dot:
+                return np.array([vx, vy, vz, ax, ay, az, 0.])
+            k = throttle(t - t_on)
+            aT = (F_v*k - k_P*P)/m
+            ex, ey, ez = e
+            return np.array([vx, vy, vz, ax + aT*ex, ay + aT*ey, az + aT*ez, -m_dot*k])
+        return deriv
+
+    def forces(state):
+        # Velocity relative to the air, pressure and acceleration due to
+        # drag and gravity
+        x, y, z, vx, vy, vz, m = state.tolist()
+        h = math.sqrt(x*x + y*y + z*z) - R_E
+        ux = vx + w*y
+        uy = vy - w*x
+        uz = vz
+        if h < Z_TOP:
+            air = atm(h if h > 0 else 0.)
+            P = air[1]
+            kD = k_D*air[2]*math.sqrt(ux*ux + uy*uy + uz*uz)/m
+        else:
+            P = 0.
+            kD = 0.
+        gx, gy, gz = gravity((x, y, z), degree, False).tolist()
+        return (x, y, z, vx, vy, vz, m, ux, uy, uz, P,
+                gx - kD*ux, gy - kD*uy, gz - kD*uz)
+
+    if not m_dot:
+        def deriv(t, state):
+            x, y, z, vx, vy, vz, m, ux, uy, uz, P, ax, ay, az = forces(state)
+            return np.array([vx, vy, vz, ax, ay, az, 0.])
+        return deriv
+
+    if profile is not None:
+        throttle = pr.Engine(m_dot, F_v, k_P, profile).throttle
+
+        def deriv(t, state):
+            x, y, z, vx, vy, vz, m, ux, uy, uz, P, ax, ay, az = forces(state)
+            k = throttle(t - t_on)
+            aT = (F_v*k - k_P*P)/m
+            ex, ey, ez = steer(t, x, y, z, ux, uy, uz)
+            return np.array([vx, vy, vz, ax + aT*ex, ay + aT*ey, az + aT*ez, -m_dot*k])
+        return deriv
+
+    def deriv(t, state):
+        x, y, z, vx, vy, vz, m, ux, uy, uz, P, ax, ay, az = forces(state)
+        aT = (F_v - k_P*P)/m
+        ex, ey, ez = steer(t, x, y, z, ux, uy, uz)
+        return np.array([vx, vy, vz, ax + aT*ex, ay + aT*ey, az + aT*ez, -m_dot])
+    return deriv
+
+#%% Outputs
+
+def outputs(m_dot=0., isp_v=0., isp_sl=None, cd=c.Cd, cl=0., area=c.A_ref,
+            length=c.D_ref, atm=None, profile=None, t_on=0., aero=None, steer=None):
+    # The aim of this function is to build the function that gives the
+    # outputs of a step that are not part of the state, for a phase of the
+    # flight (the inputs are the ones of derivative). Above Z_TOP there is
+    # no air, and all the outputs but the thrust are 0.
+    # === INPUTS ===
+    # cl [adim]         Lift coefficient
+    # length [m]        Reference length of the Reynolds number
+    # aero [Aero]       Database of the coefficients (cd and cl are not
+    #                   used then)
+    # steer [function]  Steering law, for the angle of attack (aero)
+    # Others            See derivative
+    # === OUTPUTS ===
+    # fn [function]     fn(t, y) -> thrust [N], drag [N], lift [N],
+    #                   Mach [adim], Reynolds [adim], q [N/m^2]
+    if isp_sl is None:
+        isp_sl = isp_v
+    if atm is None:
+        atm = partial(f.atmosphere, checked=False)
+    F_v = m_dot*c.g0*isp_v
+    k_P = m_dot*c.g0*(isp_v - isp_sl)/P_SL
+    w = c.w_E
+    R_E = c.R_E
+    throttle = pr.Engine(m_dot, F_v, k_P, profile).throttle
+    if aero is not None:
+        air_forces = aerodynamics(aero, area, length)
+        if steer is None:
+            steer = gravity_turn()
+
+    def fn(t, state):
+        x, y, z, vx, vy, vz, m = state.tolist()
+        h = math.sqrt(x*x + y*y + z*z) - R_E
+        F = F_v*throttle(t - t_on)
+        if h >= Z_TOP:
+            return F, 0., 0., 0., 0., 0.
+        if aero is not None:
+            ux = vx + w*y
+            uy = vy - w*x
+            air = atm(h if h > 0 else 0.)
+            e = steer(t, x, y, z, ux, uy, vz) if m_dot else None
+            D, L, M, Re, q, n = air_forces(air, ux, uy, vz, e)
+            return F - k_P*air[1], D, L, M, Re, q
+        ux = vx + w*y
+        uy = vy - w*x
+        u = math.sqrt(ux*ux + uy*uy + vz*vz)
+        T, P, rho, a, mu, nu, g = atm(h if h > 0 else 0.)
+        q = 0.5*rho*u*u
+        return F - k_P*P, q*cd*area, q*cl*area, u/a, u*length/nu, q
+    return fn
+
+#%% Events
+
+def altitude(Z=0., name='impact', action='stop'):
+    # The aim of this function is to build the event of the vehicle going
+    # down through the height Z (the impact for Z = 0).
+    # === INPUTS ===
+    # Z [m]             Height over the Earth
+    # name [str]        Name of the event
+    # action [str]      Action of the event (see engine.Event)
+    # === OUTPUTS ===
+    # event [Event]
+    r_Z = c.R_E + Z
+    def fn(t, y):
+        return math.sqrt(y[0]*y[0] + y[1]*y[1] + y[2]*y[2]) - r_Z
+    return e.Event(name, fn, -1, action)
+
+def depletion(m_f, name='burnout', action='switch'):
+    # The aim of this function is to build the event of the propellant
+    # running out, when the mass drops to the final mass of the stage
+    # (e.g. c.M_st1_f, reached at c.bt_st1).
+    # === INPUTS ===
+    # m_f [kg]          Mass of the vehicle without propellant
+    # name [str]        Name of the event
+    # action [str]      Action of the event (see engine.Event)
+    # === OUTPUTS ===
+    # event [Event]
+    return e.Event(name, lambda t, y: y[6] - m_f, -1, action)
+
+def apogee(action='record'):
+    # The aim of this function is to build the event of the apogee, when
+    # the radial velocity goes from positive to negative.
+    # === OUTPUTS ===
+    # event [Event]
+    def fn(t, y):
+        return y[0]*y[3] + y[1]*y[4] + y[2]*y[5]
+    return e.Event('apogee', fn, -1, action)
+
+def mach_one(atm=None, direction=0, action='record'):
+    # The aim of this function is to build the event of the vehicle going
+    # through Mach 1, relative to the air.
+    # === INPUTS ===
+    # atm [function]    Atmosphere (see derivative)
+    # direction [adim]  +1 only going supersonic, -1 only going subsonic
+    # action [str]      Action of the event (see engine.Event)
+    # === OUTPUTS ===
+    # event [Event]
+    if atm is None:
+        atm = partial(f.atmosphere, checked=False)
+    w = c.w_E
+    R_E = c.R_E
+
+    def fn(t, state):
+        x, y, z, vx, vy, vz, m = state.tolist()
+        h = math.sqrt(x*x + y*y + z*z) - R_E
+        ux = vx + w*y
+        uy = vy - w*x
+        return math.sqrt(ux*ux + uy*uy + vz*vz)/atm(min(max(h, 0.), Z_TOP))[3] - 1
+    return e.Event('mach 1', fn, direction, action)
+
+def max_q(deriv, atm=None, action='record'):
+    # The aim of this function is to build the event of the maximum dynamic
+    # pressure q = rho*u^2/2, when its rate of change goes from positive to
+    # negative:
+    #   dq/dt = u^2/2 * drho/dh * dh/dt + rho * u.du/dt
+    # where du/dt is the acceleration (from deriv) minus w x v, and drho/dh
+    # is taken from the atmosphere by a central difference.
+    # === INPUTS ===
+    # deriv [function]  Derivative of the phase (see derivative)
+    # atm [function]    Atmosphere, the same as the one of deriv
+    # action [str]      Action of the event (see engine.Event)
+    # === OUTPUTS ===
+    # event [Event]
+    if atm is None:
+        atm = partial(f.atmosphere, checked=False)
+    w = c.w_E
+    R_E = c.R_E
+
+    def fn(t, state):
+        x, y, z, vx, vy, vz, m = state.tolist()
+        r = math.sqrt(x*x + y*y + z*z)
+        h = min(max(r - R_E, 1.), Z_TOP - 1)
+        ux = vx + w*y
+        uy = vy - w*x
+        ax, ay, az = deriv(t, state)[3:6].tolist()
+        rho = atm(h)[2]
+        drho = 0.5*(atm(h + 1.)[2] - atm(h - 1.)[2])
+        dh = (x*vx + y*vy + z*vz)/r
+        return (0.5*(ux*ux + uy*uy + vz*vz)*drho*dh
+                + rho*(ux*(ax + w*vy) + uy*(ay - w*vx) + vz*az))
+    return e.Event('max q', fn, -1, action)
@@ -0,0 +1,478 @@
+#%% Script information
+# Name: engine.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is integrating the equations of motion of the
+# vehicle. The integrator does not know anything about the vehicle: it
+# takes a derivative function dy = deriv(t, y), built for example with
+# dynamics.py, and advances the state vector y.
+#
+# The results are stored in a Buffer, which is allocated once and grows in
+# chunks when it is full, instead of appending one element per step to
+# Python lists. Each variable of the state is stored contiguously, so the
+# time history of a variable is a plain NumPy array, ready for analysis.
+#
+# Two methods are available: the classic Runge-Kutta with a fixed step
+# (rk4) and the Dormand-Prince 5(4) pair with an adaptive step (dopri).
+# Both can keep the interpolant of each step (Dense), which gives the
+# state at any time of the integration.
+#
+# Events (impact, burnout, apogee, ...) are zero crossings of functions of
+# the state. They are checked after every step and located by root-finding
+# on the interpolant of the step, so the step is chosen for accuracy and
+# not to hit the events.
+#
+#%% Packages
+import math
+from collections import namedtuple
+import numpy as np
+import fnc as f
+
+#%% Buffer
+
+class Buffer:
+    # The aim of this class is storing the time and the state vector at
+    # each step of an integration.
+    # === INPUTS ===
+    # names [tuple]    Names of the variables of the state vector
+    # chunk [adim]     Number of steps allocated at once
+    # === ATTRIBUTES ===
+    # n [adim]         Number of steps stored
+    # t [s]            Time of each step (view of the stored steps)
+    # y [n_state x n]  State at each step, one row per variable (view)
+
+    def __init__(self, names, chunk=4096):
+        self.names = tuple(names)
+        self.index = {name: i for (i, name) in enumerate(self.names)}
+        self.chunk = chunk
+        self.n = 0
+        self.tdata = np.empty(chunk)
+        self.ydata = np.empty((len(self.names), chunk))
+
+    def grow(self):
+        # Makes room for more steps. The capacity grows by one chunk, or by
+        # half of the capacity if that is larger, so that long runs are not
+        # copied over and over.
+        cap = len(self.tdata)
+        new = cap + max(self.chunk, cap//2)
+        tdata = np.empty(new)
+        ydata = np.empty((len(self.names), new))
+        tdata[:cap] = self.tdata
+        ydata[:,:cap] = self.ydata
+        self.tdata = tdata
+        self.ydata = ydata
+
+    def append(self, t, y):
+        # Stores the time t and the state y as the next step.
+        if self.n == len(self.tdata):
+            self.grow()
+        self.tdata[self.n] = t
+        self.ydata[:,self.n] = y
+        self.n += 1
+
+    @property
+    def t(self):
+        return self.tdata[:self.n]
+
+    @property
+    def y(self):
+        return self.ydata[:,:self.n]
+
+    def __getitem__(self, name):
+        # Time history of the variable name, as a contiguous array (view).
+        return self.ydata[self.index[name],:self.n]
+
+    def __len__(self):
+        return self.n
+
+    def last(self):
+        # Time and state of the last step stored (copy).
+        return self.tdata[self.n-1], self.ydata[:,self.n-1].copy()
+
+#%% Dense output and events
+
+def interpolate(r, s):
+    # Interpolant of a step with coefficients r, at the fraction s of it.
+    s1 = 1 - s
+    return r[0] + s*(r[1] + s1*(r[2] + s*(r[3] + s1*r[4])))
+
+class Dense:
+    # The aim of this class is storing the interpolant of each step of an
+    # integration, so that the state can be obtained at any time of the
+    # integration without integrating again. Each interpolant is stored as
+    # the 5 coefficients of the dense output of DOPRI5 (the last one is
+    # zero for the cubic Hermite interpolant of rk4).
+    # === INPUTS ===
+    # n_state [adim]   Number of variables of the state
+    # chunk [adim]     Number of steps allocated at once
+    # === ATTRIBUTES ===
+    # n [adim]         Number of steps stored
+    # t0 [s]           Start of each step (view)
+    # h [s]            Length of each step (view)
+
+    def __init__(self, n_state, chunk=1024):
+        self.chunk = chunk
+        self.n = 0
+        self.tdata = np.empty(chunk)
+        self.hdata = np.empty(chunk)
+        self.rdata = np.empty((chunk, 5, n_state))
+
+    def append(self, t, h, r):
+        # Stores the interpolant r (5 x n_state) of the step [t, t+h].
+        if self.n == len(self.tdata):
+            cap = len(self.tdata)
+            new = cap + max(self.chunk, cap//2)
+            self.tdata = np.concatenate((self.tdata, np.empty(new-cap)))
+            self.hdata = np.concatenate((self.hdata, np.empty(new-cap)))
+            self.rdata = np.concatenate((self.rdata, np.empty((new-cap,) + self.rdata.shape[1:])))
+        self.tdata[self.n] = t
+        self.hdata[self.n] = h
+        self.rdata[self.n] = r
+        self.n += 1
+
+    @property
+    def t0(self):
+        return self.tdata[:self.n]
+
+    @property
+    def h(self):
+        return self.hdata[:self.n]
+
+    def __len__(self):
+        return self.n
+
+    def __call__(self, t):
+        # The aim of this method is to obtain the state at the given time.
+        # At a time where two steps meet (e.g. a separation), the state at
+        # the start of the later one is returned.
+        # === INPUTS ===
+        # t [s]            Time (value or array)
+        # === OUTPUTS ===
+        # y [n_state]      State at t (N x n_state for N times)
+        t = np.asarray(t, dtype=float)
+        i = np.clip(np.searchsorted(self.t0, t, side='right') - 1, 0, self.n-1)
+        s = ((t - self.tdata[i])/self.hdata[i])[...,None]
+        r = self.rdata[i]
+        return interpolate([r[...,k,:] for k in range(5)], s)
+
+
+# Event located by the integrator
+# name [str]       Name of the event
+# t [s]            Time of the event
+# y [n_state]      State at t
+# action [str]     Action of the event
+Hit = namedtuple('Hit', 'name t y action')
+
+ACTIONS = ('record', 'stop', 'switch')
+
+class Event:
+    # The aim of this class is defining an event of the flight, as the
+    # zero crossing of a function of the state.
+    # === INPUTS ===
+    # name [str]        Name of the event
+    # fn [function]     fn(t, y) -> value, the event happens when it crosses 0
+    # direction [adim]  +1 only when fn rises, -1 only when it falls, 0 both
+    # action [str]      'record' (store it and go on), 'stop' (end of the
+    #                   flight) or 'switch' (end of the phase)
+    # tol [s]           Tolerance of the time of the event
+
+    def __init__(self, name, fn, direction=0, action='record', tol=1e-9):
+        if action not in ACTIONS:
+            raise f.InputError("Fn: Event. action must be 'record', 'stop' or 'switch'.")
+        self.name = name
+        self.fn = fn
+        self.direction = direction
+        self.action = action
+        self.tol = tol
+
+    def crossed(self, ga, gb):
+        # True if the function went from ga to gb through zero, in the
+        # direction of the event.
+        if not (ga*gb < 0 or (gb == 0 and ga != 0)):
+            return False
+        return self.direction == 0 or (gb - ga)*self.direction > 0
+
+def root(fn, a, b, fa, fb, tol):
+    # The aim of this function is to find the zero of fn between a and b,
+    # where it changes sign, with the Illinois method. The end of the final
+    # bracket on the side of b is returned, so that fn has already crossed.
+    side = 0
+    for k in range(200):
+        if abs(b - a) <= tol:
+            break
+        c = b - fb*(b - a)/(fb - fa)
+        fc = fn(c)
+        if fc == 0:
+            return c
+        if (fc > 0) == (fb > 0):
+            b, fb = c, fc
+            if side == -1:
+                fa *= 0.5
+            side = -1
+        else:
+            a, fa = c, fc
+            if side == 1:
+                fb *= 0.5
+            side = 1
+    return b
+
+def detect(events, g, t, h, r, t1, y1):
+    # The aim of this function is to find the events that happened in the
+    # step [t, t1], in order of time. Only the first event that ends the
+    # phase or the flight is kept, with the events recorded before it.
+    # === INPUTS ===
+    # events [list]     Events to be checked
+    # g [list]          Value of each event function at t (updated to t1)
+    # t, h [s]          Start and length of the step
+    # r [5 x n_state]   Interpolant of the step
+    # t1, y1            Time and state at the end of the step
+    # === OUTPUTS ===
+    # hits [list]       Hits of the step
+    hits = []
+    for (k, ev) in enumerate(events):
+        ga = g[k]
+        gb = ev.fn(t1, y1)
+        g[k] = gb
+        if ev.crossed(ga, gb):
+            fn = lambda te: ev.fn(te, interpolate(r, (te - t)/h))
+            te = float(root(fn, t, t1, ga, gb, ev.tol))
+            hits.append(Hit(ev.name, te, interpolate(r, (te - t)/h), ev.action))
+    hits.sort(key=lambda hit: hit.t)
+    for (k, hit) in enumerate(hits):
+        if hit.action != 'record':
+            return hits[:k+1]
+    return hits
+
+#%% Fixed step
+
+def rk4(deriv, t0, y0, t_end, dt, out, dense=None, events=(), start=True):
+    # The aim of this function is to integrate dy/dt = deriv(t, y) from t0
+    # to t_end with the classic 4th order Runge-Kutta method, with a fixed
+    # time step. The last step is shortened to end exactly at t_end.
+    # The initial state is stored too, so a run made of several segments
+    # (e.g. one per stage) has two steps at the time of each change, unless
+    # start is False (a segment that continues the previous one).
+    # The interpolant of each step is the cubic Hermite one, from the state
+    # and its derivative at both ends.
+    # === INPUTS ===
+    # deriv [function]  Derivative of the state, deriv(t, y) -> dy
+    # t0 [s]            Initial time
+    # y0 [n_state]      Initial state
+    # t_end [s]         Final time
+    # dt [s]            Time step
+    # out [Buffer]      Buffer where the steps are stored
+    # dense [Dense]     Where the interpolants are stored (None to skip)
+    # events [list]     Events to be located (see Event)
+    # start [bool]      Store the initial state
+    # === OUTPUTS ===
+    # t [s]             Final time (time of the event that ended the segment)
+    # y [n_state]       Final state
+    # stats [dict]      nfev, naccept, nreject, h (see dopri), hits (events
+    #                   found, in order) and stop (the hit that ended the
+    #                   segment, None if it reached t_end)
+    y = np.array(y0, dtype=float)
+    t = float(t0)
+    if start:
+        out.append(t, y)
+    k1 = deriv(t, y)
+    nfev = 1
+    naccept = 0
+    hits = []
+    stop = None
+    g = [ev.fn(t, y) for ev in events]
+    # Number of steps, the tolerance avoids a tiny step due to round-off
+    n = max(math.ceil((t_end - t0)/dt - 1e-9), 0)
+    for k in range(1, n+1):
+        t1 = t0 + k*dt if k < n else t_end
+        h = t1 - t
+        k2 = deriv(t + 0.5*h, y + (0.5*h)*k1)
+        k3 = deriv(t + 0.5*h, y + (0.5*h)*k2)
+        k4 = deriv(t1, y + h*k3)
+        y1 = y + (h/6)*(k1 + 2*(k2 + k3) + k4)
+        k5 = deriv(t1, y1)
+        nfev += 4
+        naccept += 1
+        if dense is not None or events:
+            dy = y1 - y
+            bspl = h*k1 - dy
+            r = (y, dy, bspl, dy - h*k5 - bspl, np.zeros_like(y))
+            if dense is not None:
+                dense.append(t, h, r)
+            if events:
+                found = detect(events, g, t, h, r, t1, y1)
+                hits += found
+                if found and found[-1].action != 'record':
+                    stop = found[-1]
+                    t, y = stop.t, stop.y.copy()
+                    out.append(t, y)
+                    break
+        t = t1
+        y = y1
+        k1 = k5
+        out.append(t, y)
+    return t, y, {'nfev': nfev, 'naccept': naccept, 'nreject': 0, 'h': dt,
+                  'hits': hits, 'stop': stop}
+
+#%% Adaptive step
+
+# Dormand-Prince 5(4) coefficients, with the 4th order dense output of
+# Hairer, Norsett and Wanner, Solving ODEs I, Section II.6 (DOPRI5).
+dp_c = (0., 1/5, 3/10, 4/5, 8/9, 1., 1.)
+dp_a = ((),
+        (1/5,),
+        (3/40, 9/40),
+        (44/45, -56/15, 32/9),
+        (19372/6561, -25360/2187, 64448/6561, -212/729),
+        (9017/3168, -355/33, 46732/5247, 49/176, -5103/18656),
+        (35/384, 0., 500/1113, 125/192, -2187/6784, 11/84))
+# Difference between the 5th and the 4th order solutions
+dp_e = (71/57600, 0., -71/16695, 71/1920, -17253/339200, 22/525, -1/40)
+# Dense output
+dp_d = (-12715105075/11282082432, 0., 87487479700/32700410799,
+        -10690763975/1880347072, 701980252875/199316789632,
+        -1453857185/822651844, 69997945/29380423)
+
+def dopri(deriv, t0, y0, t_end, out, rtol=1e-6, atol=1e-6, h0=None,
+          h_max=np.inf, dense=None, events=(), start=True):
+    # The aim of this function is to integrate dy/dt = deriv(t, y) from t0
+    # to t_end with the Dormand-Prince 5(4) method. The step is adapted so
+    # that the estimated local error of each variable i stays below
+    # atol[i] + rtol[i]*|y[i]|. Only the accepted steps are stored in out.
+    # The initial state is stored too (see rk4).
+    # === INPUTS ===
+    # deriv [function]  Derivative of the state, deriv(t, y) -> dy
+    # t0 [s]            Initial time
+    # y0 [n_state]      Initial state
+    # t_end [s]         Final time
+    # out [Buffer]      Buffer where the steps are stored
+    # rtol [adim]       Relative tolerance (value or one per variable)
+    # atol [-]          Absolute tolerance, in the units of each variable
+    #                   (value or one per variable)
+    # h0 [s]            Initial step (estimated if None)
+    # h_max [s]         Largest step allowed
+    # dense [Dense]     Where the interpolants are stored (None to skip)
+    # events [list]     Events to be located (see Event)
+    # start [bool]      Store the initial state
+    # === OUTPUTS ===
+    # t [s]             Final time (time of the event that ended the segment)
+    # y [n_state]       Final state
+    # stats [dict]      nfev (derivative evaluations), naccept, nreject,
+    #                   h (next step, to continue the integration), hits
+    #                   and stop (see rk4)
+    y = np.array(y0, dtype=float)
+    t = float(t0)
+    if start:
+        out.append(t, y)
+    rtol = np.broadcast_to(np.asarray(rtol, dtype=float), y.shape)
+    atol = np.broadcast_to(np.asarray(atol, dtype=float), y.shape)
+    n = y.size
+    a2, a3, a4, a5, a6, a7 = dp_a[1:]
+    c2, c3, c4, c5 = dp_c[1:5]
+    e1, e2, e3, e4, e5, e6, e7 = dp_e
+    d1, d2, d3, d4, d5, d6, d7 = dp_d
+    k1 = deriv(t, y)
+    nfev = 1
+    naccept = 0
+    nreject = 0
+    hits = []
+    stop = None
+    if t_end <= t:
+        return t, y, {'nfev': nfev, 'naccept': 0, 'nreject': 0, 'h': h0,
+                      'hits': hits, 'stop': stop}
+    g = [ev.fn(t, y) for ev in events]
+    if h0 is None:
+        # Initial step (Hairer, Norsett and Wanner, Section II.4)
+        sc = atol + rtol*np.abs(y)
+        d_0 = math.sqrt(np.sum((y/sc)**2)/n)
+        d_1 = math.sqrt(np.sum((k1/sc)**2)/n)
+        h = 1e-6 if d_0 < 1e-5 or d_1 < 1e-5 else 0.01*d_0/d_1
+        h = min(h, h_max, t_end - t)
+        k2 = deriv(t + h, y + h*k1)
+        nfev += 1
+        d_2 = math.sqrt(np.sum(((k2 - k1)/sc)**2)/n)/h
+        if max(d_1, d_2) <= 1e-15:
+            h1 = max(1e-6, h*1e-3)
+        else:
+            h1 = (0.01/max(d_1, d_2))**(1/5)
+        h0 = min(100*h, h1)
+    h = min(h0, h_max)
+    while t < t_end:
+        # The last step ends exactly at t_end
+        last = t + h >= t_end
+        if last:
+            h_full = h
+            h = t_end - t
+        k2 = deriv(t + c2*h, y + h*(a2[0]*k1))
+        k3 = deriv(t + c3*h, y + h*(a3[0]*k1 + a3[1]*k2))
+        k4 = deriv(t + c4*h, y + h*(a4[0]*k1 + a4[1]*k2 + a4[2]*k3))
+        k5 = deriv(t + c5*h, y + h*(a5[0]*k1 + a5[1]*k2 + a5[2]*k3 + a5[3]*k4))
+        k6 = deriv(t + h, y + h*(a6[0]*k1 + a6[1]*k2 + a6[2]*k3 + a6[3]*k4 + a6[4]*k5))
+        y1 = y + h*(a7[0]*k1 + a7[2]*k3 + a7[3]*k4 + a7[4]*k5 + a7[5]*k6)
+        t1 = t_end if last else t + h
+        k7 = deriv(t1, y1)
+        nfev += 6
+        # Error estimate, relative to the tolerance of each variable
+        err = h*(e1*k1 + e3*k3 + e4*k4 + e5*k5 + e6*k6 + e7*k7)
+        sc = atol + rtol*np.maximum(np.abs(y), np.abs(y1))
+        E = math.sqrt(np.sum((err/sc)**2)/n)
+        if E <= 1:
+            naccept += 1
+            if dense is not None or events:
+                dy = y1 - y
+                bspl = h*k1 - dy
+                r = (y, dy, bspl, dy - h*k7 - bspl,
+                     h*(d1*k1 + d3*k3 + d4*k4 + d5*k5 + d6*k6 + d7*k7))
+                if dense is not None:
+                    dense.append(t, h, r)
+                if events:
+                    found = detect(events, g, t, h, r, t1, y1)
+                    hits += found
+                    if found and found[-1].action != 'record':
+                        stop = found[-1]
+                        t, y = stop.t, stop.y.copy()
+                        out.append(t, y)
+                        # The step proposed before shortening it
+                        if last:
+                            h = h_full
+                        break
+            t = t1
+            y = y1
+            k1 = k7                 # First Same As Last
+            out.append(t, y)
+            if last:
+                # The step proposed before shortening it, to continue later
+                h = h_full
+                break
+            h = min(h*(5. if E == 0 else min(5., 0.9*E**-0.2)), h_max)
+        else:
+            nreject += 1
+            h = h*max(0.2, 0.9*E**-0.2)
+            if h < 1e-12*max(1., abs(t)):
+                raise f.FncError('Fn: dopri. The step became too small at t = ' + str(t) + 's.')
+    return t, y, {'nfev': nfev, 'naccept': naccept, 'nreject': nreject, 'h': h,
+                  'hits': hits, 'stop': stop}
+
+#%% Integration
+
+def integrate(deriv, t0, y0, t_end, out, method='rk4', dt=0.25, rtol=1e-6,
+              atol=1e-6, h0=None, dense=None, events=(), start=True):
+    # The aim of this function is to integrate a segment of the flight with
+    # the method of choice, so that the code that runs the segments does
+    # not depend on it.
+    # === INPUTS ===
+    # method [str]      'rk4' (fixed step dt) or 'dopri' (adaptive step,
+    #                   with rtol, atol and h0, see dopri)
+    # Others            See rk4 and dopri
+    # === OUTPUTS ===
+    # t [s]             Final time
+    # y [n_state]       Final state
+    # stats [dict]      See rk4 and dopri
+    if method == 'rk4':
+        return rk4(deriv, t0, y0, t_end, dt, out, dense, events, start)
+    if method == 'dopri':
+        return dopri(deriv, t0, y0, t_end, out, rtol, atol, h0, dense=dense,
+                     events=events, start=start)
+    raise f.InputError("Fn: integrate. method must be 'rk4' or 'dopri'.")
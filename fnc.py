@@ -1,462 +1,973 @@
-#%% Script information
-# Name: fnc.py
-# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
-# Owner: LIA Aerospace
-#
-#%% Script description
-#
-# The aim of this module is defining functions to be used in the simulation.
-#
-#%% Packages
-import numpy as np
-import c as c
-
-#%% Atmospheric properties
-
-# This block implements the US Standard Atmosphere 1976 model.
-# As of 24Aug2020, only the 0-76km portion of the model is implemented.
-
-def layer(H: float)->float: 
-    # The aim of this function is to define which layer is the vehicle
-    # currently flying through (according to Table 4 of the Standard)
-    # === INPUTS ===
-    # H [m'] - Geopotential height
-    # === OUTPUTS === 
-    # b [adim] - Subscript of the layer
-    #
-    # Input control
-    try:
-        int(H)
-    except ValueError:
-        try:
-            float(H)
-        except ValueError:
-            print("Fn: layer. Input must be a number.")
-            return
-    # Cases
-    if H>=0 and H<11000:
-        b = 0
-    elif H>=11000 and H<20000:    
-        b = 1
-    elif H>=20000 and H<32000:
-        b = 2
-    elif H>=32000 and H<47000:
-        b = 3
-    elif H>=47000 and H<51000:
-        b = 4
-    elif H>=51000 and H<71000:
-        b = 5  
-    elif H>=71000 and H<84852:
-        b = 6
-    elif H==84852:
-        b = 7
-    else: 
-        print('Fn: Layer. H must be a value between 0 and 84852m')
-        b = 'Error - Check H'
-        return
-    return b
-        
-def table4(Z: float):
-    # The aim of this function is to define   the constants provided by 
-    # Table 4 given the current geometrical height at which the vehicle is.
-    # === INPUTS ===
-    # Z [m] - Geometric height
-    # === OUTPUTS === 
-    # b [adim]      Subscript of the layer
-    # Lmb [K/km']   Molecular-scale temperature gradient (Table 4)
-    # Tmb [K]       Temperature constant
-    # Hb [km']      Geopotential Height of the layer    (Table 4)
-    # H [km']       Geopotential Height of the vehicle
-    # Pb [N/m^2]    Pressure constant 
-    # Input control
-    try:
-        int(Z)
-    except ValueError:
-        try:
-            float(Z)
-        except ValueError:
-            print("Fn: table4. Input must be a number.")
-            return
-    # The layer is defined.
-    ro = 6356.766 * 10**3      # [m] - Earth's radius - (Page 4)
-    H = (Z*ro) / (ro + Z)      # [m'] - Geopotential height of the vehicle
-    b = layer(H)               # [adim] - Subscript of the layer
-    # Verifying b
-    if b==None:
-        print('Fn: table4. Z must be a value between 0m and 85999m.')
-        return
-    H = H*0.001               # [km'] - Geopotential height of the vehicle
-    Hb_vec = np.array([0, 11, 20, 32, 47, 51, 71, 84.852])
-    Lmb_vec = np.array([-6.5, 0, 1, 2.8, 0, -2.8, -2, 0])
-    Tmb_vec = np.array([288.15, 216.65, 216.65, 228.65, 270.65, 270.65, 214.65, 186.946])
-    pb_vec = np.array([101325, 22632.06, 5474.88, 868.01, 110.90, 66.93, 3.95])
-    Hb = Hb_vec[b]
-    Lmb = Lmb_vec[b]
-    Tmb = Tmb_vec[b]
-    Pb = pb_vec[b]
-    return b, Lmb, Tmb, Hb, H, Pb
-
-def tm(Tmb,Lmb,H,Hb):
-    # The aim of this function is to estimate the Tm value according to
-    # equation (23) of the US Standard Atmosphere 1976.
-    # This function gives the temperature for the range 0-76km.
-    # === INPUTS ===
-    # Tmb [K]       Temperature constant
-    # Lmb [K/km']   Molecular-scale temperature gradient
-    # H [km']       Geopotential height of interest
-    # Hb [km']      Geopotential Height for the particular layer (Table 4)
-    # === OUTPUTS === 
-    # Tm [K]     Temperature at given geopotential height H
-    Tm = Tmb + Lmb*(H-Hb)     #  [K] - Temperature at given geopotential height H
-    return Tm
-
-def p(Tmb,Lmb,H,Hb,Pb):
-    # The aim of this function is to estimate the pressure value according to
-    # equation (33a 33b) of the US Standard Atmosphere 1976.
-    # This function gives the pressure for the range 0-76km.
-    # === INPUTS ===
-    # Tmb [K]       Temperature constant
-    # Lmb [K/km']   Molecular-scale temperature gradient
-    # H [km']       Geopotential height of interest
-    # Hb [km']      Geopotential Height for the particular layer (Table 4)
-    # Pb [N/m^2]    Pressure constant
-    # === OUTPUTS === 
-    # P [N/m^2]     Pressure at given geopotential height H
-    # === CONSTANTS ===
-    go = 9.80665                # [m^2/s^2.m] - Gravity @ SL (Page 2)
-    R = 8.31432 * 10**3         # [Nm / (kmol.K)] - Gas constant (Page 2)
-    Mo = 28.9644                # [kg/kmol] - Mean Molecular Weight - (Page 9)
-    if Lmb!=0:
-        P = Pb*(Tmb / (Tmb + (Lmb*(H-Hb))))**((go*Mo*1000)/(R*Lmb))
-    elif Lmb==0:
-        P = Pb*np.exp((-go*Mo*(H-Hb)*1000)/(R*Tmb))
-    return P
-
-def rho(P,Tm):
-    # The aim of this function is to estimate the density value according to
-    # equation (42) of the US Standard Atmosphere 1976.
-    # This function provides the density for the range 0-86km.
-    # === INPUTS ===
-    # Tm [K]           Temperature at given geopotential height H
-    # P [N/m^2]        Pressure at given geopotential height H
-    # === OUTPUTS === 
-    # rho [kg/m^3]     Density at given geopotential height H
-    # === CONSTANTS ===
-    R = 8.31432 * 10**3        # [Nm / (kmol.K)] - Gas constant (Page 2)
-    Mo = 28.9644               # [kg/kmol] - Mean Molecular Weight - (Page 9)
-    rho = (P*Mo)/(R*Tm)        # [kg/m^3]  - Density (Eq 42)
-    return rho
-    
-def Vs(Tm):
-    # The aim of this function is to estimate the speed of sound value 
-    # according to equation (50) of the US Standard Atmosphere 1976.
-    # This function provides the speed of sound for the range 0-86km.
-    # Applies only when the sound wave is a small perturbation on the 
-    # ambient condition.
-    # === INPUTS ===
-    # Tm [K]          Temperature at given geopotential height H
-    # === OUTPUTS === 
-    # Vs [m/s]     Speed of sound at given temperature Tm(H)
-    # === CONSTANTS ===
-    R = 8.31432 * 10**3         # [Nm / (kmol.K)] - Gas constant (Page 2)
-    Mo = 28.9644                # [kg/kmol] - Mean Molecular Weight - (Page 9)
-    gamma = 1.4                 # [adim] - Ratio of Cp/Cv
-    Vs = ((gamma*R*Tm)/Mo)**0.5 # [m/s] - Local speed of sound
-    return Vs
-
-def visc(Tm,rho):
-    # The aim of this function is to estimate the dynamic and kinematic 
-    # viscosity according to equations (51 and 52) of the US 
-    # Standard Atmosphere 1976.
-    # This function provides the speed of sound for the range 0-86km.
-    # According to p10 of this standard, Tm = T for the 0-80km range.
-    # From 80 to 86 the difference is very small. 
-    # === INPUTS ===
-    # Tm [K]          Temperature at given geopotential height H    
-    # rho [km/m^3]    Density at given geopotential height H
-    # === OUTPUTS === 
-    # dvisc [N.s/m^2]              Dynamic Viscosity 
-    # kvisc [m^2/s]                Kinematic Viscosity
-    # === CONSTANTS ===
-    beta = 1.458*10**-6         # [kg/s.m.K^0.5] - "Constant"
-    S = 110.4                   # [K] - Sutherland's constant
-    dvisc = (beta*Tm**1.5)/(Tm+S) # [N.s/m^2] - Dynamic viscosity
-    kvisc = dvisc/rho           # [m^2/s] - Kinematic Viscosity    
-    return dvisc, kvisc
-
-def g(Z):
-    # The aim of this function is to estimate the acceleration due to gravity
-    # for a given geometric height, according to eq (17) of the US Standard
-    # Atmosphere 1976.
-    # === INPUT ===
-    # Z [m]         Geometric height of interest
-    # === OUTPUT ===
-    # g [m/s^2]     Acceleration due to gravity at given Z
-    # === CONSTANTS === (Page 8 of the Standard)
-    ro = 6356766    # [m] - Effective radius of the earth at a certain latitude
-    go = 9.80665    # [m/s^2] - Sea level value of the acceleration of gravity
-    # Input control
-    try:
-        int(Z)
-    except ValueError:
-        try:
-            float(Z)
-        except ValueError:
-            print("Fn: g. Input must be a number.")
-            return
-    if Z<0:
-        print('Fn: g. Input must be positive.')
-        return
-    g = go * (ro / (ro+Z))**2
-    return g
-#%% Flight
-
-# This block implements the different functions required for the
-# simulation.py file to be able to simulate the flight of the launch 
-# vehicle. Functions' assumptions and sources are documented in detail
-# the Flight (Jupyter Notebook) document.
-
-def mach(V,Vs):
-    # The aim of this function is to calculate the local Mach number at the 
-    # instant of interest.
-    # === INPUTS ===
-    # V [m/s]                   Local flow velocity 
-    # Vs [m/s]                  Speed of sound in the medium at the local temperature
-    # === OUTPUTS ===
-    # M [adim]                  Local Mach Number
-    M = V/Vs                    # [adim] - Local Mach Number
-    return M
-
-def re(V,kvisc,L):
-    # The aim of this function is to calculate the local Reynolds number
-    # at the instant of interest
-    # === INPUTS ===
-    # V [m/s]                   Local flow velocity    
-    # kvisc [m^2/s]             Kinematic Viscosity
-    # L [m]                     Characteristic length
-    # === OUTPUTS ===
-    # re [adim]                 Local Reynolds Number
-    re = V * L / kvisc          # Local Reynolds Number
-    return re
-
-def thrust(m_dot,Ve,Pe,Po):
-    # The aim of this function is to calculate the generated thrust
-    # at the instant of interest. 
-    # === INPUTS ===
-    # m_dot [kg/s]              Mass flow of propellant being expelled
-    # Ve [m/s]                  Exhaust velocity of the gases
-    # Pe [N/m^2]                Exhaust pressure
-    # Po [N/m^2]                Pressure outside the noZZle
-    # === OUTPUTS ===
-    # thrust [N]                Thrust
-    # === CONSTANTS ===
-    # c.Ae [m^2]                NoZZle exit surface
-    thrust = m_dot*Ve + (Pe - Po)*c.Ae   
-    return thrust
-
-#%% Coordinate Systems
-
-# This block implements the different functions required to transform
-# the different tensors from one coordinate system to another.
-# Source: Zipfel.
-
-def Tge(long,lat):
-    # The aim of this function is to calculate the transformation matrix 
-    # between the geographical and Earth coordinate systems. 
-    # Zipfel (3.13)
-    # === INPUTS ===
-    # long [rad]              longitude
-    # lat [rad]               Latitude
-    # === OUTPUTS ===
-    # tge [3x3 mat]           T_GE
-    # Create the basic values
-    slon = np.sin(long)
-    clon = np.cos(long)
-    slat = np.sin(lat)
-    clat = np.cos(lat)
-    # Create 9 positions
-    ind11 = -slat*clon; 
-    ind12 = -slat*slon
-    ind13 = clat
-    ind21 = -slon
-    ind22 = clat
-    ind23 = 0
-    ind31 = -clat*clon
-    ind32 = -clat*slon
-    ind33 = -slon
-    # Create the matrix itself
-    tge = np.array([[ind11, ind12, ind13],[ind21, ind22, ind23],[ind31, ind32, ind33]])  
-    return tge
-
-def Tei(hangle):
-    # The aim of this function is to calculate the transformation matrix 
-    # between the Earth and inertial coordinate systems. 
-    # Zipfel (3.12)
-    # === INPUTS ===
-    # hangle [rad]            Hour angle
-    # === OUTPUTS ===
-    # tei [3x3 mat]           T_EI
-    # Create the basic values
-    sha = np.sin(hangle)
-    cha = np.cos(hangle)
-    # Create 9 positions
-    ind11 = cha
-    ind12 = sha
-    ind13 = 0
-    ind21 = -sha
-    ind22 = cha
-    ind23 = 0
-    ind31 = 0
-    ind32 = 0
-    ind33 = 1
-    # Create the matrix itself
-    tei = np.array([[ind11, ind12, ind13],[ind21, ind22, ind23],[ind31, ind32, ind33]])  
-    return tei
-
-def Tmv(bang):
-    # The aim of this function is to calculate the transformation matrix 
-    # between the load factor and velocity coordinate systems. 
-    # Zipfel (8.22)
-    # === INPUTS ===
-    # bang [rad]              Bank Angle
-    # === OUTPUTS ===
-    # tmv [3x3 mat]           T_MV
-    # Create the basic values
-    sba = np.sin(bang)
-    cba = np.cos(bang)
-    # Create 9 positions
-    ind11 = 1 
-    ind12 = 0
-    ind13 = 0
-    ind21 = 0
-    ind22 = -cba
-    ind23 = sba
-    ind31 = 0
-    ind32 = -sba
-    ind33 = cba
-    # Create the matrix itself
-    tmv = np.array([[ind11, ind12, ind13],[ind21, ind22, ind23],[ind31, ind32, ind33]])  
-    return tmv
-
-def Tvg(gamma,chi):
-    # The aim of this function is to calculate the transformation matrix 
-    # between the flight path and geographic coordinate systems. 
-    # Zipfel (3.25)
-    # === INPUTS ===
-    # gamma [rad]              Heading Angle
-    # chi [rad]                Flight Path Angle
-    # === OUTPUTS ===
-    # tvg [3x3 mat]            T_VG
-    # Create the basic values
-    schi = np.sin(chi)
-    cchi = np.cos(chi)
-    sgamma = np.sin(gamma)
-    cgamma = np.cos(gamma)
-    # Create 9 positions
-    ind11 = cchi*cgamma 
-    ind12 = cgamma*schi
-    ind13 = -sgamma
-    ind21 = -schi
-    ind22 = -cchi
-    ind23 = 0
-    ind31 = sgamma*cchi
-    ind32 = sgamma*schi
-    ind33 = cchi
-    # Create the matrix itself
-    tvg = np.array([[ind11, ind12, ind13],[ind21, ind22, ind23],[ind31, ind32, ind33]])  
-    return tvg
-
-def date_now():
-    # The aim of this function is to return the date at time of invoking it.
-    # === INPUTS ===
-    # 
-    # === OUTPUTS ===
-    # date [datetime]           UTC Date at time of function invoking
-    # Function
-    from datetime import datetime
-    # date = datetime.now()     Local date
-    date = datetime.utcnow()    # UTC Date 
-    return date
-
-def date_parts(date_in):
-    # The aim of this function is to return the different values stored in the 
-    # input datetime value.
-    # === INPUTS ===
-    # date_in [datetime]       Input date
-    # === OUTPUTS ===
-    # yr [int]                 Year on input date
-    # m [int]                  Month on input date
-    # d [int]                  Day on input date
-    # h [int]                  Hour on input date
-    # m [int]                  Minute on input date
-    # s [int]                  Second on input date
-    yr = date_in.year
-    mo = date_in.month
-    d = date_in.day
-    h = date_in.hour
-    m = date_in.minute
-    s = date_in.second
-    return yr, mo, d, h, m, s
-
-def JD(yr,mo,d,h,min,s):
-    # The aim of this function is to calculate the Julian Date 
-    # Source: Vallado, Algorithm #14
-    # Unless specified, JD usually implies a time based on UT1
-    # Equation valid from years 1900 to 2100
-    # === INPUTS ===
-    # yr [adim]                Year of interest
-    # mo [adim]                Month of interest (1 to 12)
-    # d [adim]                 Day of interest (1 to 31)
-    # h [adim]                 Hour of interest (0 to 23)
-    # min [adim]               Min of interest (0 to 59)
-    # s [adim]                 Seconds of interest (0 to 59)
-    # === OUTPUTS ===
-    # jdate [adim]             Julian Date
-    # Function
-    jdate = 367*yr - int((7*(yr+int((mo+9)/12)))/4) + int((275*mo)/9) + d + 1721013.5 + ((((s/60)+min)/60) + h)/24
-    return jdate
-
-def jd2tjd(jdate):
-    # The aim of this function is to calculate the number of Julian centuries 
-    # elapsed from the epoch J2000.0. 
-    # Source: Vallado, Eq. (3.42)
-    # Equation valid for epoch J2000.0, see p.183 for other epochs
-    # === INPUTS ===
-    # jdate [julian date]     Julian date, as provided by function JD
-    # === OUTPUTS ===
-    # Function
-    # tjdate [centuries]      Julian centuries elapsed since J2000.0 epoch
-    tjdate = (jdate - 2451545)/36525
-    return tjdate
-
-def tjd2gmst(tjdate):
-    # The aim of this function is to calculate the Greenwich Mean Sidereal Time
-    # given the number of Julian centuries elapsed from the epoch J2000.0.
-    # Source: Vallado, Eq. (3.47)
-    # === INPUTS ===
-    # tjdate [centuries]      Julian centuries elapsed since J2000.0 epoch
-    # === OUTPUTS ===
-    # gmst_s [s]              GMST in seconds
-    # gmst_d [°]              GMST in degrees
-    # Function
-    gmst_s = 67310.54841 + (876600*3600 + 8640184.812866)*tjdate + 0.093104*tjdate**2 - 6.2*10**-6* (tjdate**3)
-    # Reduce this quantity to a result within the range of 86400s
-    secs_day = 86400
-    gmst_aux = gmst_s % secs_day
-    # Convert to degrees
-    gmst_d = gmst_aux / 240
-    # Convert to an angle in the 0-360 range
-    if gmst_d < 0:
-        gmst_d += 360   
-    return gmst_s, gmst_d
-
-def add_timestep(date,timestep):
-    # The aim of this function is to add a given timestep to a given date.
-    # === INPUTS ===
-    # date [datetime]       Initial time
-    # timestep [timedelta]  Timestep to be added
-    # === OUTPUTS ===
-    # date_out [datetime]   Final time
-    # Function
-    date_out = date + timestep
+#%% Script information
+# Name: fnc.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is defining functions to be used in the simulation.
+#
+#%% Packages
+import math
+from bisect import bisect_right
+from collections import namedtuple
+import numpy as np
+import c as c
+
+#%% Input control
+
+# Every function of this module can validate its inputs before using them
+# (checked mode), raising one of the exceptions below when they are wrong.
+# Validation can be skipped (unchecked mode) for the whole module with
+# set_checked(False), or for a single call with checked=False. The
+# unchecked mode is meant for the integrator loop, where the inputs are
+# known to be valid and the checks would only cost time.
+
+class FncError(Exception):
+    # Base class of the errors raised by the functions of this module.
+    pass
+
+class InputError(FncError, TypeError):
+    # An input is not a number, or is not of the expected type.
+    pass
+
+class RangeError(FncError, ValueError):
+    # An input is outside the range where the function is defined.
+    pass
+
+class AltitudeError(RangeError):
+    # A height is outside the range of the atmospheric model.
+    pass
+
+CHECKED = True                  # Mode used when checked=None
+
+def set_checked(flag):
+    # The aim of this function is to select the mode of the whole module.
+    # === INPUTS ===
+    # flag [bool]      True for the checked mode, False for the unchecked one
+    # === OUTPUTS ===
+    # old [bool]       Previous mode, so that it can be restored
+    global CHECKED
+    old = CHECKED
+    CHECKED = bool(flag)
+    return old
+
+def number(fn, x, name='Input'):
+    # The aim of this function is to convert an input into a float (or an
+    # array of floats), raising InputError if it is not a number.
+    try:
+        return np.asarray(x, dtype=float)
+    except (ValueError, TypeError):
+        raise InputError('Fn: '+fn+'. '+name+' must be a number.') from None
+
+def positive(fn, x, name='Input'):
+    # Same as number, also raising RangeError if any value is not positive.
+    x = number(fn, x, name)
+    if not np.all(x>0):
+        raise RangeError('Fn: '+fn+'. '+name+' must be positive.')
+    return x
+
+#%% Atmospheric properties
+
+# This block implements the US Standard Atmosphere 1976 model.
+# The 0-86km portion follows Table 4 of the Standard, one equation at a 
+# time. The 86-1000km portion is implemented in the Upper atmosphere block.
+# Every function in this block accepts either a single value or a NumPy
+# array of values, and returns results with the same shape as its input.
+
+# Lower boundaries of the layers of Table 4, in geopotential meters. The
+# last value is the top of the 0-86km portion of the model.
+Hb_layer = np.array([0, 11000, 20000, 32000, 47000, 51000, 71000, 84852])
+# Table 4 constants, indexed by the subscript of the layer b.
+Hb_vec = np.array([0, 11, 20, 32, 47, 51, 71, 84.852])                 # [km']
+Lmb_vec = np.array([-6.5, 0, 1, 2.8, 0, -2.8, -2, 0])                  # [K/km']
+Tmb_vec = np.array([288.15, 216.65, 216.65, 228.65, 270.65, 270.65, 214.65, 186.946]) # [K]
+pb_vec = np.array([101325, 22632.06, 5474.88, 868.01, 110.90, 66.93, 3.95, 0.3734]) # [N/m^2]
+
+def layer(H: float, checked=None)->float: 
+    # The aim of this function is to define which layer is the vehicle
+    # currently flying through (according to Table 4 of the Standard)
+    # The layer is found with a sorted search over the Table 4 breakpoints.
+    # === INPUTS ===
+    # H [m'] - Geopotential height (value or array)
+    # checked [bool] - Input control (None to use the mode of the module)
+    # === OUTPUTS === 
+    # b [adim] - Subscript of the layer (value or array)
+    #
+    # Input control
+    if CHECKED if checked is None else checked:
+        H = number('layer', H)
+        if not np.all((H>=0) & (H<=84852)):
+            raise AltitudeError('Fn: Layer. H must be a value between 0 and 84852m')
+    # Cases - H==84852 falls on the last breakpoint, i.e. b = 7
+    b = np.searchsorted(Hb_layer, H, side='right') - 1
+    if b.ndim == 0:
+        return int(b)
+    return b
+        
+def table4(Z: float, checked=None):
+    # The aim of this function is to define   the constants provided by 
+    # Table 4 given the current geometrical height at which the vehicle is.
+    # === INPUTS ===
+    # Z [m] - Geometric height (value or array)
+    # checked [bool] - Input control (None to use the mode of the module)
+    # === OUTPUTS === 
+    # b [adim]      Subscript of the layer
+    # Lmb [K/km']   Molecular-scale temperature gradient (Table 4)
+    # Tmb [K]       Temperature constant
+    # Hb [km']      Geopotential Height of the layer    (Table 4)
+    # H [km']       Geopotential Height of the vehicle
+    # Pb [N/m^2]    Pressure constant 
+    # Input control
+    ro = 6356.766 * 10**3      # [m] - Earth's radius - (Page 4)
+    if CHECKED if checked is None else checked:
+        Z = number('table4', Z)
+        if not np.all((Z>=0) & ((Z*ro) / (ro + Z)<=84852)):
+            raise AltitudeError('Fn: table4. Z must be a value between 0m and 85999m.')
+    # The layer is defined.
+    H = (Z*ro) / (ro + Z)      # [m'] - Geopotential height of the vehicle
+    b = layer(H, False)        # [adim] - Subscript of the layer
+    H = H*0.001               # [km'] - Geopotential height of the vehicle
+    Hb = Hb_vec[b]
+    Lmb = Lmb_vec[b]
+    Tmb = Tmb_vec[b]
+    Pb = pb_vec[b]
+    if np.ndim(H) == 0:
+        H = float(H)
+    return b, Lmb, Tmb, Hb, H, Pb
+
+def tm(Tmb,Lmb,H,Hb,checked=None):
+    # The aim of this function is to estimate the Tm value according to
+    # equation (23) of the US Standard Atmosphere 1976.
+    # This function gives the temperature for the range 0-76km.
+    # === INPUTS ===
+    # Tmb [K]       Temperature constant
+    # Lmb [K/km']   Molecular-scale temperature gradient
+    # H [km']       Geopotential height of interest
+    # Hb [km']      Geopotential Height for the particular layer (Table 4)
+    # checked [bool] Input control (None to use the mode of the module)
+    # === OUTPUTS === 
+    # Tm [K]     Temperature at given geopotential height H
+    if CHECKED if checked is None else checked:
+        Tmb = positive('tm', Tmb, 'Tmb')
+        Lmb = number('tm', Lmb, 'Lmb')
+        H = number('tm', H, 'H')
+        Hb = number('tm', Hb, 'Hb')
+    Tm = Tmb + Lmb*(H-Hb)     #  [K] - Temperature at given geopotential height H
+    return Tm
+
+def p(Tmb,Lmb,H,Hb,Pb,checked=None):
+    # The aim of this function is to estimate the pressure value according to
+    # equation (33a 33b) of the US Standard Atmosphere 1976.
+    # This function gives the pressure for the range 0-76km.
+    # Gradient (33a) and isothermal (33b) layers are evaluated with masks,
+    # so arrays may mix both kinds of layers.
+    # === INPUTS ===
+    # Tmb [K]       Temperature constant
+    # Lmb [K/km']   Molecular-scale temperature gradient
+    # H [km']       Geopotential height of interest
+    # Hb [km']      Geopotential Height for the particular layer (Table 4)
+    # Pb [N/m^2]    Pressure constant
+    # checked [bool] Input control (None to use the mode of the module)
+    # === OUTPUTS === 
+    # P [N/m^2]     Pressure at given geopotential height H
+    # === CONSTANTS ===
+    go = 9.80665                # [m^2/s^2.m] - Gravity @ SL (Page 2)
+    R = 8.31432 * 10**3         # [Nm / (kmol.K)] - Gas constant (Page 2)
+    Mo = 28.9644                # [kg/kmol] - Mean Molecular Weight - (Page 9)
+    if CHECKED if checked is None else checked:
+        Tmb = positive('p', Tmb, 'Tmb')
+        Lmb = number('p', Lmb, 'Lmb')
+        H = number('p', H, 'H')
+        Hb = number('p', Hb, 'Hb')
+        Pb = positive('p', Pb, 'Pb')
+    elif all(isinstance(v, (int, float)) for v in (Tmb,Lmb,H,Hb,Pb)):
+        # Single value, without input control (arrays go through the masks)
+        if Lmb!=0:
+            return Pb*(Tmb / (Tmb + (Lmb*(H-Hb))))**((go*Mo*1000)/(R*Lmb))
+        return Pb*math.exp((-go*Mo*(H-Hb)*1000)/(R*Tmb))
+    Tmb, Lmb, H, Hb, Pb = np.broadcast_arrays(*[np.asarray(v, dtype=float) 
+                                                for v in (Tmb,Lmb,H,Hb,Pb)])
+    P = np.empty(Lmb.shape)
+    grad = Lmb!=0               # Layers with a temperature gradient (33a)
+    iso = ~grad                 # Isothermal layers (33b)
+    P[grad] = Pb[grad]*(Tmb[grad] / (Tmb[grad] + (Lmb[grad]*(H[grad]-Hb[grad]))))\
+              **((go*Mo*1000)/(R*Lmb[grad]))
+    P[iso] = Pb[iso]*np.exp((-go*Mo*(H[iso]-Hb[iso])*1000)/(R*Tmb[iso]))
+    return P[()]
+
+def rho(P,Tm,checked=None):
+    # The aim of this function is to estimate the density value according to
+    # equation (42) of the US Standard Atmosphere 1976.
+    # This function provides the density for the range 0-86km.
+    # === INPUTS ===
+    # Tm [K]           Temperature at given geopotential height H
+    # P [N/m^2]        Pressure at given geopotential height H
+    # checked [bool]   Input control (None to use the mode of the module)
+    # === OUTPUTS === 
+    # rho [kg/m^3]     Density at given geopotential height H
+    # === CONSTANTS ===
+    R = 8.31432 * 10**3        # [Nm / (kmol.K)] - Gas constant (Page 2)
+    Mo = 28.9644               # [kg/kmol] - Mean Molecular Weight - (Page 9)
+    if CHECKED if checked is None else checked:
+        P = positive('rho', P, 'P')
+        Tm = positive('rho', Tm, 'Tm')
+    rho = (P*Mo)/(R*Tm)        # [kg/m^3]  - Density (Eq 42)
+    return rho
+    
+def Vs(Tm,checked=None):
+    # The aim of this function is to estimate the speed of sound value 
+    # according to equation (50) of the US Standard Atmosphere 1976.
+    # This function provides the speed of sound for the range 0-86km.
+    # Applies only when the sound wave is a small perturbation on the 
+    # ambient condition.
+    # === INPUTS ===
+    # Tm [K]          Temperature at given geopotential height H
+    # checked [bool]  Input control (None to use the mode of the module)
+    # === OUTPUTS === 
+    # Vs [m/s]     Speed of sound at given temperature Tm(H)
+    # === CONSTANTS ===
+    R = 8.31432 * 10**3         # [Nm / (kmol.K)] - Gas constant (Page 2)
+    Mo = 28.9644                # [kg/kmol] - Mean Molecular Weight - (Page 9)
+    gamma = 1.4                 # [adim] - Ratio of Cp/Cv
+    if CHECKED if checked is None else checked:
+        Tm = positive('Vs', Tm, 'Tm')
+    Vs = ((gamma*R*Tm)/Mo)**0.5 # [m/s] - Local speed of sound
+    return Vs
+
+def visc(Tm,rho,checked=None):
+    # The aim of this function is to estimate the dynamic and kinematic 
+    # viscosity according to equations (51 and 52) of the US 
+    # Standard Atmosphere 1976.
+    # This function provides the speed of sound for the range 0-86km.
+    # According to p10 of this standard, Tm = T for the 0-80km range.
+    # From 80 to 86 the difference is very small. 
+    # === INPUTS ===
+    # Tm [K]          Temperature at given geopotential height H    
+    # rho [km/m^3]    Density at given geopotential height H
+    # checked [bool]  Input control (None to use the mode of the module)
+    # === OUTPUTS === 
+    # dvisc [N.s/m^2]              Dynamic Viscosity 
+    # kvisc [m^2/s]                Kinematic Viscosity
+    # === CONSTANTS ===
+    beta = 1.458*10**-6         # [kg/s.m.K^0.5] - "Constant"
+    S = 110.4                   # [K] - Sutherland's constant
+    if CHECKED if checked is None else checked:
+        Tm = positive('visc', Tm, 'Tm')
+        rho = positive('visc', rho, 'rho')
+    dvisc = (beta*Tm**1.5)/(Tm+S) # [N.s/m^2] - Dynamic viscosity
+    kvisc = dvisc/rho           # [m^2/s] - Kinematic Viscosity    
+    return dvisc, kvisc
+
+def g(Z,checked=None):
+    # The aim of this function is to estimate the acceleration due to gravity
+    # for a given geometric height, according to eq (17) of the US Standard
+    # Atmosphere 1976.
+    # === INPUT ===
+    # Z [m]         Geometric height of interest (value or array)
+    # checked [bool] Input control (None to use the mode of the module)
+    # === OUTPUT ===
+    # g [m/s^2]     Acceleration due to gravity at given Z
+    # === CONSTANTS === (Page 8 of the Standard)
+    ro = 6356766    # [m] - Effective radius of the earth at a certain latitude
+    go = 9.80665    # [m/s^2] - Sea level value of the acceleration of gravity
+    # Input control
+    if CHECKED if checked is None else checked:
+        Z = number('g', Z)
+        if not np.all(Z>=0):
+            raise AltitudeError('Fn: g. Input must be positive.')
+        return (go * (ro / (ro+Z))**2)[()]
+    g = go * (ro / (ro+Z))**2
+    return g
+
+#%% Upper atmosphere
+
+# This block implements the 86-1000km portion of the US Standard Atmosphere
+# 1976 model. The kinetic temperature is defined by four segments (eqs 
+# 25 to 31) and the number densities of N2, O, O2, Ar, He and H are 
+# obtained by integrating the diffusion equations (eqs 32 to 40) once, 
+# over a fine grid. The results are kept as piecewise linear segments of
+# T, ln(P) and ln(rho), so that querying the upper atmosphere costs about
+# the same as querying the lower one. Species order: N2, O, O2, Ar, He, H.
+up_Z7 = 86.                        # [km] - Bottom of the upper atmosphere
+up_Z12 = 1000.                     # [km] - Top of the model
+up_r0 = 6356.766                   # [km] - Earth's radius (Page 4)
+up_T7 = 186.8673                   # [K] - Kinetic temperature at 86km
+up_Tc = 263.1905                   # [K] - Constants of the elliptical 
+up_A = -76.3232                    # [K]   segment, 91-110km (eq 27)
+up_a = -19.9429                    # [km]
+up_T10 = 360.                      # [K] - Temperature at 120km
+up_Tinf = 1000.                    # [K] - Exospheric temperature
+up_lmb = 0.01875                   # [1/km] - Constant of eq (31)
+up_k = 1.380622 * 10**-23          # [N.m/K] - Boltzmann constant (Page 2)
+up_NA = 6.022169 * 10**26          # [1/kmol] - Avogadro constant (Page 2)
+up_M = np.array([28.0134, 15.9994, 31.9988, 39.948, 4.0026, 1.00797]) # [kg/kmol]
+up_n7 = np.array([1.129794e20, 8.6e16, 3.030898e19, 1.3514e18, 7.5817e14]) # [1/m^3]
+up_alpha = np.array([0, 0, 0, 0, -0.40, -0.25])    # [adim] - Thermal diffusion
+up_ai = np.array([0, 6.986e20, 4.863e20, 4.487e20, 1.7e21, 3.305e21]) # [1/m.s]
+up_bi = np.array([0, 0.750, 0.750, 0.870, 0.691, 0.500])   # [adim]
+up_Q = np.array([0, -5.809644e-4, 1.366212e-4, 9.434079e-5, -2.457369e-4]) # [1/km^3]
+up_U = np.array([0, 56.90311, 86., 86., 86.])              # [km]
+up_W = np.array([0, 2.706240e-5, 8.333333e-5, 8.333333e-5, 6.666667e-4]) # [1/km^3]
+up_nH11 = 8.0e10                   # [1/m^3] - Hydrogen density at 500km
+up_phi = 7.2e11                    # [1/m^2.s] - Hydrogen vertical flux
+up_dz = 0.1                        # [km] - Length of the segments
+up_seg = None                      # Segments, built on first use
+
+def up_temperature(Z):
+    # The aim of this function is to estimate the kinetic temperature and
+    # its gradient in the 86-1000km range, eqs (25) to (31) of the Standard.
+    # === INPUTS ===
+    # Z [km]          Geometric height (array)
+    # === OUTPUTS ===
+    # T [K]           Kinetic temperature
+    # dT [K/km]       Temperature gradient
+    T = np.empty(Z.shape)
+    dT = np.zeros(Z.shape)
+    m = Z<91                                   # Isothermal (eq 25)
+    T[m] = up_T7
+    m = (Z>=91) & (Z<110)                      # Elliptical (eq 27)
+    x = (Z[m]-91)/up_a
+    s = np.sqrt(1-x*x)
+    T[m] = up_Tc + up_A*s
+    dT[m] = -up_A*x/(up_a*s)
+    m = (Z>=110) & (Z<120)                     # Linear (eq 29)
+    T[m] = 240 + 12*(Z[m]-110)
+    dT[m] = 12
+    m = Z>=120                                 # Exponential (eq 31)
+    xi = (Z[m]-120)*(up_r0+120)/(up_r0+Z[m])
+    e = np.exp(-up_lmb*xi)
+    T[m] = up_Tinf - (up_Tinf-up_T10)*e
+    dT[m] = up_lmb*(up_Tinf-up_T10)*((up_r0+120)/(up_r0+Z[m]))**2*e
+    return T, dT
+
+def up_integral(f, h):
+    # Cumulative integral of f over a grid of spacing h (trapezoidal rule)
+    return np.concatenate(([0], np.cumsum(0.5*h*(f[1:]+f[:-1]))))
+
+def up_density(h=0.01):
+    # The aim of this function is to integrate the number densities of the
+    # species over the 86-1000km range, as described in the Standard.
+    # === INPUTS ===
+    # h [km]          Integration step
+    # === OUTPUTS ===
+    # Z [km]          Geometric height of the grid
+    # T [K]           Kinetic temperature
+    # n [1/m^3]       Number densities (6 x N)
+    # === CONSTANTS ===
+    go = 9.80665                # [m/s^2] - Gravity @ SL (Page 2)
+    R = 8.31432 * 10**3         # [Nm / (kmol.K)] - Gas constant (Page 2)
+    Mo = 28.9644                # [kg/kmol] - Mean Molecular Weight - (Page 9)
+    Z = np.linspace(up_Z7, up_Z12, int(round((up_Z12-up_Z7)/h))+1)
+    T, dT = up_temperature(Z)
+    g = go*(up_r0/(up_r0+Z))**2
+    # Eddy diffusion coefficient (eqs 7a to 7c) [m^2/s]
+    K = np.zeros(Z.shape)
+    K[Z<95] = 1.2*10**2
+    m = (Z>=95) & (Z<115)
+    K[m] = 1.2*10**2*np.exp(1 - 400/(400 - (Z[m]-95)**2))
+    # Mean molecular weight of the mixed gas: Mo up to 100km and the one
+    # of N2 above, as the Standard does for N2 itself (eq 33).
+    M = np.where(Z<=100, Mo, up_M[0])
+    n = np.zeros((6, len(Z)))
+    # N2 (eq 33) - the factor 1000 turns g.M/(R.T) into 1/km
+    n[0] = up_n7[0]*up_T7/T*np.exp(-up_integral(1000*g*M/(R*T), h))
+    # O, O2 (eqs 34 and 35), Ar and He (eq 36). The total density used in
+    # the diffusion coefficient is the one of N2 for O and O2 and the one
+    # of N2, O and O2 for Ar and He.
+    for i in range(1,5):
+        ntot = n[0] if i<3 else n[0]+n[1]+n[2]
+        D = up_ai[i]*(T/273.15)**up_bi[i]/ntot
+        flux = up_Q[i]*(Z-up_U[i])**2*np.exp(-up_W[i]*(Z-up_U[i])**3)
+        if i==1:
+            m = Z<97
+            flux[m] += -3.416248*10**-3*(97-Z[m])**2\
+                       *np.exp(-5.008765*10**-4*(97-Z[m])**3)
+        fi = 1000*g/(R*T)*(D*up_M[i] + K*M)/(D+K) \
+             + up_alpha[i]*D/(D+K)*dT/T + flux
+        n[i] = up_n7[i]*up_T7/T*np.exp(-up_integral(fi, h))
+    # H (eq 39), from 150km upwards
+    m = Z>=150
+    i11 = np.argmin(np.abs(Z[m]-500))
+    Th = T[m]
+    tau = up_integral(1000*g[m]*up_M[5]/(R*Th), h)
+    tau = tau - tau[i11]
+    D = up_ai[5]*(Th/273.15)**up_bi[5]/n[:5,m].sum(0)
+    aux = (Th/Th[i11])**(1+up_alpha[5])
+    F = 1000*up_integral(aux*np.exp(tau)/D, h)
+    n[5,m] = (up_nH11 - up_phi*(F-F[i11]))/aux*np.exp(-tau)
+    return Z, T, n
+
+def up_segments():
+    # The aim of this function is to build (only once) the segments of the
+    # upper atmosphere, with nodes every up_dz km.
+    # === OUTPUTS ===
+    # seg [tuple]     Z [m], T [K], ln(P), ln(rho) at the nodes, as arrays
+    #                 and as lists, and the inverse of the segment length
+    global up_seg
+    if up_seg is None:
+        h = 0.01
+        Z, T, n = up_density(h)
+        step = int(round(up_dz/h))
+        Z, T, n = Z[::step], T[::step], n[:,::step]
+        lnP = np.log(n.sum(0)*up_k*T)
+        lnrho = np.log((up_M[:,None]*n).sum(0)/up_NA)
+        arrays = (Z*1000, T, lnP, lnrho)
+        up_seg = (arrays, tuple(a.tolist() for a in arrays), 1/(up_dz*1000))
+    return up_seg
+
+def upper(Z, checked=None):
+    # The aim of this function is to estimate the temperature, pressure 
+    # and density in the 86-1000km range from the segments.
+    # === INPUTS ===
+    # Z [m]          Geometric height (value or array)
+    # checked [bool] Input control (None to use the mode of the module)
+    # === OUTPUTS === 
+    # T [K]          Kinetic temperature
+    # P [N/m^2]      Pressure
+    # rho [kg/m^3]   Density
+    (Zn, Tn, lnPn, lnrhon), lists, inv_dz = up_segments()
+    if checked is None:
+        checked = CHECKED
+    if isinstance(Z, (int, float)):
+        # Single value - plain Python floats, no arrays are created
+        if checked and not 86000 <= Z <= 1000000:
+            raise AltitudeError('Fn: upper. Z must be a value between 86000m and 1000000m.')
+        Zn, Tn, lnPn, lnrhon = lists
+        i = min(int((Z-86000)*inv_dz), len(Zn)-2)
+        w = (Z-Zn[i])*inv_dz
+        T = Tn[i] + w*(Tn[i+1]-Tn[i])
+        P = math.exp(lnPn[i] + w*(lnPn[i+1]-lnPn[i]))
+        rho = math.exp(lnrhon[i] + w*(lnrhon[i+1]-lnrhon[i]))
+        return T, P, rho
+    # Input control
+    if checked:
+        Z = number('upper', Z)
+        if not np.all((Z>=86000) & (Z<=1000000)):
+            raise AltitudeError('Fn: upper. Z must be a value between 86000m and 1000000m.')
+    i = np.minimum(((Z-86000)*inv_dz).astype(np.intp), len(Zn)-2)
+    w = (Z-Zn[i])*inv_dz
+    T = Tn[i] + w*(Tn[i+1]-Tn[i])
+    P = np.exp(lnPn[i] + w*(lnPn[i+1]-lnPn[i]))
+    rho = np.exp(lnrhon[i] + w*(lnrhon[i+1]-lnrhon[i]))
+    return T[()], P[()], rho[()]
+
+# The functions above follow the structure of the Standard, one equation
+# at a time. The function below computes the full state of the air at once,
+# from the constants that follow. They are built only once, when the module
+# is imported, and are kept both as arrays (for array inputs) and as lists
+# (for single values, which are faster to index).
+atm_ro = 6356766.0                  # [m] - Earth's radius - (Page 4)
+atm_go = 9.80665                    # [m/s^2] - Gravity @ SL (Page 2)
+atm_R = 8.31432 * 10**3             # [Nm / (kmol.K)] - Gas constant (Page 2)
+atm_Mo = 28.9644                    # [kg/kmol] - Mean Molecular Weight (Page 9)
+atm_gamma = 1.4                     # [adim] - Ratio of Cp/Cv
+atm_beta = 1.458*10**-6             # [kg/s.m.K^0.5] - Sutherland's "Constant"
+atm_S = 110.4                       # [K] - Sutherland's constant
+atm_Lm = Lmb_vec*0.001              # [K/m'] - Temperature gradient
+# Exponents of (33a) for the gradient layers and coefficients of (33b)
+# for the isothermal layers, per geopotential meter.
+with np.errstate(divide='ignore'):
+    atm_expo = np.where(atm_Lm!=0, atm_go*atm_Mo/(atm_R*atm_Lm), 0.)
+atm_kiso = -atm_go*atm_Mo/(atm_R*Tmb_vec)
+# Top of each layer, the upper atmosphere (layer 7) has none
+atm_top = np.append(Hb_layer[1:], np.inf)
+atm_lists = (Hb_layer.tolist(), atm_Lm.tolist(), Tmb_vec.tolist(),
+             pb_vec.tolist(), atm_expo.tolist(), atm_kiso.tolist())
+
+# Full state of the air returned by atmosphere()
+# T [K]           Temperature
+# P [N/m^2]       Pressure
+# rho [kg/m^3]    Density
+# a [m/s]         Speed of sound
+# mu [N.s/m^2]    Dynamic viscosity
+# nu [m^2/s]      Kinematic viscosity
+# g [m/s^2]       Acceleration due to gravity
+Air = namedtuple('Air', 'T P rho a mu nu g')
+
+def atm_layer(Z, H, ratio, b):
+    # The aim of this function is to compute the full state of the air for
+    # a single value, once the layer b is known. Layers 0 to 6 are the ones 
+    # of Table 4 and layer 7 is the upper atmosphere (from H = 84852m').
+    # === INPUTS ===
+    # Z [m]          Geometric height
+    # H [m']         Geopotential height
+    # ratio [adim]   ro/(ro+Z)
+    # b [adim]       Layer
+    # === OUTPUTS ===
+    # air [Air]      T, P, rho, a, mu, nu and g at the given Z
+    if b < 7:
+        Hbl, Lm, Tmb, Pb, expo, kiso = atm_lists
+        dH = H - Hbl[b]
+        if Lm[b] != 0:
+            T = Tmb[b] + Lm[b]*dH
+            P = Pb[b]*(Tmb[b]/T)**expo[b]
+        else:
+            T = Tmb[b]
+            P = Pb[b]*math.exp(kiso[b]*dH)
+        rho = P*atm_Mo/(atm_R*T)
+        a = (atm_gamma*atm_R*T/atm_Mo)**0.5
+    else:
+        T, P, rho = upper(max(Z, 86000.), False)
+        a = (atm_gamma*P/rho)**0.5
+    mu = atm_beta*T**1.5/(T + atm_S)
+    return Air(T, P, rho, a, mu, mu/rho, atm_go*ratio*ratio)
+
+def atm_layers(Z, H, ratio, b):
+    # The aim of this function is the same as atm_layer, for arrays.
+    T = np.empty(H.shape)
+    P = np.empty(H.shape)
+    rho = np.empty(H.shape)
+    a = np.empty(H.shape)
+    # 0-86km
+    low = b<7
+    bl = b[low]
+    dH = H[low] - Hb_layer[bl]
+    Tl = Tmb_vec[bl] + atm_Lm[bl]*dH
+    Pl = np.empty(Tl.shape)
+    grad = atm_Lm[bl]!=0
+    iso = ~grad
+    Pl[grad] = pb_vec[bl[grad]]*(Tmb_vec[bl[grad]]/Tl[grad])**atm_expo[bl[grad]]
+    Pl[iso] = pb_vec[bl[iso]]*np.exp(atm_kiso[bl[iso]]*dH[iso])
+    T[low] = Tl
+    P[low] = Pl
+    rho[low] = Pl*atm_Mo/(atm_R*Tl)
+    a[low] = np.sqrt(atm_gamma*atm_R*Tl/atm_Mo)
+    # 86-1000km
+    high = ~low
+    if np.any(high):
+        T[high], P[high], rho[high] = upper(np.maximum(Z[high], 86000.), False)
+        a[high] = np.sqrt(atm_gamma*P[high]/rho[high])
+    mu = atm_beta*T**1.5/(T + atm_S)
+    return Air(T[()], P[()], rho[()], a[()], mu[()], (mu/rho)[()], 
+               (atm_go*ratio*ratio)[()])
+
+def atmosphere(Z, checked=None):
+    # The aim of this function is to compute the full state of the air at
+    # a given geometric height in a single call. Up to 86km, it gives the 
+    # same results as the chain table4 - tm - p - rho - Vs - visc - g. From
+    # 86km to 1000km, T, P and rho come from upper(). The Standard does not
+    # define the speed of sound and the viscosity above 86km, there they are
+    # extended with eqs (50) and (51) using the local mean molecular weight.
+    # === INPUTS ===
+    # Z [m]          Geometric height (value or array)
+    # checked [bool] Input control (None to use the mode of the module)
+    # === OUTPUTS ===
+    # air [Air]      T, P, rho, a, mu, nu and g at the given Z
+    if checked is None:
+        checked = CHECKED
+    if isinstance(Z, (int, float)):
+        # Single value - plain Python floats, no arrays are created
+        ratio = atm_ro / (atm_ro + Z)
+        H = Z*ratio                 # [m'] - Geopotential height
+        if checked and not (0 <= H and Z <= 1000000):
+            raise AltitudeError('Fn: atmosphere. Z must be a value between 0m and 1000000m.')
+        return atm_layer(Z, H, ratio, bisect_right(atm_lists[0], H) - 1)
+    # Input control
+    if checked:
+        Z = number('atmosphere', Z)
+        if not np.all((Z>=0) & (Z<=1000000)):
+            raise AltitudeError('Fn: atmosphere. Z must be a value between 0m and 1000000m.')
+    else:
+        Z = np.asarray(Z, dtype=float)
+    ratio = atm_ro / (atm_ro + Z)
+    H = Z*ratio                     # [m'] - Geopotential height
+    return atm_layers(Z, H, ratio, np.searchsorted(Hb_layer, H, side='right') - 1)
+
+class AtmCursor:
+    # The aim of this class is to evaluate the atmosphere along one or many
+    # trajectories. Consecutive calls of a trajectory usually fall in the 
+    # same layer or in one of its neighbours, so the cursor remembers the 
+    # layer of the last call and checks those first. The full search is 
+    # only done when the height jumps further than that.
+    # === INPUTS ===
+    # n [adim]       Number of trajectories (None for a single one)
+    # === ATTRIBUTES ===
+    # b [adim]       Layer of the last call (value or array of n values)
+    # jumps [adim]   Number of full searches done so far
+
+    def __init__(self, n=None):
+        self.n = n
+        self.jumps = 0
+        self.reset()
+
+    def reset(self):
+        # Sends the cursor back to the ground layer.
+        self.b = 0 if self.n is None else np.zeros(self.n, dtype=np.intp)
+
+    def layer(self, H):
+        # The aim of this method is to find the layer of the given 
+        # geopotential height, starting from the layer of the last call.
+        # Layer 7 is the upper atmosphere, it has no top.
+        # === INPUTS ===
+        # H [m']         Geopotential height (value or array of n values)
+        # === OUTPUTS ===
+        # b [adim]       Layer (value or array of n values)
+        lo = atm_lists[0]
+        if self.n is None:
+            b = self.b
+            if lo[b] <= H and (b == 7 or H < lo[b+1]):
+                return b
+            if b < 7 and H >= lo[b+1] and (b == 6 or H < lo[b+2]):
+                b += 1
+            elif b > 0 and H < lo[b] and H >= lo[b-1]:
+                b -= 1
+            else:
+                b = bisect_right(lo, H) - 1
+                self.jumps += 1
+            self.b = b
+            return b
+        b = self.b
+        top = atm_top[b]
+        move = (H < Hb_layer[b]) | (H >= top)
+        if np.any(move):
+            bm = b[move]
+            Hm = H[move]
+            up = Hm >= atm_top[bm]
+            bm = np.where(up, np.minimum(bm+1, 7), np.maximum(bm-1, 0))
+            far = (Hm < Hb_layer[bm]) | (Hm >= atm_top[bm])
+            if np.any(far):
+                bm[far] = np.searchsorted(Hb_layer, Hm[far], side='right') - 1
+                self.jumps += int(np.count_nonzero(far))
+            b[move] = bm
+        return b
+
+    def __call__(self, Z, checked=None):
+        # The aim of this method is the same as atmosphere(), using the
+        # cursor to find the layer.
+        # === INPUTS ===
+        # Z [m]          Geometric height (value or array of n values)
+        # checked [bool] Input control (None to use the mode of the module)
+        # === OUTPUTS ===
+        # air [Air]      T, P, rho, a, mu, nu and g at the given Z
+        if checked is None:
+            checked = CHECKED
+        if self.n is None:
+            if checked and not (0 <= Z <= 1000000):
+                raise AltitudeError('Fn: AtmCursor. Z must be a value between 0m and 1000000m.')
+            ratio = atm_ro / (atm_ro + Z)
+            H = Z*ratio
+            return atm_layer(Z, H, ratio, self.layer(H))
+        if checked:
+            Z = number('AtmCursor', Z)
+            if not np.all((Z>=0) & (Z<=1000000)):
+                raise AltitudeError('Fn: AtmCursor. Z must be a value between 0m and 1000000m.')
+        else:
+            Z = np.asarray(Z, dtype=float)
+        ratio = atm_ro / (atm_ro + Z)
+        H = Z*ratio
+        return atm_layers(Z, H, ratio, self.layer(H))
+
+#%% Flight
+
+# This block implements the different functions required for the
+# simulation.py file to be able to simulate the flight of the launch 
+# vehicle. Functions' assumptions and sources are documented in detail
+# the Flight (Jupyter Notebook) document.
+
+def mach(V,Vs,checked=None):
+    # The aim of this function is to calculate the local Mach number at the 
+    # instant of interest.
+    # === INPUTS ===
+    # V [m/s]                   Local flow velocity 
+    # Vs [m/s]                  Speed of sound in the medium at the local temperature
+    # checked [bool]            Input control (None to use the mode of the module)
+    # === OUTPUTS ===
+    # M [adim]                  Local Mach Number
+    if CHECKED if checked is None else checked:
+        V = number('mach', V, 'V')
+        Vs = positive('mach', Vs, 'Vs')
+    M = V/Vs                    # [adim] - Local Mach Number
+    return M
+
+def re(V,kvisc,L,checked=None):
+    # The aim of this function is to calculate the local Reynolds number
+    # at the instant of interest
+    # === INPUTS ===
+    # V [m/s]                   Local flow velocity    
+    # kvisc [m^2/s]             Kinematic Viscosity
+    # L [m]                     Characteristic length
+    # checked [bool]            Input control (None to use the mode of the module)
+    # === OUTPUTS ===
+    # re [adim]                 Local Reynolds Number
+    if CHECKED if checked is None else checked:
+        V = number('re', V, 'V')
+        kvisc = positive('re', kvisc, 'kvisc')
+        L = positive('re', L, 'L')
+    re = V * L / kvisc          # Local Reynolds Number
+    return re
+
+def thrust(m_dot,Ve,Pe,Po,Ae,checked=None):
+    # The aim of this function is to calculate the generated thrust
+    # at the instant of interest. The constants of the engine come from
+    # the configuration of the stage (see vehicle.thrust).
+    # === INPUTS ===
+    # m_dot [kg/s]              Mass flow of propellant being expelled
+    # Ve [m/s]                  Exhaust velocity of the gases
+    # Pe [N/m^2]                Exhaust pressure
+    # Po [N/m^2]                Pressure outside the noZZle
+    # Ae [m^2]                  NoZZle exit surface
+    # checked [bool]            Input control (None to use the mode of the module)
+    # === OUTPUTS ===
+    # thrust [N]                Thrust
+    if CHECKED if checked is None else checked:
+        m_dot = number('thrust', m_dot, 'm_dot')
+        Ve = number('thrust', Ve, 'Ve')
+        Pe = number('thrust', Pe, 'Pe')
+        Po = number('thrust', Po, 'Po')
+        Ae = number('thrust', Ae, 'Ae')
+        if np.any(m_dot<0) or np.any(Pe<0) or np.any(Po<0) or np.any(Ae<0):
+            raise RangeError('Fn: thrust. m_dot, Pe, Po and Ae must not be negative.')
+    thrust = m_dot*Ve + (Pe - Po)*Ae
+    return thrust
+
+#%% Coordinate Systems
+
+# This block implements the different functions required to transform
+# the different tensors from one coordinate system to another.
+# Source: Zipfel.
+
+def Tge(long,lat,checked=None):
+    # The aim of this function is to calculate the transformation matrix 
+    # between the geographical and Earth coordinate systems. 
+    # Zipfel (3.13)
+    # === INPUTS ===
+    # long [rad]              longitude
+    # lat [rad]               Latitude
+    # checked [bool]          Input control (None to use the mode of the module)
+    # === OUTPUTS ===
+    # tge [3x3 mat]           T_GE
+    if CHECKED if checked is None else checked:
+        long = number('Tge', long, 'long')
+        lat = number('Tge', lat, 'lat')
+    # Create the basic values
+    slon = np.sin(long)
+    clon = np.cos(long)
+    slat = np.sin(lat)
+    clat = np.cos(lat)
+    # Create 9 positions
+    ind11 = -slat*clon; 
+    ind12 = -slat*slon
+    ind13 = clat
+    ind21 = -slon
+    ind22 = clat
+    ind23 = 0
+    ind31 = -clat*clon
+    ind32 = -clat*slon
+    ind33 = -slon
+    # Create the matrix itself
+    tge = np.array([[ind11, ind12, ind13],[ind21, ind22, ind23],[ind31, ind32, ind33]])  
+    return tge
+
+def Tei(hangle,checked=None):
+    # The aim of this function is to calculate the transformation matrix 
+    # between the Earth and inertial coordinate systems. 
+    # Zipfel (3.12)
+    # === INPUTS ===
+    # hangle [rad]            Hour angle
+    # checked [bool]          Input control (None to use the mode of the module)
+    # === OUTPUTS ===
+    # tei [3x3 mat]           T_EI
+    if CHECKED if checked is None else checked:
+        hangle = number('Tei', hangle, 'hangle')
+    # Create the basic values
+    sha = np.sin(hangle)
+    cha = np.cos(hangle)
+    # Create 9 positions
+    ind11 = cha
+    ind12 = sha
+    ind13 = 0
+    ind21 = -sha
+    ind22 = cha
+    ind23 = 0
+    ind31 = 0
+    ind32 = 0
+    ind33 = 1
+    # Create the matrix itself
+    tei = np.array([[ind11, ind12, ind13],[ind21, ind22, ind23],[ind31, ind32, ind33]])  
+    return tei
+
+def Tmv(bang,checked=None):
+    # The aim of this function is to calculate the transformation matrix 
+    # between the load factor and velocity coordinate systems. 
+    # Zipfel (8.22)
+    # === INPUTS ===
+    # bang [rad]              Bank Angle
+    # checked [bool]          Input control (None to use the mode of the module)
+    # === OUTPUTS ===
+    # tmv [3x3 mat]           T_MV
+    if CHECKED if checked is None else checked:
+        bang = number('Tmv', bang, 'bang')
+    # Create the basic values
+    sba = np.sin(bang)
+    cba = np.cos(bang)
+    # Create 9 positions
+    ind11 = 1 
+    ind12 = 0
+    ind13 = 0
+    ind21 = 0
+    ind22 = -cba
+    ind23 = sba
+    ind31 = 0
+    ind32 = -sba
+    ind33 = cba
+    # Create the matrix itself
+    tmv = np.array([[ind11, ind12, ind13],[ind21, ind22, ind23],[ind31, ind32, ind33]])  
+    return tmv
+
+def Tvg(gamma,chi,checked=None):
+    # The aim of this function is to calculate the transformation matrix 
+    # between the flight path and geographic coordinate systems. 
+    # Zipfel (3.25)
+    # === INPUTS ===
+    # gamma [rad]              Heading Angle
+    # chi [rad]                Flight Path Angle
+    # checked [bool]           Input control (None to use the mode of the module)
+    # === OUTPUTS ===
+    # tvg [3x3 mat]            T_VG
+    if CHECKED if checked is None else checked:
+        gamma = number('Tvg', gamma, 'gamma')
+        chi = number('Tvg', chi, 'chi')
+    # Create the basic values
+    schi = np.sin(chi)
+    cchi = np.cos(chi)
+    sgamma = np.sin(gamma)
+    cgamma = np.cos(gamma)
+    # Create 9 positions
+    ind11 = cchi*cgamma 
+    ind12 = cgamma*schi
+    ind13 = -sgamma
+    ind21 = -schi
+    ind22 = -cchi
+    ind23 = 0
+    ind31 = sgamma*cchi
+    ind32 = sgamma*schi
+    ind33 = cchi
+    # Create the matrix itself
+    tvg = np.array([[ind11, ind12, ind13],[ind21, ind22, ind23],[ind31, ind32, ind33]])  
+    return tvg
+
+def date_now():
+    # The aim of this function is to return the date at time of invoking it.
+    # === INPUTS ===
+    # 
+    # === OUTPUTS ===
+    # date [datetime]           UTC Date at time of function invoking
+    # Function
+    from datetime import datetime
+    # date = datetime.now()     Local date
+    date = datetime.utcnow()    # UTC Date 
+    return date
+
+def date_parts(date_in,checked=None):
+    # The aim of this function is to return the different values stored in the 
+    # input datetime value.
+    # === INPUTS ===
+    # date_in [datetime]       Input date
+    # checked [bool]           Input control (None to use the mode of the module)
+    # === OUTPUTS ===
+    # yr [int]                 Year on input date
+    # m [int]                  Month on input date
+    # d [int]                  Day on input date
+    # h [int]                  Hour on input date
+    # m [int]                  Minute on input date
+    # s [int]                  Second on input date
+    if CHECKED if checked is None else checked:
+        from datetime import datetime
+        if not isinstance(date_in, datetime):
+            raise InputError('Fn: date_parts. date_in must be a datetime.')
+    yr = date_in.year
+    mo = date_in.month
+    d = date_in.day
+    h = date_in.hour
+    m = date_in.minute
+    s = date_in.second
+    return yr, mo, d, h, m, s
+
+def JD(yr,mo,d,h,min,s,checked=None):
+    # The aim of this function is to calculate the Julian Date 
+    # Source: Vallado, Algorithm #14
+    # Unless specified, JD usually implies a time based on UT1
+    # Equation valid from years 1900 to 2100
+    # === INPUTS ===
+    # yr [adim]                Year of interest
+    # mo [adim]                Month of interest (1 to 12)
+    # d [adim]                 Day of interest (1 to 31)
+    # h [adim]                 Hour of interest (0 to 23)
+    # min [adim]               Min of interest (0 to 59)
+    # s [adim]                 Seconds of interest (0 to 59)
+    # checked [bool]           Input control (None to use the mode of the module)
+    # === OUTPUTS ===
+    # jdate [adim]             Julian Date
+    # Input control
+    if CHECKED if checked is None else checked:
+        for (name, x) in (('yr', yr), ('mo', mo), ('d', d), ('h', h),
+                          ('min', min), ('s', s)):
+            number('JD', x, name)
+        if not (1900 <= yr <= 2100 and 1 <= mo <= 12 and 1 <= d <= 31
+                and 0 <= h <= 23 and 0 <= min <= 59 and 0 <= s < 60):
+            raise RangeError('Fn: JD. The date must be valid and between years 1900 and 2100.')
+    # Function
+    jdate = 367*yr - int((7*(yr+int((mo+9)/12)))/4) + int((275*mo)/9) + d + 1721013.5 + ((((s/60)+min)/60) + h)/24
+    return jdate
+
+def jd2tjd(jdate,checked=None):
+    # The aim of this function is to calculate the number of Julian centuries 
+    # elapsed from the epoch J2000.0. 
+    # Source: Vallado, Eq. (3.42)
+    # Equation valid for epoch J2000.0, see p.183 for other epochs
+    # === INPUTS ===
+    # jdate [julian date]     Julian date, as provided by function JD
+    # checked [bool]          Input control (None to use the mode of the module)
+    # === OUTPUTS ===
+    # tjdate [centuries]      Julian centuries elapsed since J2000.0 epoch
+    if CHECKED if checked is None else checked:
+        jdate = number('jd2tjd', jdate, 'jdate')
+    # Function
+    tjdate = (jdate - 2451545)/36525
+    return tjdate
+
+def tjd2gmst(tjdate,checked=None):
+    # The aim of this function is to calculate the Greenwich Mean Sidereal Time
+    # given the number of Julian centuries elapsed from the epoch J2000.0.
+    # Source: Vallado, Eq. (3.47)
+    # === INPUTS ===
+    # tjdate [centuries]      Julian centuries elapsed since J2000.0 epoch
+    # checked [bool]          Input control (None to use the mode of the module)
+    # === OUTPUTS ===
+    # gmst_s [s]              GMST in seconds
+    # gmst_d [°]              GMST in degrees
+    if CHECKED if checked is None else checked:
+        tjdate = number('tjd2gmst', tjdate, 'tjdate')
+        if tjdate.ndim:
+            raise InputError('Fn: tjd2gmst. tjdate must be a single value.')
+        tjdate = float(tjdate)
+    # Function
+    gmst_s = 67310.54841 + (876600*3600 + 8640184.812866)*tjdate + 0.093104*tjdate**2 - 6.2*10**-6* (tjdate**3)
+    # Reduce this quantity to a result within the range of 86400s
+    secs_day = 86400
+    gmst_aux = gmst_s % secs_day
+    # Convert to degrees
+    gmst_d = gmst_aux / 240
+    # Convert to an angle in the 0-360 range
+    if gmst_d < 0:
+        gmst_d += 360   
+    return gmst_s, gmst_d
+
+def add_timestep(date,timestep,checked=None):
+    # The aim of this function is to add a given timestep to a given date.
+    # === INPUTS ===
+    # date [datetime]       Initial time
+    # timestep [timedelta]  Timestep to be added
+    # checked [bool]        Input control (None to use the mode of the module)
+    # === OUTPUTS ===
+    # date_out [datetime]   Final time
+    if CHECKED if checked is None else checked:
+        from datetime import datetime, timedelta
+        if not isinstance(date, datetime):
+            raise InputError('Fn: add_timestep. date must be a datetime.')
+        if not isinstance(timestep, timedelta):
+            raise InputError('Fn: add_timestep. timestep must be a timedelta.')
+    # Function
+    date_out = date + timestep
     return date_out
\ No newline at end of file
@@ -1,5 +1,5 @@
 #%% Script information
-# Name: simulation2.py
+# Name: simulation.py
 # Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
 # Owner: LIA Aerospace
 #
@@ -13,36 +13,63 @@ import numpy as np
 import matplotlib.pylab as plt
 import c as c
 import fnc as f
+import dynamics as d
+import stream as st
+import archive as ar
+import Flight as fl
 #%% Initial Conditions
 #
 # Atmospheric properties at Launch Site
-Z_0 = 0                                  # [m] - Initial altitude over SL
-b, Lmb, Tmb, Hb, Hz, Pb = f.table4(Z_0)    
-T = f.tm(Tmb,Lmb,Hz,Hb)                  # [K] - Initial Temperature
-P = f.p(Tmb,Lmb,Hz,Hb,Pb)                # [N/m^2] - Initial Pressure
-rho = f.rho(P,T)                         # [kg/m^3] - Initial Density
-Vs = f.Vs(T)                             # [m/s] - Initial Speed of Sound
-dvisc, kvisc = f.visc(T,rho)               
-#
-# Dynamics
-D = [0]                                  # [N] - Drag Force
-T = [0]                                  # [N] - Thrust
-L = [0]                                  # [N] - Lift Force
-m = [c.M_st1_i]                          # [kg] - Initial mass of the vehicle
-W = [m[0]*c.g]                           # [m/s^2] - Weight of the vehicle
-#
-# Kinematics
-t = [0]                                  # [s] - Initial time 
-x = [0]                                  # [m] - Initial position x-axis
-y = [0]                                  # [m] - Initial position y-axis
-z = [0]                                  # [m] - Initial position z-axis
-vx = [0]                                 # [m/s] - Initial velocity x-axis
-vy = [0]                                 # [m/s] - Initial velocity y-axis
-vz = [0]
-ax = [((thrustx[0]-dx[0])/m[0])]         # [m/s^2] - Initial acceleration x-axis
-ay = [((thrusty[0]-dy[0])/m[0])-c.atm_g] # [m/s^2] - Initial acceleration y-axis
+Z_0 = c.Z_0                              # [m] - Initial altitude over SL
+air = f.atmosphere(Z_0)                  # Initial state of the air
+T = air.T                                # [K] - Initial Temperature
+P = air.P                                # [N/m^2] - Initial Pressure
+rho = air.rho                            # [kg/m^3] - Initial Density
+Vs = air.a                               # [m/s] - Initial Speed of Sound
+dvisc, kvisc = air.mu, air.nu               
+#
+# Kinematics and mass - state vector [x, y, z, vx, vy, vz, m] (ECI)
+y_0 = d.launch_state(c.M_st1_i, c.lat_0, c.long_0, Z_0)
 
 # Simulation characteristics
-dt = 0.25                                # [s] - Time step
-ct = 0                                   # [adim] - Step count
-tmax = c.bt_st1 + ct_bt_st2              # [s] - Finish time
\ No newline at end of file
+method = 'dopri'                         # Integrator - 'rk4' or 'dopri'
+dt = 0.25                                # [s] - Time step (rk4)
+rtol = 0.                                # [adim] - Relative tolerance (dopri)
+atol = [10**-5]*3 + [10**-7]*3 + [10**-6] # Absolute tolerance (dopri) - [m], [m/s], [kg]
+tmax = 10000.                            # [s] - Finish time (if no impact)
+span = 100.                              # [s] - Flight time of each block
+path = 'run.trj'                         # File of the results (see archive.py)
+# Steps below the ground (the impact should stop the flight before)
+below = lambda block: np.sqrt(block[1]**2 + block[2]**2 + block[3]**2) < c.R_E - 1
+#
+#%% Simulation
+#
+# Rise, stage #1 burn, separation, stage #2 burn and coast (see Flight.py),
+# run as a stream of blocks that go to a .trj file and to the statistics, checks
+# and plots as they come
+flight = fl.Flight(t_max=tmax, y0=y_0, method=method, dt=dt, rtol=rtol, atol=atol,
+                   dense=False)
+writer, stats, sample, check = st.publish(flight.stream(span), ar.Archive(path), st.Stats(),
+                                          st.Sample(10), st.Check('below ground', below))
+#
+#%% Results
+#
+for hit in flight.hits:
+    print(hit.name, 'at', round(hit.t, 3), '[s]')
+print('Largest q:', stats['q'][1], '[N/m^2] - largest Mach:', stats['mach'][1])
+print('Check', check[0], '-', check[1], 'steps fail')
+t = sample[0]                            # [s] - Time
+x, y, z = sample[1:4]                    # [m] - Position (ECI)
+vx, vy, vz = sample[4:7]                 # [m/s] - Velocity (ECI)
+h = np.sqrt(x**2 + y**2 + z**2) - c.R_E  # [m] - Height over the Earth
+V = np.sqrt(vx**2 + vy**2 + vz**2)       # [m/s] - Inertial speed
+
+plt.figure()
+plt.subplot(2,1,1)
+plt.plot(t, h/1000)
+plt.ylabel('Height [km]')
+plt.subplot(2,1,2)
+plt.plot(t, V)
+plt.xlabel('Time [s]')
+plt.ylabel('Inertial speed [m/s]')
+plt.show()
@@ -5,7 +5,8 @@
 #
 #%% Script description
 #
-# This is the simulation itself.
+# This is the simulation itself, with the atmosphere computed with the
+# chain of functions of the Standard (table4 - tm - p - rho - Vs - visc).
 #
 #%% Packages
 #
@@ -13,36 +14,67 @@ import numpy as np
 import matplotlib.pylab as plt
 import c as c
 import fnc as f
+import dynamics as d
+import engine as e
 #%% Initial Conditions
 #
 # Atmospheric properties at Launch Site
-Z_0 = 0                                  # [m] - Initial altitude over SL
+Z_0 = c.Z_0                              # [m] - Initial altitude over SL
 b, Lmb, Tmb, Hb, Hz, Pb = f.table4(Z_0)    
 T = f.tm(Tmb,Lmb,Hz,Hb)                  # [K] - Initial Temperature
 P = f.p(Tmb,Lmb,Hz,Hb,Pb)                # [N/m^2] - Initial Pressure
 rho = f.rho(P,T)                         # [kg/m^3] - Initial Density
 Vs = f.Vs(T)                             # [m/s] - Initial Speed of Sound
 dvisc, kvisc = f.visc(T,rho)               
+
+def atm(Z):
+    # Atmosphere for the derivative, from the chain of functions. Above
+    # 86km, where the chain is not defined, the upper atmosphere is used.
+    if Z >= 86000:
+        return f.atmosphere(Z, False)
+    b, Lmb, Tmb, Hb, Hz, Pb = f.table4(Z, False)
+    T = f.tm(Tmb,Lmb,Hz,Hb,False)
+    P = f.p(Tmb,Lmb,Hz,Hb,Pb,False)
+    rho = f.rho(P,T,False)
+    dvisc, kvisc = f.visc(T,rho,False)
+    return T, P, rho, f.Vs(T,False), dvisc, kvisc, f.g(Z,False)
 #
-# Dynamics
-D = [0]                                  # [N] - Drag Force
-T = [0]                                  # [N] - Thrust
-L = [0]                                  # [N] - Lift Force
-m = [c.M_st1_i]                          # [kg] - Initial mass of the vehicle
-W = [m[0]*c.g]                           # [m/s^2] - Weight of the vehicle
-#
-# Kinematics
-t = [0]                                  # [s] - Initial time 
-x = [0]                                  # [m] - Initial position x-axis
-y = [0]                                  # [m] - Initial position y-axis
-z = [0]                                  # [m] - Initial position z-axis
-vx = [0]                                 # [m/s] - Initial velocity x-axis
-vy = [0]                                 # [m/s] - Initial velocity y-axis
-vz = [0]
-ax = [((thrustx[0]-dx[0])/m[0])]         # [m/s^2] - Initial acceleration x-axis
-ay = [((thrusty[0]-dy[0])/m[0])-c.atm_g] # [m/s^2] - Initial acceleration y-axis
+# Kinematics and mass - state vector [x, y, z, vx, vy, vz, m] (ECI)
+y_0 = d.launch_state(c.M_st1_i, c.lat_0, c.long_0, Z_0)
 
 # Simulation characteristics
 dt = 0.25                                # [s] - Time step
-ct = 0                                   # [adim] - Step count
-tmax = c.bt_st1 + ct_bt_st2              # [s] - Finish time
\ No newline at end of file
+tmax = c.bt_st1 + c.bt_st2               # [s] - Finish time
+out = e.Buffer(d.STATE)                  # Results, one array per variable
+#
+#%% Simulation
+#
+# Stage #1 burn - vertical rise, then gravity turn from the pitch kick
+deriv = d.derivative(c.m_dot_st1, c.ISP_st1_V, c.ISP_st1_SL, steer=d.vertical, atm=atm)
+t, y, stats = e.rk4(deriv, 0, y_0, c.t_kick, dt, out)
+deriv = d.derivative(c.m_dot_st1, c.ISP_st1_V, c.ISP_st1_SL, atm=atm)
+t, y, stats = e.rk4(deriv, t, y, c.bt_st1, dt, out)
+# Separation - the mass drops to the initial mass of stage #2
+y[6] = c.M_st2_i
+# Stage #2 burn
+deriv = d.derivative(c.m_dot_st2, c.ISP_st2_V, atm=atm)
+t, y, stats = e.rk4(deriv, t, y, tmax, dt, out)
+#
+#%% Results
+#
+t = out.t                                # [s] - Time
+x, y, z = out['x'], out['y'], out['z']   # [m] - Position (ECI)
+vx, vy, vz = out['vx'], out['vy'], out['vz'] # [m/s] - Velocity (ECI)
+m = out['m']                             # [kg] - Mass
+h = np.sqrt(x**2 + y**2 + z**2) - c.R_E  # [m] - Height over the Earth
+V = np.sqrt(vx**2 + vy**2 + vz**2)       # [m/s] - Inertial speed
+
+plt.figure()
+plt.subplot(2,1,1)
+plt.plot(t, h/1000)
+plt.ylabel('Height [km]')
+plt.subplot(2,1,2)
+plt.plot(t, V)
+plt.xlabel('Time [s]')
+plt.ylabel('Inertial speed [m/s]')
+plt.show()
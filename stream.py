@@ -0,0 +1,160 @@
+#%% Script information
+# Name: stream.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is consuming a flight run as a stream of blocks
+# (see Flight.stream), so that runs of days of orbital propagation never
+# hold the whole history in memory.
+#
+# A block is a n_ch x n array with the channels of trajectory.CHANNELS as
+# rows. The consumers of the blocks (subscribers) are objects called with
+# each block, with a close() method called at the end of the stream that
+# gives their result. publish() passes every block to every subscriber, so
+# that the flight is run once for all of them:
+#   Writer      appends the blocks to disk, one file per channel
+#   Stats       minimum, maximum and mean of each channel
+#   Sample      one step out of every N, kept in memory (e.g. for plots)
+#   Check       steps that do not pass a test (e.g. NaN or below ground)
+#
+#%% Packages
+import os
+import json
+import numpy as np
+import fnc as f
+import trajectory as tr
+
+#%% Stream
+
+def publish(blocks, *subscribers):
+    # The aim of this function is to pass every block of a stream to every
+    # subscriber, in a single pass.
+    # === INPUTS ===
+    # blocks [iterable] Blocks of the stream (e.g. Flight(...).stream())
+    # subscribers       Consumers of the blocks
+    # === OUTPUTS ===
+    # results [list]    Result of close() of each subscriber
+    for block in blocks:
+        for sub in subscribers:
+            sub(block)
+    return [sub.close() for sub in subscribers]
+
+#%% Subscribers
+
+class Writer:
+    # The aim of this class is writing the blocks of a stream to disk as
+    # they come. Each channel is appended to its own file (<channel>.f8,
+    # float64, native byte order), so that it stays contiguous on disk, and
+    # the channels, units and number of steps are written to meta.json when
+    # the stream is over.
+    # === INPUTS ===
+    # path [str]        Directory of the files (created if needed)
+    # === ATTRIBUTES ===
+    # n [adim]          Number of steps written
+
+    def __init__(self, path):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.n = 0
+        self.files = [open(os.path.join(path, name + '.f8'), 'wb') for name in tr.CHANNELS]
+
+    def __call__(self, block):
+        for (k, file) in enumerate(self.files):
+            file.write(np.ascontiguousarray(block[k]).tobytes())
+        self.n += block.shape[1]
+
+    def close(self):
+        for file in self.files:
+            file.close()
+        with open(os.path.join(self.path, 'meta.json'), 'w') as file:
+            json.dump({'channels': tr.CHANNELS, 'units': tr.UNITS, 'n': self.n}, file)
+        return self.path
+
+def read(path):
+    # The aim of this function is to open the channels written by a Writer,
+    # as memory maps, so that nothing is loaded until it is used.
+    # === INPUTS ===
+    # path [str]        Directory of the files
+    # === OUTPUTS ===
+    # data [dict]       {channel: array of n steps}
+    meta = os.path.join(path, 'meta.json')
+    if not os.path.isfile(meta):
+        raise f.InputError('Fn: read. ' + path + ' has no meta.json (the writer was not closed).')
+    with open(meta) as file:
+        meta = json.load(file)
+    n = meta['n']
+    if n == 0:
+        return {name: np.empty(0) for name in meta['channels']}
+    return {name: np.memmap(os.path.join(path, name + '.f8'), dtype=float, mode='r', shape=(n,))
+            for name in meta['channels']}
+
+class Stats:
+    # The aim of this class is computing the minimum, the maximum and the
+    # mean of each channel over the steps of a stream.
+
+    def __init__(self):
+        self.n = 0
+        self.min = np.full(len(tr.CHANNELS), np.inf)
+        self.max = np.full(len(tr.CHANNELS), -np.inf)
+        self.sum = np.zeros(len(tr.CHANNELS))
+
+    def __call__(self, block):
+        self.n += block.shape[1]
+        np.minimum(self.min, block.min(axis=1), out=self.min)
+        np.maximum(self.max, block.max(axis=1), out=self.max)
+        self.sum += block.sum(axis=1)
+
+    def close(self):
+        # {channel: (minimum, maximum, mean)}
+        mean = self.sum/max(self.n, 1)
+        return {name: (self.min[k], self.max[k], mean[k]) for (k, name) in enumerate(tr.CHANNELS)}
+
+class Sample:
+    # The aim of this class is keeping one step out of every N of a stream,
+    # e.g. to plot a long flight.
+    # === INPUTS ===
+    # every [adim]      N
+
+    def __init__(self, every=1):
+        self.every = every
+        self.n = 0
+        self.blocks = []
+
+    def __call__(self, block):
+        # Index of the first step of the block that is kept
+        first = -self.n % self.every
+        self.blocks.append(block[:,first::self.every].copy())
+        self.n += block.shape[1]
+
+    def close(self):
+        # Steps kept, n_ch x n
+        if not self.blocks:
+            return np.empty((len(tr.CHANNELS), 0))
+        return np.concatenate(self.blocks, axis=1)
+
+class Check:
+    # The aim of this class is finding the steps of a stream that do not
+    # pass a test.
+    # === INPUTS ===
+    # name [str]        Name of the test
+    # fn [function]     fn(block) -> boolean array, True for the steps that
+    #                   fail
+
+    def __init__(self, name, fn):
+        self.name = name
+        self.fn = fn
+        self.fails = 0
+        self.first = None
+
+    def __call__(self, block):
+        bad = np.asarray(self.fn(block), dtype=bool)
+        if bad.any():
+            if self.first is None:
+                self.first = block[0,np.argmax(bad)]
+            self.fails += int(bad.sum())
+
+    def close(self):
+        # (name, number of steps that fail, time of the first one)
+        return self.name, self.fails, self.first
@@ -0,0 +1,232 @@
+#%% Script information
+# Name: sweep.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is running sweeps of the flight over the constants
+# of the ascent (see Flight.ascent) and the inputs of Flight (method, dt,
+# t_max, ...), given as a grid or as a list of configurations.
+#
+# The results are kept in a cache on disk. Each configuration is resolved
+# first: every constant and every input takes its value, given or default,
+# so two configurations that fly the same flight are the same. It is then
+# hashed together with the version of the code (the source of the modules
+# that run the flight, including c.py and vehicle.py, and the backend of
+# accel.py), and the hash is the name of its file in the cache. A
+# configuration already in the cache is not run again, and the rest are
+# run over a pool of processes (see ensemble.py).
+#
+# The cache is bounded in size: when it grows over its limit, the results
+# used least recently are removed (the time of the last use of a result is
+# the time of its file). stats() reports its use.
+#
+#%% Packages
+import os
+import json
+import time
+import pickle
+import hashlib
+import inspect
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import c
+import fnc as f
+import accel as a
+import gravity as gr
+import engine as e
+import propulsion as pr
+import aero as ae
+import dynamics as d
+import trajectory as tr
+import Flight as fl
+import vehicle as vh
+import ensemble as en
+
+#%% Configurations
+
+# Modules whose source is part of the version of the code
+MODULES = (c, f, a, gr, e, pr, ae, d, tr, vh, fl, en)
+# Inputs of Flight that can be swept (the rest are not plain values)
+SETTINGS = tuple(name for name in inspect.signature(fl.Flight).parameters
+                 if name not in ('phases', 'atm', 'checkpoint', 'interval'))
+
+def grid(**axes):
+    # The aim of this function is to build the configurations of a grid,
+    # all the combinations of the values of each axis.
+    # === INPUTS ===
+    # axes              {name: values}, e.g. grid(bt_st2=[110., 120.], dt=[0.1, 0.25])
+    # === OUTPUTS ===
+    # configs [list]    Configurations, e.g. [{'bt_st2': 110., 'dt': 0.1}, ...]
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+def version():
+    # The aim of this function is to identify the version of the code that
+    # runs the flight.
+    # === OUTPUTS ===
+    # version [str]     Hash of the source of MODULES and the backend
+    digest = hashlib.sha256()
+    for module in MODULES:
+        with open(module.__file__, 'rb') as file:
+            digest.update(file.read())
+    digest.update(json.dumps(a.info(), sort_keys=True).encode())
+    return digest.hexdigest()
+
+def resolve(config, full=False):
+    # The aim of this function is to resolve a configuration: every
+    # constant of the ascent and every input of Flight gets its value.
+    # === INPUTS ===
+    # config [dict]     Constants (see Flight.ascent) and inputs of Flight
+    # full [bool]       Keep the steps of the flight too
+    # === OUTPUTS ===
+    # resolved [dict]   {'const', 'opts', 'full'}, as plain values
+    const, opts = {}, {}
+    for (name, value) in config.items():
+        if name in fl.ASCENT:
+            const[name] = value
+        elif name in SETTINGS:
+            opts[name] = value
+        else:
+            raise f.InputError('Fn: sweep. ' + str(name) + ' is not a constant of the ascent or an input of Flight.')
+    defaults = inspect.signature(fl.Flight).parameters
+    settings = {name: opts.get(name, defaults[name].default) for name in SETTINGS}
+    # The whole vehicle (see vehicle.update): e.g. the mass flows follow
+    # from the masses and burning times unless they are given
+    v = vh.update(vh.VEHICLE, **const)
+    constants = dict(v._asdict(), stages=[st._asdict() for st in v.stages])
+    resolved = {'const': const, 'opts': opts, 'full': bool(full),
+                'constants': constants, 'settings': settings}
+    try:
+        resolved = json.loads(json.dumps(resolved, default=lambda x: x.tolist()))
+    except (TypeError, AttributeError):
+        raise f.InputError('Fn: sweep. The values of a configuration must be numbers, strings, lists or arrays.')
+    return resolved
+
+def key(resolved, code):
+    # Name of the result of a resolved configuration, for the version code.
+    text = json.dumps({'constants': resolved['constants'], 'settings': resolved['settings'],
+                       'full': resolved['full'], 'version': code}, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+#%% Cache
+
+class Cache:
+    # The aim of this class is keeping the results of the flights on disk,
+    # one file per configuration, named after its key.
+    # === INPUTS ===
+    # path [str]        Directory of the cache
+    # size [bytes]      Largest size of the cache
+    # === ATTRIBUTES ===
+    # hits, misses      Results found and not found in the cache
+    # stored, evicted   Results written and removed
+
+    def __init__(self, path, size=2**30):
+        self.path = path
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+        os.makedirs(path, exist_ok=True)
+
+    def file(self, k):
+        return os.path.join(self.path, k + '.pkl')
+
+    def get(self, k):
+        # The aim of this method is to read the result of the key k, and to
+        # mark it as used now (None if it is not in the cache).
+        try:
+            with open(self.file(k), 'rb') as file:
+                res = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+        os.utime(self.file(k), ns=(time.time_ns(), time.time_ns()))
+        self.hits += 1
+        return res
+
+    def put(self, k, res):
+        # The aim of this method is to write the result of the key k, and
+        # to remove the results used least recently if the cache is full.
+        tmp = self.file(k) + '.tmp'
+        with open(tmp, 'wb') as file:
+            pickle.dump(res, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.file(k))
+        self.stored += 1
+        self.evict()
+
+    def entries(self):
+        # (time of last use [ns], size [bytes], path) of each result.
+        out = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith('.pkl'):
+                info = entry.stat()
+                out.append((info.st_mtime_ns, info.st_size, entry.path))
+        return out
+
+    def evict(self):
+        # Removes the results used least recently until the cache fits in
+        # its size.
+        entries = sorted(self.entries())
+        total = sum(entry[1] for entry in entries)
+        for (used, size, path) in entries:
+            if total <= self.size:
+                break
+            os.remove(path)
+            total -= size
+            self.evicted += 1
+
+    def stats(self):
+        # The aim of this method is to report the use of the cache.
+        # === OUTPUTS ===
+        # stats [dict]      entries, bytes, size (limit), hits, misses,
+        #                   hit rate, stored and evicted
+        entries = self.entries()
+        asked = self.hits + self.misses
+        return {'entries': len(entries), 'bytes': sum(entry[1] for entry in entries), 'size': self.size,
+                'hits': self.hits, 'misses': self.misses, 'hit rate': self.hits/asked if asked else 0.,
+                'stored': self.stored, 'evicted': self.evicted}
+
+    def report(self):
+        # Report of the use of the cache, as text.
+        s = self.stats()
+        return ('Cache ' + self.path + ': ' + str(s['entries']) + ' results, ' + str(round(s['bytes']/2**20, 3)) + ' of '
+                + str(round(s['size']/2**20, 3)) + ' MB - hits: ' + str(s['hits']) + ', misses: ' + str(s['misses'])
+                + ' (' + str(round(100*s['hit rate'], 1)) + '% hits) - stored: ' + str(s['stored'])
+                + ', evicted: ' + str(s['evicted']))
+
+#%% Sweep
+
+def sweep(configs, cache, workers=None, full=False):
+    # The aim of this function is to run the flight of each configuration
+    # that is not in the cache, over a pool of processes, and to give the
+    # results of all of them.
+    # === INPUTS ===
+    # configs [list]    Configurations (see resolve and grid)
+    # cache [Cache]     Cache of the results
+    # workers [adim]    Number of processes (None to run the flights one
+    #                   after the other)
+    # full [bool]       Give the steps of each flight too
+    # === OUTPUTS ===
+    # results [list]    Result of each configuration (see ensemble.result)
+    code = version()
+    resolved = [resolve(config, full) for config in configs]
+    keys = [key(r, code) for r in resolved]
+    results = {}
+    for k in keys:
+        if k not in results:
+            results[k] = cache.get(k)
+    # Each configuration missing is run once, even if it is given twice
+    todo = [(k, r) for (k, r) in dict(zip(keys, resolved)).items() if results[k] is None]
+    runs = [(r['const'], r['opts'], r['full']) for (k, r) in todo]
+    if workers is None:
+        done = [en.run(*args) for args in runs]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            done = list(pool.map(en.run, *zip(*runs))) if runs else []
+    for ((k, r), res) in zip(todo, done):
+        cache.put(k, res)
+        results[k] = res
+    return [results[k] for k in keys]
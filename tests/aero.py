@@ -0,0 +1,248 @@
+#%% Script information
+# Name: aero.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is giving the aerodynamic coefficients of the
+# vehicle (drag Cd, lift Cl and pitching moment Cm) from tables over the
+# Mach number, the Reynolds number and the angle of attack (see fnc.mach
+# and fnc.re for the first two). The tables are interpolated linearly over
+# the three axes (over log10 of the Reynolds number), and held at their
+# edges outside of them.
+#
+# The interpolation is prepared once, when the database is built: each cell
+# of the grid keeps the coefficients of its trilinear polynomial
+#   C(u, v, w) = a0 + a1*u + a2*v + a3*w + a4*u*v + a5*u*w + a6*v*w + a7*u*v*w
+# (u, v and w from 0 to 1 across the cell), so a lookup only has to find
+# the cell and evaluate it. Consecutive lookups of a trajectory usually
+# fall in the same cell or in one of its neighbours, so a Cursor remembers
+# the cell of the last lookup and checks those first (as fnc.AtmCursor does
+# with the layers of the atmosphere). A single lookup is done with plain
+# Python floats, arrays (one value per member of an ensemble) with NumPy.
+#
+# Databases are written to and read from JSON files (save, load), with the
+# three axes and the tables as nested lists [Mach][Reynolds][AoA].
+#
+#%% Packages
+import math
+import json
+from bisect import bisect_right
+import numpy as np
+import fnc as f
+
+#%% Database
+
+AXES = ('mach', 're', 'aoa')
+COEFFICIENTS = ('Cd', 'Cl', 'Cm')
+
+class Cursor:
+    # The aim of this class is remembering the cell of the last lookup of
+    # one or many trajectories, along each axis of a database.
+    # === INPUTS ===
+    # n [adim]          Number of trajectories (None for a single one)
+    # === ATTRIBUTES ===
+    # j                 Cell of each axis of the last lookup (list of 3
+    #                   values, or 3 x n array)
+    # jumps [adim]      Number of full searches done so far
+
+    def __init__(self, n=None):
+        self.n = n
+        self.jumps = 0
+        self.reset()
+
+    def reset(self):
+        # Sends the cursor back to the first cell of each axis.
+        self.j = [0, 0, 0] if self.n is None else np.zeros((3, self.n), dtype=np.intp)
+
+class Aero:
+    # The aim of this class is holding the tables of the coefficients and
+    # looking them up.
+    # === INPUTS ===
+    # mach [n_M]        Mach numbers of the tables, increasing
+    # re [n_R]          Reynolds numbers of the tables, increasing
+    # aoa [n_A]         Angles of attack of the tables [deg], increasing
+    # Cd [n_M x n_R x n_A]  Drag coefficient
+    # Cl, Cm            Lift and pitching moment coefficients (same shape,
+    #                   0 if None)
+    # === ATTRIBUTES ===
+    # grid [tuple]      Values of each axis (log10 of the Reynolds number)
+    # lo, hi [tuple]    Range of each axis (the inputs are held in it)
+    # bot, top [tuple]  Bounds of the cells of each axis (the first and the
+    #                   last ones open, for the values held at the edges)
+    # inv [tuple]       1/width of the cells of each axis
+    # coef [array]      Coefficients of the cells, (n_M-1) x (n_R-1) x
+    #                   (n_A-1) x 8 x 3 (an axis with a single value has a
+    #                   single cell)
+
+    def __init__(self, mach, re, aoa, Cd, Cl=None, Cm=None):
+        axes = [f.number('Aero', x, name).ravel() for (x, name) in zip((mach, re, aoa), AXES)]
+        for (x, name) in zip(axes, AXES):
+            if len(x) == 0 or np.any(np.diff(x) <= 0):
+                raise f.RangeError('Fn: Aero. ' + name + ' must have at least 1 value, increasing.')
+        if axes[1][0] <= 0:
+            raise f.RangeError('Fn: Aero. re must be positive.')
+        shape = tuple(len(x) for x in axes)
+        tables = []
+        for (C, name) in zip((Cd, Cl, Cm), COEFFICIENTS):
+            C = np.zeros(shape) if C is None else f.number('Aero', C, name)
+            if C.shape != shape:
+                raise f.InputError('Fn: Aero. ' + name + ' must be a ' + ' x '.join(map(str, shape))
+                                   + ' table (Mach x Reynolds x AoA).')
+            tables.append(C)
+        self.axes = tuple(axes)
+        self.tables = tuple(tables)
+        grid = (axes[0], np.log10(axes[1]), axes[2])
+        self.lo = tuple(float(g[0]) for g in grid)
+        self.hi = tuple(float(g[-1]) for g in grid)
+        # An axis with a single value gets a cell of width 1 (the value is
+        # always at its start)
+        self.grid = tuple(g if len(g) > 1 else np.append(g, g[0] + 1.) for g in grid)
+        self.bot = tuple(np.append(-np.inf, g[1:-1]) for g in self.grid)
+        self.top = tuple(np.append(g[1:-1], np.inf) for g in self.grid)
+        self.inv = tuple(1/np.diff(g) for g in self.grid)
+        # Corner values of each cell (axes with a single value repeated)
+        C = np.stack(tables, axis=-1)
+        for (k, n) in enumerate(shape):
+            if n == 1:
+                C = np.concatenate((C, C), axis=k)
+        c = {}
+        for (i, j, k) in np.ndindex(2, 2, 2):
+            c[i, j, k] = C[i:C.shape[0]-1+i, j:C.shape[1]-1+j, k:C.shape[2]-1+k]
+        a = (c[0,0,0], c[1,0,0] - c[0,0,0], c[0,1,0] - c[0,0,0], c[0,0,1] - c[0,0,0],
+             c[1,1,0] - c[1,0,0] - c[0,1,0] + c[0,0,0],
+             c[1,0,1] - c[1,0,0] - c[0,0,1] + c[0,0,0],
+             c[0,1,1] - c[0,1,0] - c[0,0,1] + c[0,0,0],
+             c[1,1,1] - c[1,1,0] - c[1,0,1] - c[0,1,1] + c[1,0,0] + c[0,1,0] + c[0,0,1] - c[0,0,0])
+        self.coef = np.stack(a, axis=-2)
+        # Lists, for single lookups
+        self.lists = tuple((g.tolist(), b.tolist(), t.tolist(), i.tolist())
+                           for (g, b, t, i) in zip(self.grid, self.bot, self.top, self.inv))
+        self.cells = self.coef.transpose(0, 1, 2, 4, 3).tolist()
+
+    def cursor(self, n=None):
+        # Cursor for the lookups of a single trajectory, or of n of them.
+        return Cursor(n)
+
+    def cell(self, k, x, cursor=None, idx=None):
+        # The aim of this method is to find the cell of the axis k of the
+        # values x (array), starting from the ones of the cursor (members
+        # idx of it, all of them if None).
+        # === OUTPUTS ===
+        # j [adim]          Cell of each value
+        # s [adim]          Position of each value in its cell (0 to 1)
+        g, bot, top, inv = self.grid[k], self.bot[k], self.top[k], self.inv[k]
+        x = np.clip(x, self.lo[k], self.hi[k])
+        last = len(g) - 2
+        if cursor is None:
+            j = np.clip(np.searchsorted(g, x, side='right') - 1, 0, last)
+        else:
+            j = cursor.j[k] if idx is None else cursor.j[k][idx]
+            move = (x < bot[j]) | (x >= top[j])
+            if np.any(move):
+                j = j.copy()
+                jm, xm = j[move], x[move]
+                jm = np.where(xm >= top[jm], np.minimum(jm + 1, last), np.maximum(jm - 1, 0))
+                far = (xm < bot[jm]) | (xm >= top[jm])
+                if np.any(far):
+                    jm[far] = np.clip(np.searchsorted(g, xm[far], side='right') - 1, 0, last)
+                    cursor.jumps += int(np.count_nonzero(far))
+                j[move] = jm
+                if idx is None:
+                    cursor.j[k] = j
+                else:
+                    cursor.j[k][idx] = j
+        return j, (x - g[j])*inv[j]
+
+    def cell1(self, k, x, cursor=None):
+        # Same as cell, for a single value.
+        g, bot, top, inv = self.lists[k]
+        lo, hi = self.lo[k], self.hi[k]
+        x = lo if x < lo else (hi if x > hi else x)
+        last = len(g) - 2
+        if cursor is None:
+            j = bisect_right(g, x) - 1
+            j = 0 if j < 0 else (last if j > last else j)
+        else:
+            j = cursor.j[k]
+            if not bot[j] <= x < top[j]:
+                if x >= top[j] and j < last and x < top[j+1]:
+                    j += 1
+                elif x < bot[j] and j > 0 and x >= bot[j-1]:
+                    j -= 1
+                else:
+                    j = bisect_right(g, x) - 1
+                    j = 0 if j < 0 else (last if j > last else j)
+                    cursor.jumps += 1
+                cursor.j[k] = j
+        return j, (x - g[j])*inv[j]
+
+    def lookup(self, M, Re, alpha, cursor=None, idx=None):
+        # The aim of this method is to obtain the coefficients at the given
+        # Mach numbers, Reynolds numbers and angles of attack (values or
+        # arrays of the same size).
+        # === INPUTS ===
+        # M [adim]          Mach number
+        # Re [adim]         Reynolds number
+        # alpha [deg]       Angle of attack
+        # cursor [Cursor]   Cells of the last lookup (None for a full search)
+        # idx [n]           Members of the cursor of the values (all if None)
+        # === OUTPUTS ===
+        # Cd, Cl, Cm [adim]
+        if isinstance(M, (int, float)) and isinstance(Re, (int, float)) and isinstance(alpha, (int, float)):
+            i, u = self.cell1(0, M, cursor)
+            j, v = self.cell1(1, math.log10(Re) if Re > 0 else self.lo[1], cursor)
+            k, w = self.cell1(2, alpha, cursor)
+            out = []
+            for a in self.cells[i][j][k]:
+                out.append(a[0] + u*(a[1] + v*a[4] + w*(a[5] + v*a[7])) + v*(a[2] + w*a[6]) + w*a[3])
+            return tuple(out)
+        M = np.asarray(M, dtype=float)
+        Re = np.asarray(Re, dtype=float)
+        with np.errstate(divide='ignore'):
+            logRe = np.log10(np.maximum(Re, 0.))
+        i, u = self.cell(0, M.ravel(), cursor, idx)
+        j, v = self.cell(1, logRe.ravel(), cursor, idx)
+        k, w = self.cell(2, np.asarray(alpha, dtype=float).ravel(), cursor, idx)
+        a = self.coef[i, j, k]
+        u, v, w = u[:,None], v[:,None], w[:,None]
+        C = (a[:,0] + u*(a[:,1] + v*a[:,4] + w*(a[:,5] + v*a[:,7])) + v*(a[:,2] + w*a[:,6])
+             + w*a[:,3])
+        return tuple(C[:,n].reshape(M.shape) for n in range(3))
+
+def constant(Cd, Cl=0., Cm=0.):
+    # The aim of this function is to build a database of constant
+    # coefficients (e.g. constant(c.Cd), the drag of c.py).
+    # === OUTPUTS ===
+    # aero [Aero]
+    return Aero([0.], [1.], [0.], [[[Cd]]], [[[Cl]]], [[[Cm]]])
+
+#%% Files
+
+def save(aero, path):
+    # The aim of this function is to write a database to a JSON file.
+    # === INPUTS ===
+    # aero [Aero]       Database
+    # path [str]        Path of the file
+    data = {name: x.tolist() for (name, x) in zip(AXES + COEFFICIENTS, aero.axes + aero.tables)}
+    with open(path, 'w') as file:
+        json.dump(data, file)
+    return path
+
+def load(path):
+    # The aim of this function is to read a database from a JSON file, with
+    # the axes mach, re and aoa and the tables Cd, Cl and Cm (the last two
+    # can be missing).
+    # === INPUTS ===
+    # path [str]        Path of the file
+    # === OUTPUTS ===
+    # aero [Aero]
+    try:
+        with open(path) as file:
+            data = json.load(file)
+    except ValueError:
+        raise f.InputError('Fn: load. ' + path + ' is not a JSON file.')
+    if not isinstance(data, dict) or any(name not in data for name in AXES + ('Cd',)):
+        raise f.InputError('Fn: load. ' + path + ' must have the axes ' + ', '.join(AXES) + ' and Cd.')
+    return Aero(*(data.get(name) for name in AXES + COEFFICIENTS))
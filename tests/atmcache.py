@@ -0,0 +1,102 @@
+#%% Script information
+# Name: atmcache.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is providing an opt-in cache for the atmospheric
+# model of fnc.py. Heights are quantized to a configurable resolution and
+# the properties of each quantized height are computed only once. The
+# cache keeps a bounded number of heights, dropping the least recently
+# used one when it is full, and counts its hits and misses.
+#
+# Monte Carlo runs and parameter sweeps query nearly identical heights
+# thousands of times. A cache obtained with shared() lives as long as the
+# process, so every run made by the process benefits from it.
+#
+#%% Packages
+from collections import OrderedDict
+import fnc as f
+
+#%% Cache
+
+class AtmCache:
+    # The aim of this class is storing the results of an atmospheric
+    # function of the geometric height, for quantized heights.
+    # === INPUTS ===
+    # resolution [m]   Heights are rounded to a multiple of this value
+    # maxsize [adim]   Largest number of heights kept in the cache
+    # fn [function]    Function of Z to be cached (fnc.atmosphere by default)
+    # === ATTRIBUTES ===
+    # hits [adim]      Number of queries answered by the cache
+    # misses [adim]    Number of queries that required evaluating fn
+
+    def __init__(self, resolution=1.0, maxsize=100000, fn=f.atmosphere):
+        self.resolution = resolution
+        self.inv_res = 1/resolution
+        self.maxsize = maxsize
+        self.fn = fn
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, Z):
+        # The aim of this method is to return fn evaluated at the multiple
+        # of the resolution closest to Z. Every height of the same bucket
+        # gets exactly the same result.
+        # === INPUTS ===
+        # Z [m]            Geometric height (single value)
+        # === OUTPUTS ===
+        # out              Output of fn at the quantized height
+        key = round(Z*self.inv_res)
+        data = self.data
+        out = data.get(key)
+        if out is not None:
+            self.hits += 1
+            data.move_to_end(key)
+            return out
+        self.misses += 1
+        out = self.fn(key*self.resolution)
+        data[key] = out
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
+        return out
+
+    def clear(self):
+        # Empties the cache and resets the counters.
+        self.data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        # The aim of this method is to report the usage of the cache.
+        # === OUTPUTS ===
+        # stats [dict]     hits, misses, hit rate, size and maxsize
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': self.hits/total if total else 0.,
+                'size': len(self.data), 'maxsize': self.maxsize,
+                'resolution': self.resolution}
+
+#%% Shared caches
+
+# Caches shared by every run of the process, by (fn, resolution)
+caches = {}
+
+def shared(resolution=1.0, maxsize=100000, fn=f.atmosphere):
+    # The aim of this function is to return the cache of the process for
+    # the given function and resolution, creating it on first use. The
+    # maxsize of an existing cache is raised if a larger one is requested.
+    # === INPUTS ===
+    # resolution [m]   Heights are rounded to a multiple of this value
+    # maxsize [adim]   Largest number of heights kept in the cache
+    # fn [function]    Function of Z to be cached (fnc.atmosphere by default)
+    # === OUTPUTS ===
+    # cache [AtmCache] Shared cache
+    key = (fn, resolution)
+    cache = caches.get(key)
+    if cache is None:
+        cache = caches[key] = AtmCache(resolution, maxsize, fn)
+    cache.maxsize = max(cache.maxsize, maxsize)
+    return cache
@@ -0,0 +1,492 @@
+#%% Script information
+# Name: batch.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is running many flights of the ascent (see
+# Flight.ascent) at once, in lock step: the states of the N members are the
+# rows of a N x 7 array, and each stage of the 4th order Runge-Kutta method
+# evaluates the atmosphere, the gravity, the thrust and the steering of all
+# of them in a single call over arrays (fnc.atmosphere and gravity.gravity
+# take arrays already). It is an alternative to one process per flight
+# (see ensemble.py) for 3-DOF dispersion studies: the cost of a step is
+# shared by the whole batch instead of being paid by every flight.
+#
+# Each member can have its own constants, initial state and density of the
+# air. The constants are changes of a vehicle (see vehicle.update), the
+# same for all the members (vehicle.VEHICLE by default). The phases are the
+# ones of Flight.ascent, and their constants are stored as arrays (one
+# value per member), so members in different phases are stepped together:
+# a coast is just a member with no mass flow.
+#
+# All the members step on the same grid of times (k*dt). When a member
+# changes of phase (or ends its flight) inside a step, the time of the
+# event is found on the interpolant of its step, as in engine.rk4, and
+# only that member is stepped again from there to the end of the step,
+# with the constants of the new phase. The members that are done are
+# masked out. The flights are the ones of Flight(method='rk4') but for
+# that: after a change of phase, engine.rk4 starts a new grid from the
+# time of the change, so both differ by the error of a step.
+#
+# The events are the ones of Flight.ascent but for Mach 1 and the maximum
+# dynamic pressure: the burnouts, the apogee and the impact.
+#
+# The mass flow of a stage with a throttle table (see propulsion.py)
+# follows it from the ignition of the stage, as in Flight: the members
+# share the Engine of each phase, and the rise and the stage 1 the same
+# one, so the burn goes on from one to the other.
+#
+# With a database of aerodynamic coefficients (see aero.py), the drag and
+# the lift of all the members are looked up in a single call, with a cursor
+# that keeps the cells of each member from one step to the next (see
+# dynamics.aerodynamics).
+#
+#%% Packages
+import math
+from functools import partial
+import numpy as np
+import c
+import fnc as f
+import gravity as gr
+import engine as e
+import propulsion as pr
+import dynamics as d
+import Flight as fl
+import vehicle as vh
+import ensemble as en
+
+#%% Phases
+
+PHASES = ('rise', 'stage 1', 'separation', 'stage 2', 'coast')
+# Steering laws: vertical rise, gravity turn (pitch kick and then along
+# the velocity) and a fixed angle over the velocity (dynamics.pitch_offset)
+VERTICAL, TURN, OFFSET = 0, 1, 2
+STEER = (VERTICAL, TURN, TURN, OFFSET, TURN)
+# Events of the phases: end of its duration, propellant run out, apogee
+# and impact (name, direction, action)
+EVENTS = ((None, 1, 'switch'), ('burnout', -1, 'switch'), ('apogee', -1, 'record'),
+          ('impact', -1, 'stop'))
+BURNOUT = (None, 'burnout #1', None, 'burnout #2', None)
+WATCH = np.array([[True, False, False, False],
+                  [False, True, False, False],
+                  [True, False, False, False],
+                  [False, True, False, False],
+                  [False, False, True, True]])
+
+def ascent(consts, v=None):
+    # The aim of this function is to build the constants of the phases of
+    # the ascent for each member, as in Flight.ascent.
+    # === INPUTS ===
+    # consts [list]     Constants of each member (see Flight.ascent)
+    # v [Vehicle]       Vehicle the constants change (vehicle.VEHICLE if
+    #                   None)
+    # === OUTPUTS ===
+    # table [dict]      {name: 5 x N array}: m_dot [kg/s], isp_v [s],
+    #                   isp_sl [s], mass [kg] (nan to keep it), duration [s]
+    #                   (inf for no limit), m_f [kg] (-inf for no burnout),
+    #                   offset [deg] (pitch over the velocity), and the
+    #                   constants of the vehicle of each member, the same
+    #                   in all the phases: kick [deg], azimuth [deg], Cd
+    #                   [adim], A_ref [m^2] and D_ref [m]
+    # engines [tuple]   Engine of each phase, for the throttle (None with
+    #                   no profile; the members must have the same one)
+    N = len(consts)
+    v = vh.VEHICLE if v is None else v
+    names = ('m_dot', 'isp_v', 'isp_sl', 'offset', 'kick', 'azimuth', 'Cd', 'A_ref', 'D_ref')
+    table = {name: np.zeros((len(PHASES), N)) for name in names}
+    table['mass'] = np.full((len(PHASES), N), np.nan)
+    table['duration'] = np.full((len(PHASES), N), np.inf)
+    table['m_f'] = np.full((len(PHASES), N), -np.inf)
+    stages = []
+    for (i, const) in enumerate(consts):
+        for name in const:
+            if name not in fl.ASCENT:
+                raise f.InputError('Fn: ascent. ' + str(name) + ' is not one of ' + ', '.join(fl.ASCENT) + '.')
+        vi = vh.update(v, **const)
+        if len(vi.stages) != 2:
+            raise f.InputError('Fn: ascent. The vehicle must have 2 stages.')
+        st1, st2 = vi.stages
+        stages.append(vi.stages)
+        table['m_dot'][:,i] = (st1.m_dot, st1.m_dot, 0., st2.m_dot, 0.)
+        table['isp_v'][:,i] = (st1.ISP_V, st1.ISP_V, 0., st2.ISP_V, 0.)
+        table['isp_sl'][:,i] = (st1.ISP_SL, st1.ISP_SL, 0., st2.ISP_SL, 0.)
+        table['duration'][0,i] = vi.t_kick
+        table['duration'][2,i] = 0.
+        table['mass'][0,i] = st1.M_i
+        table['mass'][2,i] = st2.M_i
+        table['m_f'][1,i] = st1.M_f
+        table['m_f'][3,i] = st2.M_f
+        table['offset'][3,i] = vi.pitch
+        for name in ('kick', 'azimuth', 'Cd', 'A_ref', 'D_ref'):
+            table[name][:,i] = getattr(vi, name)
+    # The rise and the stage 1 share the engine of the stage 1
+    e1, e2 = [None if sts[0].profile is None else pr.engine(sts) for sts in zip(*stages)] or (None, None)
+    return table, (e1, e1, None, e2, None)
+
+#%% Steering
+
+def steering(code, co, so, ck, sk, ca, sa, x, y, z, ux, uy, uz):
+    # The aim of this function is the same as the steering laws of
+    # dynamics.py, for arrays: each member uses the law of its phase.
+    # === INPUTS ===
+    # code [N]          Steering law (VERTICAL, TURN or OFFSET)
+    # co, so [N]        Cosine and sine of the angle over the velocity
+    # ck, sk [N]        Cosine and sine of the pitch kick (TURN)
+    # ca, sa [N]        Cosine and sine of the launch azimuth (TURN)
+    # x, y, z [m]       Position (ECI)
+    # ux, uy, uz [m/s]  Velocity relative to the air (ECI)
+    # === OUTPUTS ===
+    # ex, ey, ez [N]    Direction of the thrust (ECI)
+    ir = 1/np.sqrt(x*x + y*y + z*z)
+    upx, upy, upz = x*ir, y*ir, z*ir
+    u = np.sqrt(ux*ux + uy*uy + uz*uz)
+    iu = np.divide(1, u, out=np.zeros_like(u), where=u > 0)
+    vx, vy, vz = ux*iu, uy*iu, uz*iu
+    # Up, without its component along the velocity
+    k = upx*vx + upy*vy + upz*vz
+    nx, ny, nz = upx - k*vx, upy - k*vy, upz - k*vz
+    n = np.sqrt(nx*nx + ny*ny + nz*nz)
+    inn = np.divide(so, n, out=np.zeros_like(n), where=n > 0)
+    ex, ey, ez = co*vx + inn*nx, co*vy + inn*ny, co*vz + inn*nz
+    # Pitch kick of the gravity turn, until the velocity has turned as much
+    kick = (code == TURN) & ~((u > 0) & (k*u <= ck*u))
+    if np.any(kick):
+        rxy = np.sqrt(x*x + y*y)
+        irxy = np.divide(1, rxy, out=np.zeros_like(rxy), where=rxy > 0)
+        Ex = np.where(rxy > 0, -y*irxy, 0.)
+        Ey = np.where(rxy > 0, x*irxy, 1.)
+        Nx, Ny, Nz = -upz*Ey, upz*Ex, upx*Ey - upy*Ex
+        ex = np.where(kick, ck*upx + sk*(ca*Nx + sa*Ex), ex)
+        ey = np.where(kick, ck*upy + sk*(ca*Ny + sa*Ey), ey)
+        ez = np.where(kick, ck*upz + sk*ca*Nz, ez)
+    vertical = code == VERTICAL
+    return (np.where(vertical, upx, ex), np.where(vertical, upy, ey),
+            np.where(vertical, upz, ez))
+
+#%% Events
+
+def roots(fn, a, b, fa, fb, tol):
+    # The aim of this function is the same as engine.root, for arrays: the
+    # zero of each member is found at the same time.
+    side = np.zeros(len(a))
+    a, b, fa, fb = a.copy(), b.copy(), fa.copy(), fb.copy()
+    for k in range(200):
+        go = np.abs(b - a) > tol
+        if not np.any(go):
+            break
+        c = np.where(go, b - fb*(b - a)/np.where(go, fb - fa, 1.), b)
+        fc = fn(c)
+        zero = go & (fc == 0)
+        same = go & ~zero & ((fc > 0) == (fb > 0))
+        other = go & ~zero & ~same
+        fa = np.where(same & (side == -1), 0.5*fa, fa)
+        fb = np.where(other & (side == 1), 0.5*fb, fb)
+        b, fb = np.where(same | zero, c, b), np.where(same, fc, fb)
+        a, fa = np.where(other | zero, c, a), np.where(other, fc, fa)
+        side = np.where(same, -1, np.where(other, 1, side))
+    return b
+
+#%% Batch
+
+class Batch:
+    # The aim of this class is running the ascent of N members at once, in
+    # lock step (see the description of the module).
+    # === INPUTS ===
+    # consts [list]     Constants of each member (see Flight.ascent)
+    # y0 [N x 7]        Initial states (on the launch pad if None)
+    # t_max [s]         End of the flights, if they were not stopped before
+    # dt [s]            Time step
+    # atm [function]    Atmosphere for arrays of heights (fnc.atmosphere in
+    #                   unchecked mode if None)
+    # rho [N]           Factor of the density of the air of each member
+    # degree [adim]     Highest zonal harmonic of the gravity
+    # every [adim]      Steps of the grid between the states stored
+    # aero [Aero]       Database of the aerodynamic coefficients (None for
+    #                   the Cd of the vehicle and no lift)
+    # v [Vehicle]       Vehicle the constants change (vehicle.VEHICLE if
+    #                   None, see ascent)
+    # === ATTRIBUTES ===
+    # engines [tuple]   Engine of each phase (see ascent)
+    # t [s]             Time of the grid
+    # y [N x 7]         State of each member (at its end once it is done)
+    # k [N]             Phase of each member
+    # active [N]        True while the flight of the member goes on
+    # t_end [N]         Time of the end of each flight (nan until it ends)
+    # hits [list]       Events found for each member (engine.Hit)
+    # times, states     Times of the grid stored, and the states of all the
+    #                   members at them (nan for the members that are done)
+    # nfev [adim]       Calls of the derivative (each one for many members)
+
+    def __init__(self, consts, y0=None, t_max=10000., dt=0.25, atm=None,
+                 rho=None, degree=4, every=1, aero=None, v=None):
+        self.n = len(consts)
+        self.table, self.engines = ascent(consts, v)
+        # Phases that start a burn: the ones with no profile too, as Flight
+        self.ignite = np.array([k == 0 or eng is None or eng is not self.engines[k-1]
+                                for (k, eng) in enumerate(self.engines)])
+        self.t_max = t_max
+        self.dt = dt
+        self.atm = partial(f.atmosphere, checked=False) if atm is None else atm
+        self.degree = degree
+        self.every = every
+        if y0 is None:
+            y0 = [d.launch_state(m) for m in self.table['mass'][0]]
+        self.y = np.array(y0, dtype=float).reshape(self.n, len(d.STATE))
+        self.rho = np.ones(self.n) if rho is None else np.array(rho, dtype=float)
+        self.aero = aero
+        self.cursor = None if aero is None else aero.cursor(self.n)
+        self.t = 0.
+        self.k = np.zeros(self.n, dtype=int)
+        self.active = np.ones(self.n, dtype=bool)
+        self.t_end = np.full(self.n, np.nan)
+        self.hits = [[] for i in range(self.n)]
+        self.times = []
+        self.states = []
+        self.nfev = 0
+        # Constants of the current phase of each member (t_on, the time of
+        # the ignition of its burn)
+        self.p = {name: np.zeros(self.n) for name in ('m_dot', 'F_v', 'k_P', 'co', 'so', 'end', 'm_f',
+                                                      'ck', 'sk', 'ca', 'sa', 'k_D', 'A_ref', 'D_ref', 't_on')}
+        self.p['code'] = np.zeros(self.n, dtype=int)
+        self.watch = np.zeros((self.n, len(EVENTS)), dtype=bool)
+        self.enter(np.arange(self.n), np.zeros(self.n))
+
+    def enter(self, idx, t):
+        # The aim of this method is to start the current phase of the
+        # members idx at the times t: the constants of the phase are set,
+        # and so are the mass, if the phase sets it, and the time of the
+        # ignition, if the phase starts a burn. A phase with no duration
+        # (the separation) is left at once.
+        while len(idx):
+            k = self.k[idx]
+            table = {name: value[k, idx] for (name, value) in self.table.items()}
+            mass = table['mass']
+            self.y[idx,6] = np.where(np.isnan(mass), self.y[idx,6], mass)
+            self.p['m_dot'][idx] = table['m_dot']
+            self.p['F_v'][idx] = table['m_dot']*c.g0*table['isp_v']
+            self.p['k_P'][idx] = table['m_dot']*c.g0*(table['isp_v'] - table['isp_sl'])/d.P_SL
+            self.p['co'][idx] = np.cos(np.radians(table['offset']))
+            self.p['so'][idx] = np.sin(np.radians(table['offset']))
+            self.p['ck'][idx] = np.cos(np.radians(table['kick']))
+            self.p['sk'][idx] = np.sin(np.radians(table['kick']))
+            self.p['ca'][idx] = np.cos(np.radians(table['azimuth']))
+            self.p['sa'][idx] = np.sin(np.radians(table['azimuth']))
+            self.p['k_D'][idx] = 0.5*table['Cd']*table['A_ref']
+            self.p['A_ref'][idx] = table['A_ref']
+            self.p['D_ref'][idx] = table['D_ref']
+            self.p['end'][idx] = t + table['duration']
+            self.p['m_f'][idx] = table['m_f']
+            self.p['code'][idx] = np.take(STEER, k)
+            self.p['t_on'][idx] = np.where(self.ignite[k], t, self.p['t_on'][idx])
+            self.watch[idx] = WATCH[k]
+            over = table['duration'] <= 0
+            self.k[idx[over]] += 1
+            idx, t = idx[over], t[over]
+
+    def deriv(self, idx, t, y):
+        # The aim of this method is to compute the derivative of the states
+        # y (n x 7) of the members idx, all at once (see dynamics.derivative).
+        self.nfev += 1
+        x, yy, z, vx, vy, vz, m = y.T
+        h = np.sqrt(x*x + yy*yy + z*z) - c.R_E
+        ux = vx + c.w_E*yy
+        uy = vy - c.w_E*x
+        uz = vz
+        air = self.atm(np.clip(h, 0., d.Z_TOP))
+        low = h < d.Z_TOP
+        P = np.where(low, air[1], 0.)
+        u = np.sqrt(ux*ux + uy*uy + uz*uz)
+        g = gr.gravity(y[:,:3], self.degree, False)
+        p = {name: value[idx] for (name, value) in self.p.items()}
+        # Throttle of the members in phases with a profile
+        k = 1.
+        if any(eng is not None for eng in self.engines):
+            k = np.ones(len(idx))
+            phase = self.k[idx]
+            for (j, eng) in enumerate(self.engines):
+                on = phase == j
+                if eng is not None and np.any(on):
+                    k[on] = eng.throttle(t[on] - p['t_on'][on])
+        aT = (p['F_v']*k - p['k_P']*P)/m
+        ex, ey, ez = steering(p['code'], p['co'], p['so'], p['ck'], p['sk'], p['ca'], p['sa'],
+                              x, yy, z, ux, uy, uz)
+        if self.aero is None:
+            kD = np.where(low, p['k_D']*self.rho[idx]*air[2], 0.)*u/m
+            lx = ly = lz = 0.
+        else:
+            # Angle of attack between the thrust and the velocity (none
+            # without thrust), and the lift towards the thrust. The factor
+            # of the density changes the Reynolds number too (as
+            # ensemble.perturbed does with the kinematic viscosity)
+            iu = np.divide(1, u, out=np.zeros_like(u), where=u > 0)
+            burn = p['m_dot'] > 0
+            ca = np.where(burn, (ex*ux + ey*uy + ez*uz)*iu, 1.)
+            nx, ny, nz = ex - ca*ux*iu, ey - ca*uy*iu, ez - ca*uz*iu
+            n = np.where(burn, np.sqrt(nx*nx + ny*ny + nz*nz), 0.)
+            inn = np.divide(1, n, out=np.zeros_like(n), where=n > 0)
+            Cd, Cl, Cm = self.aero.lookup(u/air[3], u*p['D_ref']*self.rho[idx]/air[5], np.degrees(np.arctan2(n, ca)),
+                                          self.cursor, idx)
+            qS = np.where(low, 0.5*self.rho[idx]*air[2]*u*u*p['A_ref'], 0.)/m
+            kD = qS*Cd*iu
+            lx, ly, lz = qS*Cl*nx*inn, qS*Cl*ny*inn, qS*Cl*nz*inn
+        dy = np.empty_like(y)
+        dy[:,:3] = y[:,3:6]
+        dy[:,3] = g[:,0] - kD*ux + lx + aT*ex
+        dy[:,4] = g[:,1] - kD*uy + ly + aT*ey
+        dy[:,5] = g[:,2] - kD*uz + lz + aT*ez
+        dy[:,6] = -p['m_dot']*k
+        return dy
+
+    def events(self, idx, t, y):
+        # Values of the event functions (n x 4) of the members idx (see
+        # EVENTS), whether the phase of the member watches them or not.
+        r = np.sqrt(y[:,0]*y[:,0] + y[:,1]*y[:,1] + y[:,2]*y[:,2])
+        return np.stack((t - self.p['end'][idx], y[:,6] - self.p['m_f'][idx],
+                         np.einsum('ij,ij->i', y[:,:3], y[:,3:6]), r - c.R_E), axis=1)
+
+    def store(self):
+        # Stores the time of the grid and the states of the members.
+        self.times.append(self.t)
+        self.states.append(np.where(self.active[:,None], self.y, np.nan))
+
+    def step(self, k1, g, t1):
+        # The aim of this method is to take the members that are still
+        # flying from self.t to t1. The members with an event that ends
+        # their phase are taken to the time of the event and stepped again
+        # from there, until all of them reach t1 or are done.
+        # === INPUTS ===
+        # k1 [N x 7]        Derivative at the start of the step (updated)
+        # g [N x 4]         Event functions at the start of the step (updated)
+        # t1 [s]            End of the step
+        tm = np.full(self.n, self.t)
+        pending = self.active.copy()
+        direction = np.array([ev[1] for ev in EVENTS])
+        while np.any(pending):
+            idx = np.flatnonzero(pending)
+            t, y, f1 = tm[idx], self.y[idx], k1[idx]
+            h = (t1 - t)[:,None]
+            f2 = self.deriv(idx, t + 0.5*h[:,0], y + (0.5*h)*f1)
+            f3 = self.deriv(idx, t + 0.5*h[:,0], y + (0.5*h)*f2)
+            f4 = self.deriv(idx, np.full(len(idx), t1), y + h*f3)
+            y1 = y + (h/6)*(f1 + 2*(f2 + f3) + f4)
+            f5 = self.deriv(idx, np.full(len(idx), t1), y1)
+            ga, gb = g[idx], self.events(idx, np.full(len(idx), t1), y1)
+            with np.errstate(invalid='ignore'):
+                # Functions that are not watched may be infinite
+                crossed = (self.watch[idx] & ((ga*gb < 0) | ((gb == 0) & (ga != 0)))
+                           & ((gb - ga)*direction > 0))
+            # Event times (inf where there is no event)
+            te = np.full(crossed.shape, np.inf)
+            rows = np.flatnonzero(crossed.any(axis=1))
+            if len(rows):
+                dy = y1[rows] - y[rows]
+                bspl = h[rows]*f1[rows] - dy
+                r = (y[rows], dy, bspl, dy - h[rows]*f5[rows] - bspl, np.zeros_like(dy))
+                state = lambda s, j: self.events(idx[rows], s, e.interpolate(r, ((s - t[rows])/h[rows,0])[:,None]))[:,j]
+                for j in range(len(EVENTS)):
+                    on = crossed[rows,j]
+                    if np.any(on):
+                        a = np.where(on, t[rows], t1)
+                        found = roots(lambda s: state(s, j), a, np.full(len(rows), t1),
+                                      np.where(on, ga[rows,j], -1.), np.where(on, gb[rows,j], 1.), 1e-9)
+                        te[rows[on],j] = found[on]
+            action = np.array([ev[2] for ev in EVENTS])
+            stop = np.where(action != 'record', te, np.inf).min(axis=1)
+            # Events recorded, up to the one that ends the phase
+            for (i, j) in zip(*np.nonzero(np.isfinite(te) & (te <= stop[:,None]))):
+                if EVENTS[j][0] is None:
+                    continue
+                s = float(te[i,j])
+                ri = int(np.searchsorted(rows, i))
+                ys = e.interpolate(tuple(q[ri] for q in r), (s - t[i])/h[i,0])
+                name = BURNOUT[self.k[idx[i]]] if j == 1 else EVENTS[j][0]
+                self.hits[idx[i]].append(e.Hit(name, s, ys, EVENTS[j][2]))
+            # Members that reached t1
+            go = ~np.isfinite(stop)
+            self.y[idx[go]], k1[idx[go]], g[idx[go]] = y1[go], f5[go], gb[go]
+            pending[idx[go]] = False
+            # Members whose phase or flight ended
+            ended = np.flatnonzero(~go)
+            if len(ended):
+                i = idx[ended]
+                s = stop[ended]
+                ri = np.searchsorted(rows, ended)
+                ye = e.interpolate(tuple(q[ri] for q in r), ((s - t[ended])/h[ended,0])[:,None])
+                self.y[i] = ye
+                tm[i] = s
+                last = te[ended,3] == s
+                self.active[i[last]] = False
+                self.t_end[i[last]] = s[last]
+                pending[i[last]] = False
+                i, s, ye = i[~last], s[~last], ye[~last]
+                self.k[i] += 1
+                self.enter(i, s)
+                ye = self.y[i]
+                k1[i] = self.deriv(i, s, ye)
+                g[i] = self.events(i, s, ye)
+                pending[i[s >= t1]] = False
+
+    def run(self):
+        # The aim of this method is to run the flights of all the members,
+        # until all of them are done or t_max.
+        idx = np.arange(self.n)
+        k1 = self.deriv(idx, np.zeros(self.n), self.y)
+        g = self.events(idx, np.zeros(self.n), self.y)
+        self.store()
+        n = max(math.ceil(self.t_max/self.dt - 1e-9), 0)
+        for step in range(1, n+1):
+            t1 = step*self.dt if step < n else self.t_max
+            self.step(k1, g, t1)
+            self.t = t1
+            if step % self.every == 0 or not np.any(self.active):
+                self.store()
+            if not np.any(self.active):
+                break
+        self.t_end[self.active] = self.t
+        return self
+
+    def trajectory(self):
+        # Times (n) and states (n x N x 7) stored.
+        return np.array(self.times), np.array(self.states)
+
+    def summary(self, i):
+        # The aim of this method is to summarize the flight of the member i,
+        # as ensemble.summary.
+        events = {}
+        for hit in self.hits[i]:
+            if hit.name not in events:
+                events[hit.name] = (hit.t, float(np.linalg.norm(hit.y[:3])) - c.R_E,
+                                    float(np.linalg.norm(hit.y[3:6])))
+        return {'t': float(self.t_end[i]), 'y': self.y[i].copy(), 'events': events}
+
+    def summaries(self):
+        # Summary of the flight of each member.
+        return [self.summary(i) for i in range(self.n)]
+
+#%% Monte Carlo
+
+def monte_carlo(n, dist, seed=0, const=None, **opts):
+    # The aim of this function is the same as ensemble.monte_carlo, with
+    # all the samples run as a single batch. The values drawn for each
+    # sample are the same as there, for the same seed.
+    # === INPUTS ===
+    # n [adim]          Number of samples
+    # dist [dict]       Distributions (see ensemble.draw)
+    # seed [int]        Seed of the whole Monte Carlo
+    # const [dict]      Constants that are not dispersed (see Flight.ascent)
+    # opts              Inputs of Batch (v, the vehicle, among them)
+    # === OUTPUTS ===
+    # values [list]     Values drawn for each sample
+    # batch [Batch]     Batch already run
+    en.check(dist)
+    const = {} if const is None else const
+    values = [en.sample(seq, dist)[0] for seq in np.random.SeedSequence(seed).spawn(n)]
+    consts = [dict(const, **{name: x for (name, x) in v.items() if name in fl.ASCENT}) for v in values]
+    base = vh.VEHICLE if opts.get('v') is None else opts['v']
+    y0 = [d.launch_state(vh.update(base, **const).stages[0].M_i, v.get('lat_0', c.lat_0),
+                         v.get('long_0', c.long_0), v.get('Z_0', c.Z_0))
+          for (const, v) in zip(consts, values)]
+    rho = [v.get('rho', 1.) for v in values]
+    return values, Batch(consts, y0, rho=rho, **opts).run()
@@ -0,0 +1,335 @@
+#%% Script information
+# Name: ensemble.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is running many flights of the same vehicle with
+# different constants (see Flight.ascent), one after the other or over a
+# pool of processes.
+#
+# Branches: in trade studies of the upper stage, every variant flies the
+# same ascent up to the separation. That part is run once, its snapshot is
+# kept (see Flight.snapshot) and each variant goes on from it as a fork.
+#
+# Monte Carlo: the constants of the vehicle, the launch site and the air
+# density are drawn from distributions for each sample. Each sample has its
+# own stream of random numbers, spawned from a single seed, so a sample
+# gives the same flight whatever the number of samples or processes and
+# the order in which they run.
+#
+# The result of each flight is a summary (final time and state, and the
+# time, height and speed of each event) and, if asked for, the channels of
+# all of its steps (see trajectory.py). The steps can be sent back from the
+# processes of the pool with the summary (pickled, and so copied twice) or
+# written by them straight into a block of shared memory or a file mapped
+# in memory, allocated once for the whole ensemble (see Results).
+#
+#%% Packages
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import c
+import fnc as f
+import accel as a
+import dynamics as d
+import Flight as fl
+import trajectory as tr
+import vehicle as vh
+
+#%% Results
+
+def summary(flight):
+    # The aim of this function is to summarize a flight.
+    # === INPUTS ===
+    # flight [Flight]   Flight already run
+    # === OUTPUTS ===
+    # summary [dict]    t [s] and y of the end of the flight, and for each
+    #                   event its (time [s], height [m], speed [m/s])
+    events = {}
+    for hit in flight.hits:
+        if hit.name not in events:
+            events[hit.name] = (hit.t, float(np.linalg.norm(hit.y[:3])) - c.R_E,
+                                float(np.linalg.norm(hit.y[3:6])))
+    return {'t': flight.t, 'y': flight.y.copy(), 'events': events}
+
+def result(flight, full):
+    # Summary of the flight, and its steps (n_ch x n) if full is True. If
+    # full is the slot of a member in a Results block (see Results.slot),
+    # the steps are written there instead, and their number is added to
+    # the summary ('steps').
+    if isinstance(full, tuple):
+        return write(full, flight)
+    if full:
+        return summary(flight), flight.out.data[:,:len(flight.out)].copy()
+    return summary(flight)
+
+class Results:
+    # The aim of this class is holding the steps of all the flights of an
+    # ensemble in a single block, with the layout of trajectory.py for
+    # each member (one row per channel). The block is allocated once, in
+    # shared memory or in a file mapped in memory, and the processes of the
+    # pool write the steps of each flight straight into it: the parent sees
+    # them without copying them. The block must be big enough for the
+    # steps of every flight (see the recording policies of Trajectory).
+    # === INPUTS ===
+    # n [adim]          Number of members
+    # capacity [adim]   Steps of each member
+    # path [str]        File mapped in memory (shared memory if None)
+    # === ATTRIBUTES ===
+    # data [n x n_ch x capacity] Steps of all the members
+    # steps [n]         Number of steps of each member
+    # spec [tuple]      What a process needs to open the block
+
+    def __init__(self, n, capacity, path=None):
+        shape = (n, len(tr.CHANNELS), capacity)
+        if path is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=max(n*len(tr.CHANNELS)*capacity*8, 1))
+            self.data = np.ndarray(shape, dtype=float, buffer=self.shm.buf)
+            self.spec = ('shm', self.shm.name, shape)
+        else:
+            self.shm = None
+            self.data = np.memmap(path, dtype=float, mode='w+', shape=shape)
+            self.spec = ('file', path, shape)
+        self.steps = np.zeros(n, dtype=int)
+
+    def slot(self, i):
+        # Slot of the member i, to be passed to the processes.
+        return self.spec + (i,)
+
+    def __getitem__(self, i):
+        # Steps of the member i (n_ch x n, view).
+        return self.data[i,:,:self.steps[i]]
+
+    def __len__(self):
+        return len(self.steps)
+
+    def channel(self, i, name):
+        # Channel name of the member i (view).
+        return self.data[i,tr.INDEX[name],:self.steps[i]]
+
+    def close(self):
+        # The aim of this method is to release the block (the views of it
+        # must not be used after this). The file, if any, is kept.
+        if self.shm is None:
+            self.data.flush()
+            self.data = None
+        else:
+            self.data = None
+            self.shm.close()
+            self.shm.unlink()
+
+def write(slot, flight):
+    # The aim of this function is to write the steps of a flight into its
+    # slot of a Results block, from any process.
+    # === INPUTS ===
+    # slot [tuple]      See Results.slot
+    # flight [Flight]   Flight already run
+    # === OUTPUTS ===
+    # summary [dict]    See summary, with the number of steps ('steps')
+    kind, name, shape, i = slot
+    n = len(flight.out)
+    if n > shape[2]:
+        raise f.RangeError('Fn: Results. The flight has ' + str(n) + ' steps, more than the capacity of '
+                           + str(shape[2]) + '.')
+    if kind == 'shm':
+        shm = shared_memory.SharedMemory(name=name)
+        data = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        data[i,:,:n] = flight.out.data[:,:n]
+        del data
+        shm.close()
+    else:
+        data = np.memmap(name, dtype=float, mode='r+', shape=shape)
+        data[i,:,:n] = flight.out.data[:,:n]
+        data.flush()
+    return dict(summary(flight), steps=n)
+
+def slots(full, n):
+    # Value of full for each of n members: a slot of the block if full is
+    # a Results block.
+    return [full.slot(i) for i in range(n)] if isinstance(full, Results) else [full]*n
+
+def collect(full, results):
+    # Number of steps of each member, from the summaries, if full is a
+    # Results block.
+    if isinstance(full, Results):
+        full.steps[:] = [r['steps'] if isinstance(r, dict) else r[1]['steps'] for r in results]
+    return results
+
+#%% Runs
+
+def flight(const, opts):
+    # The aim of this function is to build the flight of the vehicle with
+    # the constants const (see Flight.ascent) and the inputs opts of Flight.
+    # The initial mass comes from the vehicle too (see Flight.ascent).
+    return fl.Flight(fl.ascent(**const), **opts)
+
+def run(const, opts, full=False):
+    # The aim of this function is to run a whole flight (see flight).
+    # === OUTPUTS ===
+    # result            See result
+    return result(flight(const, opts).run(), full)
+
+#%% Branches
+
+# Constants of the ascent that are used before the separation
+PREFIX = ('M_st1_i', 'M_st1_f', 'bt_st1', 'm_dot_st1', 'ISP_st1_SL', 'ISP_st1_V', 't_kick')
+
+def prefix(until='separation', const=None, **opts):
+    # The aim of this function is to run the part of the flight that all
+    # the branches share, up to the start of the phase until.
+    # === INPUTS ===
+    # until [str]       Phase where the branches start
+    # const [dict]      Constants of the ascent (see Flight.ascent)
+    # opts              Inputs of Flight
+    # === OUTPUTS ===
+    # snap [dict]       Snapshot of the flight at the start of until
+    const = {} if const is None else const
+    shared = flight(const, opts)
+    shared.advance(until=until)
+    return shared.snapshot()
+
+def branch(snap, variant, const, opts, full=False):
+    # The aim of this function is to run a branch from the snapshot of the
+    # shared part of the flight.
+    # === INPUTS ===
+    # snap [dict]       Snapshot (see prefix)
+    # variant [dict]    Constants of the branch (see Flight.ascent)
+    # const [dict]      Constants of the shared part
+    # opts [dict]       Inputs of Flight
+    # full             Give the steps of the flight too (see result)
+    # === OUTPUTS ===
+    # result            See result
+    return result(flight(dict(const, **variant), opts).restore(snap).run(), full)
+
+def branches(variants, until='separation', const=None, workers=None, full=False, **opts):
+    # The aim of this function is to run the variants of the upper stage as
+    # branches of a single run of the shared part of the flight.
+    # === INPUTS ===
+    # variants [list]   Constants of each branch (see Flight.ascent), e.g.
+    #                   [{'M_st2_i': 1500.}, {'bt_st2': 120., 'pitch_st2': 2.}]
+    # until [str]       Phase where the branches start
+    # const [dict]      Constants of the shared part (see Flight.ascent)
+    # workers [adim]    Number of processes (None to run the branches one
+    #                   after the other)
+    # full [bool]       Give the steps of each flight too (or Results, to
+    #                   write them there)
+    # opts              Inputs of Flight
+    # === OUTPUTS ===
+    # results [list]    Result of each branch (see result)
+    const = {} if const is None else const
+    for variant in variants:
+        for name in variant:
+            if name in PREFIX:
+                raise f.InputError('Fn: branches. ' + name + ' is used before the branches start.')
+    snap = prefix(until, const, **opts)
+    n = len(variants)
+    if workers is None:
+        return collect(full, [branch(snap, variant, const, opts, slot)
+                              for (variant, slot) in zip(variants, slots(full, n))])
+    with ProcessPoolExecutor(workers) as pool:
+        return collect(full, list(pool.map(branch, [snap]*n, variants, [const]*n, [opts]*n, slots(full, n))))
+
+def fresh(variants, const=None, workers=None, full=False, **opts):
+    # The aim of this function is the same as branches, but every variant
+    # is run from the launch pad (to compare with the branches).
+    const = {} if const is None else const
+    runs = [dict(const, **variant) for variant in variants]
+    n = len(runs)
+    if workers is None:
+        return collect(full, [run(variant, opts, slot) for (variant, slot) in zip(runs, slots(full, n))])
+    with ProcessPoolExecutor(workers) as pool:
+        return collect(full, list(pool.map(run, runs, [opts]*n, slots(full, n))))
+
+#%% Monte Carlo
+
+# Distributions (methods of numpy.random.Generator) and the names that can
+# be dispersed: constants of the ascent, launch site and a factor of the
+# density of the air
+DISTRIBUTIONS = ('normal', 'uniform', 'triangular', 'lognormal')
+DISPERSED = fl.ASCENT + ('lat_0', 'long_0', 'Z_0', 'rho')
+
+def perturbed(atm, k_rho):
+    # The aim of this function is to build an atmosphere whose density is
+    # the one of atm times k_rho (and so its kinematic viscosity is divided
+    # by k_rho).
+    def air(Z):
+        T, P, rho, a, mu, nu, g = atm(Z)
+        return T, P, rho*k_rho, a, mu, nu/k_rho, g
+    return air
+
+def draw(rng, dist):
+    # The aim of this function is to draw the values of a sample.
+    # === INPUTS ===
+    # rng [Generator]   Random numbers of the sample
+    # dist [dict]       {name: (distribution, parameters...)}, e.g.
+    #                   {'ISP_st1_SL': ('normal', 272., 2.)}
+    # === OUTPUTS ===
+    # values [dict]     {name: value}
+    return {name: float(getattr(rng, spec[0])(*spec[1:])) for (name, spec) in dist.items()}
+
+def sample(seq, dist):
+    # The aim of this function is to draw the values of a sample from its
+    # seed, and to give the seed of the random numbers of its flight.
+    # === OUTPUTS ===
+    # values [dict]     Values drawn (see draw)
+    # seq [SeedSequence] Seed of the flight
+    seq_draw, seq_flight = seq.spawn(2)
+    return draw(np.random.default_rng(seq_draw), dist), seq_flight
+
+def check(dist, fn='monte_carlo'):
+    # Input control of the distributions of a Monte Carlo (see draw).
+    for (name, spec) in dist.items():
+        if name not in DISPERSED:
+            raise f.InputError('Fn: ' + fn + '. ' + str(name) + ' is not one of ' + ', '.join(DISPERSED) + '.')
+        if not isinstance(spec, tuple) or not spec or spec[0] not in DISTRIBUTIONS:
+            raise f.InputError('Fn: ' + fn + '. The distribution of ' + name + ' must be a tuple (name, parameters...), '
+                               'with name one of ' + ', '.join(DISTRIBUTIONS) + '.')
+
+def member(seq, dist, const, opts, full=False):
+    # The aim of this function is to run a sample of a Monte Carlo.
+    # === INPUTS ===
+    # seq [SeedSequence] Seed of the sample
+    # dist [dict]       Distributions (see draw)
+    # const [dict]      Constants that are not dispersed (see Flight.ascent)
+    # opts [dict]       Inputs of Flight
+    # full             Give the steps of the flight too (see result)
+    # === OUTPUTS ===
+    # values [dict]     Values drawn
+    # result            See result
+    values, seq_flight = sample(seq, dist)
+    const = dict(const, **{name: x for (name, x) in values.items() if name in fl.ASCENT})
+    opts = dict(opts, seed=seq_flight)
+    if any(name in values for name in ('lat_0', 'long_0', 'Z_0')) and opts.get('y0') is None:
+        site = {name: values.get(name, getattr(c, name)) for name in ('lat_0', 'long_0', 'Z_0')}
+        vehicle = vh.update(vh.VEHICLE, **{name: x for (name, x) in const.items() if name in fl.ASCENT})
+        opts['y0'] = d.launch_state(vehicle.stages[0].M_i, site['lat_0'],
+                                    site['long_0'], site['Z_0'])
+    if 'rho' in values:
+        atm = opts.get('atm')
+        opts['atm'] = perturbed(a.atmosphere if atm is None else atm, values['rho'])
+    return values, run(const, opts, full)
+
+def monte_carlo(n, dist, seed=0, const=None, workers=None, full=False, **opts):
+    # The aim of this function is to run a Monte Carlo of the flight.
+    # === INPUTS ===
+    # n [adim]          Number of samples
+    # dist [dict]       Distributions (see draw)
+    # seed [int]        Seed of the whole Monte Carlo
+    # const [dict]      Constants that are not dispersed (see Flight.ascent)
+    # workers [adim]    Number of processes (None to run the samples one
+    #                   after the other)
+    # full [bool]       Give the steps of each flight too (or Results, to
+    #                   write them there)
+    # opts              Inputs of Flight
+    # === OUTPUTS ===
+    # samples [list]    (values, result) of each sample (see member)
+    check(dist)
+    const = {} if const is None else const
+    seqs = np.random.SeedSequence(seed).spawn(n)
+    if workers is None:
+        return collect(full, [member(seq, dist, const, opts, slot) for (seq, slot) in zip(seqs, slots(full, n))])
+    with ProcessPoolExecutor(workers) as pool:
+        return collect(full, list(pool.map(member, seqs, [dist]*n, [const]*n, [opts]*n, slots(full, n),
+                                           chunksize=max(1, n//(4*workers)))))
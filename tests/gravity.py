@@ -0,0 +1,113 @@
+#%% Script information
+# Name: gravity.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is computing the acceleration due to gravity as a
+# vector, including the zonal harmonics J2, J3 and J4 of the Earth.
+# fnc.g only gives the magnitude of the point mass gravity as a function of
+# the height, which is enough for the atmosphere but not for orbit
+# insertion or long coasts.
+#
+# The zonal terms only depend on the distance to the center of the Earth
+# and on the distance to the equatorial plane, i.e. the field is symmetric
+# about the polar axis. Since the ECEF and ECI frames share that axis, the
+# same function gives the acceleration in ECEF for ECEF positions and in
+# ECI for ECI positions (precession and nutation are neglected).
+#
+# Accelerations are obtained from the gradient of the potential
+#   U = mu/r * (1 - sum(Jn * (R/r)^n * Pn(sin(lat))))
+# Source: Vallado, Eq. (8-21) and Curtis, Section 4.7.
+#
+#%% Packages
+import math
+import numpy as np
+import c
+import fnc as f
+
+#%% Gravity
+
+def gravity(r, degree=4, checked=None):
+    # The aim of this function is to calculate the acceleration due to
+    # gravity at the given position(s). The terms shared by the three
+    # components (1/r, sin(lat) and the powers of both) are computed once.
+    # === INPUTS ===
+    # r [m]             Position (3 values) or positions (N x 3), ECEF or ECI
+    # degree [adim]     Highest zonal harmonic (0 for a point mass, 2 to 4)
+    # checked [bool]    Input control (None to use the mode of fnc.py)
+    # === OUTPUTS ===
+    # a [m/s^2]         Acceleration due to gravity, same shape and frame as r
+    # === CONSTANTS ===
+    # c.mu_E [m^3/s^2]  Gravitational parameter of the Earth
+    # c.R_E [m]         Equatorial radius of the Earth
+    # c.J2, c.J3, c.J4  Zonal harmonics of the Earth
+    # Input control
+    if f.CHECKED if checked is None else checked:
+        r = f.number('gravity', r, 'r')
+        if r.shape[-1:] != (3,) or r.ndim > 2:
+            raise f.InputError('Fn: gravity. r must have 3 values or be a N x 3 array.')
+        if not np.all(np.einsum('...i,...i', r, r) > 0):
+            raise f.RangeError('Fn: gravity. r must not be the center of the Earth.')
+        if degree not in (0, 2, 3, 4):
+            raise f.RangeError('Fn: gravity. degree must be 0, 2, 3 or 4.')
+    J2 = c.J2 if degree >= 2 else 0.
+    J3 = c.J3 if degree >= 3 else 0.
+    J4 = c.J4 if degree >= 4 else 0.
+    if np.ndim(r) == 1:
+        # Single position - plain Python floats, one array is created
+        x, y, z = float(r[0]), float(r[1]), float(r[2])
+        r2 = x*x + y*y + z*z
+        ir = 1/math.sqrt(r2)
+        s = z*ir                    # [adim] - sin(geocentric latitude)
+        s2 = s*s
+        u = c.R_E*ir                # [adim] - R/r
+        u2 = u*u
+        k = c.mu_E*ir*ir*ir         # [1/s^2] - mu/r^3
+        # Factors of the equatorial and polar components
+        fe = (1 + 1.5*J2*u2*(1 - 5*s2) + 2.5*J3*u2*u*s*(3 - 7*s2)
+              - 1.875*J4*u2*u2*(1 - 14*s2 + 21*s2*s2))
+        fp = (1 + 1.5*J2*u2*(3 - 5*s2) - 1.875*J4*u2*u2*(5 - 70/3*s2 + 21*s2*s2))
+        zp = 2.5*J3*u2*u*(6*s2 - 7*s2*s2 - 0.6)/ir
+        return np.array([-k*fe*x, -k*fe*y, -k*(fp*z + zp)])
+    # Positions - the same operations over arrays
+    r = np.asarray(r, dtype=float)
+    x, y, z = r[:,0], r[:,1], r[:,2]
+    ir = 1/np.sqrt(x*x + y*y + z*z)
+    s = z*ir
+    s2 = s*s
+    u = c.R_E*ir
+    u2 = u*u
+    k = c.mu_E*ir*ir*ir
+    fe = (1 + 1.5*J2*u2*(1 - 5*s2) + 2.5*J3*u2*u*s*(3 - 7*s2)
+          - 1.875*J4*u2*u2*(1 - 14*s2 + 21*s2*s2))
+    fp = (1 + 1.5*J2*u2*(3 - 5*s2) - 1.875*J4*u2*u2*(5 - 70/3*s2 + 21*s2*s2))
+    zp = 2.5*J3*u2*u*(6*s2 - 7*s2*s2 - 0.6)/ir
+    a = np.empty(r.shape)
+    kfe = -k*fe
+    a[:,0] = kfe*x
+    a[:,1] = kfe*y
+    a[:,2] = -k*(fp*z + zp)
+    return a
+
+def potential(r, degree=4):
+    # The aim of this function is to calculate the gravitational potential
+    # at the given position(s), e.g. to check the energy of a coast.
+    # === INPUTS ===
+    # r [m]             Position (3 values) or positions (N x 3), ECEF or ECI
+    # degree [adim]     Highest zonal harmonic (0 for a point mass, 2 to 4)
+    # === OUTPUTS ===
+    # U [m^2/s^2]       Potential (the acceleration is its gradient)
+    r = np.asarray(r, dtype=float)
+    rn = np.sqrt(np.einsum('...i,...i', r, r))
+    s = r[...,2]/rn
+    u = c.R_E/rn
+    P2 = 0.5*(3*s**2 - 1)
+    P3 = 0.5*(5*s**3 - 3*s)
+    P4 = 0.125*(35*s**4 - 30*s**2 + 3)
+    J = [c.J2*P2, c.J3*P3, c.J4*P4]
+    U = 1.
+    for n in range(2, degree+1):
+        U = U - J[n-2]*u**n
+    return (c.mu_E/rn*U)[()]
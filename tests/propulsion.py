@@ -0,0 +1,201 @@
+#%% Script information
+# Name: propulsion.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is giving the thrust and the mass flow of a stage
+# as functions of the time since its ignition and of the ambient pressure.
+# The mass flow follows a throttle table (profile): the throttle goes
+# linearly from one time of the table to the next, and keeps its last value
+# after the end of the table. The thrust is
+#   F(t, P) = k(t)*F_V - Ae*P
+# with k(t) the throttle, F_V the thrust in vacuum at the nominal mass flow
+# and Ae the exit area of the nozzle (see vehicle.py): the thrust in vacuum
+# goes with the mass flow, the loss due to the ambient pressure does not.
+# A stage with no profile has a throttle of 1, as in dynamics.py.
+#
+# Everything that does not depend on t or P is computed once, when the
+# Engine is built: the slope of each segment of the table and the
+# propellant burned up to each time of the table. A single value of t is
+# evaluated with plain Python floats, arrays with NumPy, so the same Engine
+# is called at every stage of the integrator of a flight, and over the
+# members of an ensemble (the constants of the engine can be arrays of one
+# value per member, all of them with the same profile).
+#
+#%% Packages
+from bisect import bisect_right
+from functools import partial
+import numpy as np
+import fnc as f
+
+#%% Constants
+
+Z_TOP = 1000000.                 # [m] - Top of the atmosphere (no pressure above)
+
+#%% Profiles
+
+def profile(t, throttle, fn='profile'):
+    # The aim of this function is to check a throttle table and to give it
+    # as a hashable value (see vehicle.stage).
+    # === INPUTS ===
+    # t [s]             Times since ignition, from 0 and increasing
+    # throttle [adim]   Mass flow over the nominal one at each time
+    # === OUTPUTS ===
+    # profile [tuple]   (times, throttles), tuples of floats
+    t = f.number(fn, t, 't').ravel()
+    throttle = f.number(fn, throttle, 'throttle').ravel()
+    if len(t) == 0 or len(t) != len(throttle):
+        raise f.InputError('Fn: ' + fn + '. t and throttle must have the same number of values (at least 1).')
+    if t[0] != 0 or np.any(np.diff(t) <= 0):
+        raise f.RangeError('Fn: ' + fn + '. t must start at 0 and increase.')
+    if np.any(throttle < 0):
+        raise f.RangeError('Fn: ' + fn + '. throttle must not be negative.')
+    return (tuple(t.tolist()), tuple(throttle.tolist()))
+
+def thrust_profile(st, t, F_V):
+    # The aim of this function is to obtain the throttle table of a stage
+    # from a table of its thrust in vacuum.
+    # === INPUTS ===
+    # st [Stage]        Stage (see vehicle.stage)
+    # t [s]             Times since ignition, from 0 and increasing
+    # F_V [N]           Thrust in vacuum at each time
+    # === OUTPUTS ===
+    # profile [tuple]   (times, throttles)
+    return profile(t, f.number('thrust_profile', F_V, 'F_V')/st.F_V, 'thrust_profile')
+
+#%% Engine
+
+class Engine:
+    # The aim of this class is evaluating the throttle, the mass flow and
+    # the thrust of a stage (or of the same stage of many members).
+    # === INPUTS ===
+    # m_dot [kg/s]      Nominal mass flow (value or array of n values)
+    # F_V [N]           Thrust in vacuum at the nominal mass flow (idem)
+    # Ae [m^2]          Exit area of the nozzle (idem)
+    # profile [tuple]   Throttle table (see profile), None for a throttle of 1
+    # === ATTRIBUTES ===
+    # tk [s]            Times of the table
+    # kk [adim]         Throttle at each time of the table
+    # bk [1/s]          Slope of the throttle after each time of the table
+    # Bk [s]            Integral of the throttle up to each time of the
+    #                   table (propellant burned over the nominal m_dot)
+
+    def __init__(self, m_dot, F_V, Ae, profile=None):
+        self.m_dot = m_dot
+        self.F_V = F_V
+        self.Ae = Ae
+        self.profile = profile
+        t, k = (0.,), (1.,)
+        if profile is not None:
+            t, k = profile
+        self.tk = np.array(t)
+        self.kk = np.array(k)
+        self.bk = np.append(np.diff(self.kk)/np.diff(self.tk), 0.)
+        self.Bk = np.append(0., np.cumsum(0.5*(self.kk[1:] + self.kk[:-1])*np.diff(self.tk)))
+        # Lists of the table, for single values
+        self.lists = (self.tk.tolist(), self.kk.tolist(), self.bk.tolist(), self.Bk.tolist())
+
+    def segment(self, t):
+        # Segment of the table of the times t (0 before the table), and the
+        # time since its start.
+        if isinstance(t, (int, float)):
+            tk = self.lists[0]
+            t = t if t > 0 else 0.
+            j = bisect_right(tk, t) - 1
+            return j, t - tk[j]
+        t = np.maximum(np.asarray(t, dtype=float), 0.)
+        j = np.searchsorted(self.tk, t, side='right') - 1
+        return j, t - self.tk[j]
+
+    def throttle(self, t):
+        # The aim of this method is to obtain the throttle at the times t
+        # since ignition (value or array).
+        # === OUTPUTS ===
+        # throttle [adim]
+        if self.profile is None:
+            return 1. if isinstance(t, (int, float)) else np.ones(np.shape(t))
+        j, s = self.segment(t)
+        if isinstance(t, (int, float)):
+            return self.lists[1][j] + self.lists[2][j]*s
+        return self.kk[j] + self.bk[j]*s
+
+    def flow(self, t):
+        # Mass flow [kg/s] at the times t since ignition.
+        return self.m_dot*self.throttle(t)
+
+    def thrust(self, t, P):
+        # The aim of this method is to obtain the thrust at the times t since
+        # ignition and the ambient pressures P (values or arrays).
+        # === OUTPUTS ===
+        # thrust [N]
+        return self.F_V*self.throttle(t) - self.Ae*P
+
+    def ambient(self, t, Z, atm=None):
+        # The aim of this method is to obtain the thrust at the times t since
+        # ignition and the heights Z, with the pressure of the atmosphere
+        # (no pressure above Z_TOP, and the one of the ground below 0).
+        # === INPUTS ===
+        # t [s]             Times since ignition (value or array)
+        # Z [m]             Geometric heights (value or array)
+        # atm [function]    Atmosphere, atm(Z) -> T, P, ... (fnc.atmosphere
+        #                   in unchecked mode if None)
+        # === OUTPUTS ===
+        # thrust [N]
+        if atm is None:
+            atm = partial(f.atmosphere, checked=False)
+        if isinstance(Z, (int, float)):
+            P = atm(float(min(max(Z, 0.), Z_TOP)))[1] if Z < Z_TOP else 0.
+        else:
+            Z = np.asarray(Z, dtype=float)
+            P = np.where(Z < Z_TOP, atm(np.clip(Z, 0., Z_TOP))[1], 0.)
+        return self.thrust(t, P)
+
+    def burned(self, t):
+        # The aim of this method is to obtain the propellant burned from
+        # ignition up to the times t (value or array).
+        # === OUTPUTS ===
+        # burned [kg]
+        j, s = self.segment(t)
+        if isinstance(t, (int, float)):
+            tk, kk, bk, Bk = self.lists
+            return self.m_dot*(Bk[j] + (kk[j] + 0.5*bk[j]*s)*s)
+        return self.m_dot*(self.Bk[j] + (self.kk[j] + 0.5*self.bk[j]*s)*s)
+
+    def time(self, M):
+        # The aim of this method is to obtain the time since ignition at
+        # which the propellant M has been burned (e.g. M_prop gives the
+        # burnout), inf if it is never burned.
+        # === INPUTS ===
+        # M [kg]            Propellant (value or array)
+        # === OUTPUTS ===
+        # time [s]
+        r = np.maximum(np.asarray(M, dtype=float)/self.m_dot, 0.)
+        j = np.searchsorted(self.Bk, r, side='right') - 1
+        r = r - self.Bk[j]
+        k, b = self.kk[j], self.bk[j]
+        # Root of b/2*s^2 + k*s = r, in a form that holds for b = 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            s = np.where(r > 0, 2*r/(k + np.sqrt(np.maximum(k*k + 2*b*r, 0.))), 0.)
+        s = np.where(np.isnan(s), np.inf, s)
+        out = self.tk[j] + s
+        return float(out) if out.ndim == 0 else out
+
+def engine(stages):
+    # The aim of this function is to build the Engine of a stage, or of the
+    # same stage of many members (one value of each constant per member).
+    # === INPUTS ===
+    # stages [Stage]    Stage (see vehicle.stage), or list of stages with
+    #                   the same profile
+    # === OUTPUTS ===
+    # engine [Engine]
+    if hasattr(stages, 'profile'):
+        return Engine(stages.m_dot, stages.F_V, stages.Ae, stages.profile)
+    stages = list(stages)
+    if not stages:
+        raise f.InputError('Fn: engine. At least one stage is needed.')
+    if any(st.profile != stages[0].profile for st in stages):
+        raise f.InputError('Fn: engine. The stages of an engine must have the same profile.')
+    return Engine(np.array([st.m_dot for st in stages]), np.array([st.F_V for st in stages]),
+                  np.array([st.Ae for st in stages]), stages[0].profile)
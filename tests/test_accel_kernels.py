@@ -0,0 +1,92 @@
+#%% Script information
+# Name: test_accel_kernels.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the functions of the accel.py file
+# against the ones of the fnc.py file, and to measure their cost. Run it
+# with LIA_BACKEND=numpy to test the fallback when numba is missing.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+import numpy as np
+import fnc as f
+import accel as a
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+print('The backend is',a.info(),'\n')
+t0 = time.perf_counter()
+a.warmup()
+t1 = time.perf_counter()
+print('The cost of the warmup is',round(t1-t0,3),'[s]','\n')
+
+print('Test #1 - Atmosphere and gravity from 0km to 1000km')
+Z = np.linspace(0,10**6,20001).tolist()
+err = 0
+for value in Z:
+    air = f.atmosphere(value)
+    err = max(err, max(abs(x/y-1) for (x,y) in zip(a.atmosphere(value), air)))
+    err = max(err, abs(a.g(value)/f.g(value)-1))
+print('The largest relative difference with fnc.py is',err,'\n')
+
+print('Test #2 - Mach, Reynolds and matrices')
+rng = np.random.default_rng(0)
+err = 0
+for (x, y) in rng.uniform(-3,3,(1000,2)).tolist():
+    err = max(err, abs(a.mach(x, 340.)-f.mach(x, 340.)))
+    err = max(err, abs(a.re(x, 1.5e-5, 1.2)-f.re(x, 1.5e-5, 1.2)))
+    err = max(err, np.abs(a.Tge(x, y)-f.Tge(x, y)).max())
+    err = max(err, np.abs(a.Tei(x)-f.Tei(x)).max())
+    err = max(err, np.abs(a.Tmv(x)-f.Tmv(x)).max())
+    err = max(err, np.abs(a.Tvg(x, y)-f.Tvg(x, y)).max())
+print('The largest difference with fnc.py is',err,'\n')
+
+print('Test #3 - Cost of a call [us]')
+n = 100000
+print('Function       fnc.py       accel.py')
+for (name, args) in [('atmosphere', (5000.,)), ('g', (5000.,)), ('mach', (300., 320.)),
+                     ('re', (300., 1.5e-5, 1.2)), ('Tge', (0.5, -0.6)), ('Tei', (0.3,)),
+                     ('Tmv', (0.2,)), ('Tvg', (0.1, 0.4))]:
+    cost = []
+    for fn in (getattr(f, name), getattr(a, name)):
+        t0 = time.perf_counter()
+        for k in range(n):
+            out = fn(*args)
+        cost.append((time.perf_counter()-t0)/n*10**6)
+    print(name.ljust(14), str(round(cost[0],3)).ljust(12), round(cost[1],3))
+print()
+
+if a.BACKEND == 'numba':
+    print('Test #4 - Calls from a compiled loop')
+    @a.numba.njit
+    def ascent(Z):
+        # Sum of the dynamic pressures at the given heights, at Mach 2
+        q = 0.
+        for k in range(Z.size):
+            T, P, rho, Vs, mu, nu, g = a.atmosphere(Z[k])
+            q += 0.5*rho*(2*Vs)**2
+        return q
+    Z = np.linspace(0,10**5,10**6)
+    ascent(Z[:10])
+    t0 = time.perf_counter()
+    q = ascent(Z)
+    t1 = time.perf_counter()
+    print('The cost of an atmosphere call from compiled code is',round((t1-t0)/Z.size*10**9,1),'[ns]','\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+# The functions of accel.py do not validate their inputs, out of range
+# heights give meaningless results instead of errors.
+testval = [-15, 1200000]
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The input geometric height is ',value,sep='')
+    print('The output is',a.atmosphere(value),'\n')
@@ -0,0 +1,142 @@
+#%% Script information
+# Name: test_aero_database.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the databases of aerodynamic
+# coefficients of the aero.py file (lookups, cursors, files and their use
+# in a flight and in a batch).
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import os
+import time
+import tempfile
+from functools import partial
+import numpy as np
+import c
+import fnc as f
+import accel as a
+import aero as ae
+import Flight as fl
+import batch as b
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+a.warmup()
+folder = tempfile.mkdtemp()
+mach = np.array([0., 0.6, 0.9, 1.1, 1.5, 3., 6.])
+re = np.array([1e5, 1e6, 1e7, 1e8])
+aoa = np.array([0., 2., 5., 10.])
+Cd = (0.3 + 0.25*np.exp(-((mach - 1.05)/0.2)**2))[:,None,None] - 0.01*np.log10(re)[None,:,None] \
+     + 0.004*aoa[None,None,:]**2
+Cl = 0.06*aoa[None,None,:]*(1 + 0.1*mach[:,None,None])*np.ones((1, len(re), 1))
+Cm = -0.02*aoa[None,None,:]*np.ones((len(mach), len(re), 1))
+db = ae.Aero(mach, re, aoa, Cd, Cl, Cm)
+
+print('Test #1 - Lookups')
+print('At the nodes:',np.allclose(db.lookup(1.1, 1e6, 5.), (Cd[3,1,2], Cl[3,1,2], Cm[3,1,2])))
+u, v, w = 0.25, 0.5, 0.6
+x = (1.1 + u*0.4, 10**(6 + v), 5. + w*5.)
+corner = lambda C: sum(C[3+i,1+j,2+k]*(u if i else 1-u)*(v if j else 1-v)*(w if k else 1-w)
+                       for i in (0, 1) for j in (0, 1) for k in (0, 1))
+print('Inside a cell:',np.allclose(db.lookup(*x), [corner(C) for C in (Cd, Cl, Cm)]))
+print('Held at the edges:',db.lookup(9., 1e9, 20.) == db.lookup(6., 1e8, 10.),\
+      db.lookup(-1., 0., -5.) == db.lookup(0., 1e5, 0.))
+rng = np.random.default_rng(0)
+M, Re, alpha = rng.uniform(-0.5, 7., 1000), 10**rng.uniform(4., 9., 1000), rng.uniform(0., 12., 1000)
+C = db.lookup(M, Re, alpha)
+print('Arrays, same as one by one:',np.allclose(np.array(C).T, [db.lookup(float(p), float(q), float(r))
+                                                                 for (p, q, r) in zip(M, Re, alpha)]))
+print('Constant database:',ae.constant(c.Cd).lookup(2.3, 1e7, 4.),'\n')
+
+print('Test #2 - Cursors')
+t = np.linspace(0., 150., 6001)
+path = (6*(t/150)**2, 10**(7.5 - 2.5*t/150), 8*np.sin(t/20)**2)
+cur = db.cursor()
+out = [db.lookup(float(p), float(q), float(r), cur) for (p, q, r) in zip(*path)]
+print('Single trajectory: same values:',np.allclose(out, np.array(db.lookup(*path)).T),\
+      '- full searches:',cur.jumps,'of',3*len(t),'cells')
+n = 2000
+curs = db.cursor(n)
+shift = rng.uniform(0., 10., n)
+same = True
+for s in t[::20]:
+    ts = np.minimum(s + shift, 150.)
+    p = (6*(ts/150)**2, 10**(7.5 - 2.5*ts/150), 8*np.sin(ts/20)**2)
+    same = same and np.allclose(db.lookup(*p, cursor=curs), db.lookup(*p))
+print('Batch of',n,'trajectories: same values:',same,'- full searches:',curs.jumps)
+idx = np.arange(0, n, 2)
+p = (np.full(len(idx), 2.), np.full(len(idx), 1e6), np.full(len(idx), 3.))
+others = curs.j[:,1::2].copy()
+print('Members idx only:',np.allclose(db.lookup(*p, cursor=curs, idx=idx), db.lookup(*p)),\
+      '- cells of the others kept:',np.array_equal(curs.j[:,1::2], others),'\n')
+
+print('Test #3 - Cost of the lookups')
+N = 100000
+tic = time.perf_counter()
+for i in range(N):
+    db.lookup(1.2, 3e6, 4., cur)
+print('Single lookup with a cursor:',round((time.perf_counter() - tic)/N*1e6,3),'[us]')
+M, Re, alpha = rng.uniform(0., 6., 10000), 10**rng.uniform(5., 8., 10000), rng.uniform(0., 10., 10000)
+curs = db.cursor(10000)
+db.lookup(M, Re, alpha, curs)
+tic = time.perf_counter()
+for i in range(100):
+    db.lookup(M, Re, alpha, curs)
+print('10000 lookups with a cursor:',round((time.perf_counter() - tic)/100*1e3,3),'[ms]','\n')
+
+print('Test #4 - Files')
+path = ae.save(db, os.path.join(folder, 'aero.json'))
+db2 = ae.load(path)
+print('Same tables:',all(np.array_equal(p, q) for (p, q) in zip(db.tables + db.axes, db2.tables + db2.axes)),'\n')
+
+print('Test #5 - Flights')
+ref = fl.Flight(t_max=400.).run()
+flight = fl.Flight(fl.ascent(aero=ae.constant(c.Cd)), t_max=400.).run()
+print('Constant Cd of c.py: burnout #2 at',round(flight.hit('burnout #2').t,3),'[s] - without database:',\
+      round(ref.hit('burnout #2').t,3),'[s] - distance:',round(np.linalg.norm(flight.y[:3] - ref.y[:3]),4),'[m]')
+for pitch in (0., 5.):
+    flight = fl.Flight(fl.ascent(aero=db, pitch_st2=pitch), t_max=400.).run()
+    hit = flight.hit('burnout #2')
+    print('Tables, pitch_st2 =',pitch,'[deg]: burnout #2 at',round(np.linalg.norm(hit.y[3:6]),3),\
+          '[m/s] - largest drag:',round(flight.out['drag'].max(),1),'[N] - largest lift:',\
+          round(flight.out['lift'].max(),1),'[N]')
+consts = [{}, {'pitch_st2': 5.}, {'bt_st1': 100.}]
+atm = partial(f.atmosphere, checked=False)
+batch = b.Batch(consts, t_max=300., dt=0.25, aero=db).run()
+for (i, const) in enumerate(consts):
+    flight = fl.Flight(fl.ascent(aero=db, **const), t_max=300., method='rk4', dt=0.25,
+                       atm=atm, dense=False).run()
+    print('Batch member #',i,' - distance to the flight: ',np.linalg.norm(flight.y[:3] - batch.y[i,:3]),' [m]',sep='')
+print('Full searches of the batch:',batch.cursor.jumps,'in',batch.nfev,'calls of the derivative\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+with open(os.path.join(folder, 'bad.json'), 'w') as file:
+    file.write('Cd = 0.35')
+ae.save(db, os.path.join(folder, 'nocd.json'))
+data = open(os.path.join(folder, 'nocd.json')).read().replace('"Cd"', '"CD"')
+with open(os.path.join(folder, 'nocd.json'), 'w') as file:
+    file.write(data)
+
+testval = [('Aero', ae.Aero, ([0., 2., 1.], [1e6], [0.], np.zeros((3, 1, 1)))),
+           ('Aero', ae.Aero, ([0.], [0., 1e6], [0.], np.zeros((1, 2, 1)))),
+           ('Aero', ae.Aero, ([0., 1.], [1e6], [0.], np.zeros((1, 2, 1)))),
+           ('Aero', ae.Aero, ([], [1e6], [0.], np.zeros((0, 1, 1)))),
+           ('Aero', ae.Aero, ([0.], [1e6], [0.], [[['a']]])),
+           ('load', ae.load, (os.path.join(folder, 'bad.json'),)),
+           ('load', ae.load, (os.path.join(folder, 'nocd.json'),))]
+aux = np.arange(1,len(testval)+1)
+
+for (index,(name, fn, args)) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The inputs of ',name,' are ',args,sep='')
+    try:
+        print('The output is',fn(*args),'\n')
+    except f.FncError as err:
+        print('The error is:',err,'\n')
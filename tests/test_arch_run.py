@@ -0,0 +1,95 @@
+#%% Script information
+# Name: test_arch_run.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the .trj files of the archive.py file
+# (class Archive, function save and class Run).
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import os
+import time
+import tempfile
+import numpy as np
+import c
+import fnc as f
+import accel as a
+import stream as st
+import archive as ar
+import Flight as fl
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+a.warmup()
+folder = tempfile.mkdtemp()
+
+print('Test #1 - Trajectory of a flight saved and read back')
+flight = fl.Flight(method='rk4', dt=0.25).run()
+path = ar.save(os.path.join(folder, 'rk4.trj'), flight.out, meta={'method': 'rk4', 'dt': 0.25})
+run = ar.Run(path)
+print('Steps:',len(run),'- file size:',os.path.getsize(path),'[bytes] - data:',flight.out.data[:,:len(run)].nbytes,'[bytes]')
+print('Same values:',all(np.array_equal(run[name], flight.out[name]) for name in run.channels))
+print('Units:',run.units)
+print('Constants: bt_st1 =',run.constants['bt_st1'],'- M_st1_i =',run.constants['M_st1_i'],'- mu_E =',run.constants['mu_E'])
+print('Backend:',run.header['backend'],'- meta:',run.header['meta'],'\n')
+
+print('Test #2 - Stream written to a file, with a fine index')
+path2 = os.path.join(folder, 'dopri.trj')
+written, = st.publish(fl.Flight(dense=False).stream(), ar.Archive(path2, every=16))
+run2 = ar.Run(written)
+print('Steps:',len(run2),'- index entries:',len(run2.index),'- parts left:',os.path.exists(path2 + '.parts'))
+print('Time index is the time of every 16th step:',np.array_equal(run2.index, run2['t'][::16]),'\n')
+
+print('Test #3 - Time windows against a search over all the times')
+rng = np.random.default_rng(0)
+wrong = 0
+for r in [run, run2]:
+    t = np.array(r['t'])
+    for k in range(500):
+        t0, t1 = np.sort(rng.uniform(-10, t[-1] + 10, 2))
+        if k % 50 == 0:
+            t0 = t1 = t[rng.integers(len(t))]
+        w = r.window(t0, t1)
+        wrong += (w.start, w.stop) != (int(np.searchsorted(t, t0, 'left')), int(np.searchsorted(t, t1, 'right')))
+print('Wrong windows:',wrong,'of 1000')
+data = run.read(['t', 'm', 'thrust'], 105, 107)
+print('Stage #1 burnout, t:',np.array(data['t']),'- m:',np.array(data['m']),'- thrust:',np.round(data['thrust'],1),'\n')
+
+print('Test #4 - Reading a window of the file vs loading the same run from a CSV file')
+csv = os.path.join(folder, 'rk4.csv')
+np.savetxt(csv, flight.out.data[:,:len(flight.out)].T, delimiter=',')
+t0 = time.perf_counter()
+for k in range(100):
+    q = np.array(ar.Run(path).read(['q'], 40, 60)['q'])
+t1 = time.perf_counter()
+table = np.loadtxt(csv, delimiter=',')
+q2 = table[(table[:,0] >= 40) & (table[:,0] <= 60),13]
+t2 = time.perf_counter()
+print('Window of the .trj file:',round((t1-t0)*10,3),'[ms] - CSV file:',round((t2-t1)*1000,3),'[ms] - max q:',\
+      round(q.max(),1),round(q2.max(),1),'[N/m^2]\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+print('Test Mistake #1 - The file is a CSV file')
+try:
+    print('The output is',ar.Run(csv),'\n')
+except f.FncError as err:
+    print('The error is:',err,'\n')
+
+print('Test Mistake #2 - The channel is speed')
+try:
+    print('The output is',run['speed'],'\n')
+except f.FncError as err:
+    print('The error is:',err,'\n')
+
+print('Test Mistake #3 - The window is from 100s to 50s')
+try:
+    print('The output is',run.window(100, 50),'\n')
+except f.FncError as err:
+    print('The error is:',err,'\n')
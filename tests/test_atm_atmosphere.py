@@ -0,0 +1,75 @@
+#%% Script information
+# Name: test_atm_atmosphere.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the function atmosphere within the 
+# category atm in the fnc.py file, against the chain of functions 
+# table4 - tm - p - rho - Vs - visc - g.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+import numpy as np
+import fnc as f
+
+def chain(Z):
+    b, Lmb, Tmb, Hb, H, Pb = f.table4(Z)
+    tm = f.tm(Tmb,Lmb,H,Hb)
+    p = f.p(Tmb,Lmb,H,Hb,Pb)
+    rho = f.rho(p,tm)
+    dvisc, kvisc = f.visc(tm,rho)
+    return tm, p, rho, f.Vs(tm), dvisc, kvisc, f.g(Z)
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+# Z value to be tested
+testval = [0, 5000, 12000, 21500, 33000, 49000, 52000, 65000, 76500] 
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test #',index,sep='')
+    print('The Z value is',value,'[m]')
+    air = f.atmosphere(value)
+    tm, p, rho, vs, dvisc, kvisc, g = chain(value)
+    print('The T value is',air.T,'- the chain gives',tm,'[K]')
+    print('The P value is',air.P,'- the chain gives',p,'[N/m^2]')
+    print('The rho value is',air.rho,'- the chain gives',rho,'[kg/m^3]')
+    print('The a value is',air.a,'- the chain gives',vs,'[m/s]')
+    print('The mu value is',air.mu,'- the chain gives',dvisc,'[N.s/m^2]')
+    print('The nu value is',air.nu,'- the chain gives',kvisc,'[m^2/s]')
+    print('The g value is',air.g,'- the chain gives',g,'[m/s^2]','\n')
+
+# Array evaluation
+Z = np.linspace(0,85990,10**5)
+err = [np.max(np.abs(x/y - 1)) for (x,y) in zip(f.atmosphere(Z),chain(Z))]
+print('Largest relative difference with the chain over',len(Z),'heights:',max(err),'\n')
+
+# Cost of a single call
+Zs = Z[::10].tolist()
+t0 = time.perf_counter()
+for value in Zs:
+    f.atmosphere(value)
+t1 = time.perf_counter()
+for value in Zs:
+    chain(value)
+t2 = time.perf_counter()
+print('Cost of atmosphere:',round((t1-t0)/len(Zs)*10**6,2),'[us]')
+print('Cost of the chain:',round((t2-t1)/len(Zs)*10**6,2),'[us]','\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [-15, 1200000, 'string']
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The input geometric height is ',value,sep='')
+    try:
+        print('The output is',f.atmosphere(value),'\n')
+    except f.FncError as e:
+        print('The error is:',e,'\n')
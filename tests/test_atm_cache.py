@@ -0,0 +1,78 @@
+#%% Script information
+# Name: test_atm_cache.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the class AtmCache of the atmcache.py
+# file, repeating the heights of an ensemble of ascents.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+import numpy as np
+import fnc as f
+import atmcache as ac
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+# 50 ascents that differ slightly, 0.25s steps up to 80km
+rng = np.random.default_rng(0)
+t = np.arange(0,200,0.25)
+runs = [(8*10**4*(t/200)**1.5*rng.uniform(0.999,1.001)).tolist() for k in range(50)]
+
+def chain(Z):
+    # Full state of the air from the chain of functions of the Standard
+    b, Lmb, Tmb, Hb, H, Pb = f.table4(Z)
+    tm = f.tm(Tmb,Lmb,H,Hb)
+    p = f.p(Tmb,Lmb,H,Hb,Pb)
+    rho = f.rho(p,tm)
+    dvisc, kvisc = f.visc(tm,rho)
+    return tm, p, rho, dvisc, kvisc
+
+print('Test #1 - Chain of functions, resolution of 1m')
+cache = ac.shared(resolution=1.0, maxsize=10**5, fn=chain)
+for sweep in range(2):
+    t0 = time.perf_counter()
+    for Z in runs:
+        for value in Z:
+            out = cache(value)
+    t1 = time.perf_counter()
+    print('Sweep #',sweep+1,' - ','the cost of a query with the cache is ',\
+          round((t1-t0)/(len(runs)*len(t))*10**6,2),' [us]',sep='')
+    print('The cache stats are',cache.stats())
+t0 = time.perf_counter()
+for Z in runs:
+    for value in Z:
+        out = chain(value)
+t1 = time.perf_counter()
+print('The cost of a query without the cache is',round((t1-t0)/(len(runs)*len(t))*10**6,2),'[us]')
+print('The same cache is returned by shared():',ac.shared(resolution=1.0, fn=chain) is cache,'\n')
+
+print('Test #2 - Error due to the quantization')
+cache = ac.shared(resolution=1.0)
+err = max(abs(cache(value).rho/f.atmosphere(value).rho - 1) for value in runs[0])
+print('The largest relative error in rho is',err,'\n')
+
+print('Test #3 - Eviction')
+cache = ac.AtmCache(resolution=1.0, maxsize=100)
+for value in range(200):
+    cache(float(value))
+cache(150.)
+cache(0.)
+print('The cache stats are',cache.stats(),'\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [-15, 1200000]
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The input geometric height is ',value,sep='')
+    try:
+        print('The output is',cache(value),'\n')
+    except f.FncError as e:
+        print('The error is:',e,'\n')
@@ -0,0 +1,67 @@
+#%% Script information
+# Name: test_atm_cursor.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the class AtmCursor within the category
+# atm in the fnc.py file, along a single ascent and along an ensemble of 
+# ascents, against the function atmosphere.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+import numpy as np
+import fnc as f
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+# Ascent from 0 to 1000km, 0.01s steps
+t = np.linspace(0,400,40001)
+Z = 10**6*(t/400)**1.5
+
+print('Test #1 - Single trajectory')
+cur = f.AtmCursor()
+diff = 0
+t0 = time.perf_counter()
+for value in Z.tolist():
+    air = cur(value)
+t1 = time.perf_counter()
+for value in Z.tolist():
+    diff = max(diff, abs(cur(value).P/f.atmosphere(value).P - 1))
+print('The largest relative difference in P with atmosphere is',diff)
+print('The number of full searches is',cur.jumps)
+print('The cost of a call is',round((t1-t0)/len(Z)*10**6,2),'[us]','\n')
+
+print('Test #2 - Ensemble of 1000 trajectories')
+scale = np.random.default_rng(0).uniform(0.5,1.5,1000)
+cur = f.AtmCursor(len(scale))
+diff = 0
+for value in Z[::40]:
+    Zk = np.minimum(value*scale,10**6)
+    diff = max(diff, np.max(np.abs(cur(Zk).P/f.atmosphere(Zk).P - 1)))
+print('The largest relative difference in P with atmosphere is',diff)
+print('The number of full searches is',cur.jumps,'\n')
+
+print('Test #3 - Jump')
+cur = f.AtmCursor()
+cur(1000.)
+air = cur(50000.)
+print('The layer after jumping from 1km to 50km is',cur.b)
+print('The number of full searches is',cur.jumps,'\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [-15, 1200000]
+aux = np.arange(1,len(testval)+1)
+cur = f.AtmCursor()
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The input geometric height is ',value,sep='')
+    try:
+        print('The output is',cur(value),'\n')
+    except f.FncError as e:
+        print('The error is:',e,'\n')
@@ -39,7 +39,10 @@ aux = np.arange(1,len(testval)+1)
 
 for (index,value) in zip(aux,testval):
     print('Test Mistake #',index,' - ','The input geometric height is ',value,sep='')
-    print('The Z value is',value,'[m]')
-    g = f.g(value)
-    print('The g value is',round(g,4),'[m/s^2]')
-    print('The g value from table is',teov,'[m/s^2]','\n')
\ No newline at end of file
+    try:
+        print('The Z value is',value,'[m]')
+        g = f.g(value)
+        print('The g value is',round(g,4),'[m/s^2]')
+        print('The g value from table is',teov,'[m/s^2]','\n')
+    except f.FncError as e:
+        print('The error is:',e,'\n')
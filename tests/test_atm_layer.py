@@ -12,7 +12,7 @@ cls = lambda: print("\033[2J\033[;H", end='')
 cls()
 
 import numpy as np
-from fnc import layer
+from fnc import layer, FncError
 
 #%% Tests that are meant to work
 print('====== Tests that should work ======','\n')
@@ -33,6 +33,9 @@ aux = np.arange(1,len(testval)+1)
 
 for (index,value) in zip(aux,testval):
     print('Test Mistake #',index,' - ','The input value is ',value,sep='')
-    b = layer(value)
-    print('The layer value is',b,'\n')
+    try:
+        b = layer(value)
+        print('The layer value is',b,'\n')
+    except FncError as e:
+        print('The error is:',e,'\n')
 
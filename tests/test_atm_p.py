@@ -30,6 +30,13 @@ for (index,value,teov) in zip(aux,testval,teo_val):
     p = f.p(Tmb,Lmb,H,Hb,Pb)
     print('The p value is',round(p/100,3),'[mbar]')
     print('The p value from table is',teov,'[mbar]','\n')
+
+print('Test #',len(testval)+1,' - Arrays without input control',sep='')
+H = np.array([12., 13.])
+for (Tmb, Lmb, Hb, Pb) in [(216.65, 0., 11., 22632.06), (288.15, -6.5, 0., 101325.)]:
+    print('Lmb =',Lmb,'[K/km\'] - checked:',np.round(f.p(Tmb,Lmb,H,Hb,Pb)/100,3),\
+          '- unchecked:',np.round(f.p(Tmb,Lmb,H,Hb,Pb,checked=False)/100,3),'[mbar]')
+print()
 #%% Tests that are NOT meant to work
 
 print('====== Tests that should NOT work ======','\n')
@@ -39,7 +46,10 @@ aux = np.arange(1,len(testval)+1)
 
 for (index,value) in zip(aux,testval):
     print('Test Mistake #',index,' - ','The input geometric height is ',value,sep='')
-    b, Lmb, Tmb, Hb, H, Pb = f.table4(value)
-    print('The H value is',round(H*1000),'[m\']')
-    p = f.p(Tmb,Lmb,H,Hb,Pb)
-    print('The p value is',round(p/100,3),'[mbar]','\n')
\ No newline at end of file
+    try:
+        b, Lmb, Tmb, Hb, H, Pb = f.table4(value)
+        print('The H value is',round(H*1000),'[m\']')
+        p = f.p(Tmb,Lmb,H,Hb,Pb)
+        print('The p value is',round(p/100,3),'[mbar]','\n')
+    except f.FncError as e:
+        print('The error is:',e,'\n')
@@ -41,10 +41,13 @@ aux = np.arange(1,len(testval)+1)
 
 for (index,value) in zip(aux,testval):
     print('Test Mistake #',index,' - ','The input geometric height is ',value,sep='')
-    b, Lmb, Tmb, Hb, H, Pb = f.table4(value)
-    print('The H value is',round(H*1000),'[m\']')
-    tm = f.tm(Tmb,Lmb,H,Hb)
-    p = f.p(Tmb,Lmb,H,Hb,Pb)
-    rho = f.rho(p,tm)
-    print('The rho value is',round(rho,6),'[kg/m^3]')
-    print('The rho value from table is',teov,'[kg/m^3]','\n')
\ No newline at end of file
+    try:
+        b, Lmb, Tmb, Hb, H, Pb = f.table4(value)
+        print('The H value is',round(H*1000),'[m\']')
+        tm = f.tm(Tmb,Lmb,H,Hb)
+        p = f.p(Tmb,Lmb,H,Hb,Pb)
+        rho = f.rho(p,tm)
+        print('The rho value is',round(rho,6),'[kg/m^3]')
+        print('The rho value from table is',teov,'[kg/m^3]','\n')
+    except f.FncError as e:
+        print('The error is:',e,'\n')
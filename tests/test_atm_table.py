@@ -0,0 +1,86 @@
+#%% Script information
+# Name: test_atm_table.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the tabulated atmosphere of the 
+# atmtable.py file against the analytic model of the fnc.py file.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import os
+import time
+import tempfile
+import numpy as np
+import fnc as f
+import atmtable as at
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+# Maximum relative errors to be tested
+testval = [1e-4, 1e-6, 1e-8]
+aux = np.arange(1,len(testval)+1)
+Z = np.random.default_rng(0).uniform(0,85999,10**5)
+
+for (index,value) in zip(aux,testval):
+    print('Test #',index,sep='')
+    t0 = time.perf_counter()
+    tab = at.AtmTable(value)
+    t1 = time.perf_counter()
+    err = np.max(np.abs(tab.interp(Z)/at.analytic(Z) - 1))
+    print('The requested maximum relative error is',value)
+    print('The table has',len(tab.Zn),'nodes, dz =',tab.dz,'[m], built in',\
+          round(t1-t0,3),'[s]')
+    print('The maximum relative error found is',err,'\n')
+
+# Scalar queries - table vs analytic chain
+Zs = Z[:10**4].tolist()
+tab(0.)           # The first scalar query prepares the scalar lookup data
+t0 = time.perf_counter()
+for value in Zs:
+    tab(value)
+t1 = time.perf_counter()
+for value in Zs:
+    at.analytic(value)
+t2 = time.perf_counter()
+print('Scalar query from the table:',round((t1-t0)/len(Zs)*10**6,2),'[us]')
+print('Scalar query from the analytic model:',round((t2-t1)/len(Zs)*10**6,2),'[us]','\n')
+
+# Cache on disk
+path = os.path.join(tempfile.mkdtemp(),'atm_table.npz')
+tab = at.AtmTable.cached(path,1e-6)
+t0 = time.perf_counter()
+tab2 = at.AtmTable.cached(path,1e-6)
+t1 = time.perf_counter()
+print('Table loaded from disk in',round((t1-t0)*1000,2),'[ms]')
+print('Properties at 1000m:',tab2(1000.))
+print('Properties at 1000m from the analytic model:',at.analytic(1000.)[0])
+# Path without the extension: the table is found in path + '.npz'
+path = os.path.join(tempfile.mkdtemp(),'atm_table')
+at.AtmTable.cached(path,1e-6)
+written = os.path.getmtime(path + '.npz')
+tab3 = at.AtmTable.cached(path,1e-6)
+print('Path without .npz, table loaded and not written again:',os.path.getmtime(path + '.npz') == written,\
+      np.array_equal(tab3.table, tab.table),'\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [-15, 90000, 'string']
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The input geometric height is ',value,sep='')
+    try:
+        print('The output is',tab(value),'\n')
+    except f.FncError as e:
+        print('The error is:',e,'\n')
+
+print('Test Mistake #',len(testval)+1,' - The requested maximum relative error is 1e-14, too small for the grid',sep='')
+try:
+    print('The output is',at.AtmTable(1e-14),'\n')
+except f.FncError as e:
+    print('The error is:',e,'\n')
@@ -37,10 +37,13 @@ aux = np.arange(1,len(testval)+1)
 
 for (index,value) in zip(aux,testval):
     print('Test Mistake #',index,' - ','The input geometric height is ',value,sep='')
-    b, Lmb, Tmb, Hb, H, Pb = f.table4(value)
-    print('The layer value is',b)
-    print('The Lmb value is',Lmb,'[K/km\']')
-    print('The Tmb value is',Tmb,'[K]')
-    print('The Hb value is',Hb,'[km\']')
-    print('The H value is',round(H,2),'[km\']')
-    print('The Pb value is',Pb,'[N/m^2]','\n')
+    try:
+        b, Lmb, Tmb, Hb, H, Pb = f.table4(value)
+        print('The layer value is',b)
+        print('The Lmb value is',Lmb,'[K/km\']')
+        print('The Tmb value is',Tmb,'[K]')
+        print('The Hb value is',Hb,'[km\']')
+        print('The H value is',round(H,2),'[km\']')
+        print('The Pb value is',Pb,'[N/m^2]','\n')
+    except f.FncError as e:
+        print('The error is:',e,'\n')
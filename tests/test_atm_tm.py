@@ -35,7 +35,10 @@ aux = np.arange(1,len(testval)+1)
 
 for (index,value) in zip(aux,testval):
     print('Test Mistake #',index,' - ','The input geometric height is ',value,sep='')
-    b, Lmb, Tmb, Hb, H, Pb = f.table4(value)
-    print('The H value is',round(H*1000),'[m\']')
-    tm = f.tm(Tmb,Lmb,H,Hb)
-    print('The Tm value is',round(tm,3),'[K]','\n')
\ No newline at end of file
+    try:
+        b, Lmb, Tmb, Hb, H, Pb = f.table4(value)
+        print('The H value is',round(H*1000),'[m\']')
+        tm = f.tm(Tmb,Lmb,H,Hb)
+        print('The Tm value is',round(tm,3),'[K]','\n')
+    except f.FncError as e:
+        print('The error is:',e,'\n')
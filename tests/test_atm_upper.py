@@ -0,0 +1,66 @@
+#%% Script information
+# Name: test_atm_upper.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the function upper within the category
+# atm in the fnc.py file, against Table I of the US Standard Atmosphere 
+# 1976, and the function atmosphere over the 0-1000km range.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+import numpy as np
+import fnc as f
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+# Z value to be tested
+testval = [86000, 100000, 120000, 150000, 200000, 300000, 500000, 700000, 1000000] 
+# Theoretical value of the properties
+teo_val1 = [186.87, 195.08, 360.00, 634.39, 854.56, 976.01, 999.24, 999.97, 1000.0]
+teo_val2 = [3.7338*10**-1, 3.2011*10**-2, 2.5382*10**-3, 4.5422*10**-4, \
+            8.4736*10**-5, 8.7704*10**-6, 3.0236*10**-7, 3.1908*10**-8, \
+            7.5138*10**-9]
+teo_val3 = [6.958*10**-6, 5.604*10**-7, 2.222*10**-8, 2.076*10**-9, \
+            2.541*10**-10, 1.916*10**-11, 5.215*10**-13, 3.070*10**-14, \
+            3.561*10**-15]
+aux = np.arange(1,len(testval)+1)
+
+for (index,value,teov1,teov2,teov3) in zip(aux,testval,teo_val1,teo_val2,teo_val3):
+    print('Test #',index,sep='')
+    print('The Z value is',value,'[m]')
+    T, P, rho = f.upper(value)
+    print('The T value is',round(T,2),'[K]')
+    print('The T value from table is',teov1,'[K]')
+    print('The P value is',format(P,'.4e'),'[N/m^2]')
+    print('The P value from table is',format(teov2,'.4e'),'[N/m^2]')
+    print('The rho value is',format(rho,'.4e'),'[kg/m^3]')
+    print('The rho value from table is',format(teov3,'.4e'),'[kg/m^3]','\n')
+
+# Array evaluation and cost of the full range
+Z = np.linspace(0,1000000,10**5)
+air = f.atmosphere(Z)
+print('Density from 0 to 1000km goes from',air.rho[0],'to',air.rho[-1],'[kg/m^3]')
+Zs = Z[::10].tolist()
+t0 = time.perf_counter()
+for value in Zs:
+    f.atmosphere(value)
+t1 = time.perf_counter()
+print('Cost of atmosphere over 0-1000km:',round((t1-t0)/len(Zs)*10**6,2),'[us]','\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [50000, 1200000, 'string']
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The input geometric height is ',value,sep='')
+    try:
+        print('The output is',f.upper(value),'\n')
+    except f.FncError as e:
+        print('The error is:',e,'\n')
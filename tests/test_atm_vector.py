@@ -0,0 +1,76 @@
+#%% Script information
+# Name: test_atm_vector.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the array evaluation of the functions
+# within the atm category in the fnc.py file, comparing it against the 
+# scalar evaluation of the same functions.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+import numpy as np
+import fnc as f
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+# Z values to be tested (every layer, including both of its boundaries)
+testval = np.array([0, 5000, 11019, 12000, 20063, 21500, 32162, 33000, \
+                    47350, 49000, 51412, 52000, 65000, 71802, 76500, 85990])
+
+b, Lmb, Tmb, Hb, H, Pb = f.table4(testval)
+tm = f.tm(Tmb,Lmb,H,Hb)
+p = f.p(Tmb,Lmb,H,Hb,Pb)
+rho = f.rho(p,tm)
+vs = f.Vs(tm)
+dvisc, kvisc = f.visc(tm,rho)
+
+for (index,value) in enumerate(testval):
+    bs, Lmbs, Tmbs, Hbs, Hs, Pbs = f.table4(value)
+    tms = f.tm(Tmbs,Lmbs,Hs,Hbs)
+    ps = f.p(Tmbs,Lmbs,Hs,Hbs,Pbs)
+    rhos = f.rho(ps,tms)
+    print('Test #',index+1,sep='')
+    print('The Z value is',value,'[m]')
+    print('The layer value is',b[index],'- scalar evaluation gives',bs)
+    print('The p value is',p[index],'[N/m^2] - scalar evaluation gives',ps)
+    print('The rho value is',rho[index],'[kg/m^3] - scalar evaluation gives',rhos,'\n')
+
+# Timing of a large number of altitudes
+Z = np.linspace(0,85990,10**6)
+t0 = time.perf_counter()
+b, Lmb, Tmb, Hb, H, Pb = f.table4(Z)
+tm = f.tm(Tmb,Lmb,H,Hb)
+p = f.p(Tmb,Lmb,H,Hb,Pb)
+rho = f.rho(p,tm)
+dvisc, kvisc = f.visc(tm,rho)
+t1 = time.perf_counter()
+print('Array evaluation of',len(Z),'altitudes took',round(t1-t0,3),'[s]')
+t0 = time.perf_counter()
+for value in Z[:10**4]:
+    bs, Lmbs, Tmbs, Hbs, Hs, Pbs = f.table4(value)
+    tms = f.tm(Tmbs,Lmbs,Hs,Hbs)
+    ps = f.p(Tmbs,Lmbs,Hs,Hbs,Pbs)
+    rhos = f.rho(ps,tms)
+    dvisc, kvisc = f.visc(tms,rhos)
+t1 = time.perf_counter()
+print('Scalar evaluation of',len(Z),'altitudes takes about',\
+      round((t1-t0)*100,3),'[s]','\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [np.array([5000, 90000]), np.array([-15, 5000])] # Try also: ['a', 5000].
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The input geometric heights are ',value,sep='')
+    try:
+        out = f.table4(value)
+        print('The output is',out,'\n')
+    except f.FncError as e:
+        print('The error is:',e,'\n')
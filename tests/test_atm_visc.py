@@ -50,14 +50,17 @@ aux = np.arange(1,len(testval)+1)
 
 for (index,value) in zip(aux,testval):
     print('Test Mistake #',index,' - ','The input geometric height is ',value,sep='')
-    print('The Z value is',value,'[m]')
-    b, Lmb, Tmb, Hb, H, Pb = f.table4(value)
-    print('The H value is',round(H*1000),'[m\']')
-    tm = f.tm(Tmb,Lmb,H,Hb)
-    p = f.p(Tmb,Lmb,H,Hb,Pb)
-    rho = f.rho(p,tm)
-    dvisc, kvisc = f.visc(tm,rho)
-    print('The dvisc value is',round(dvisc,8),'[N.s/m^2]')
-    print('The dvisc value from table is',round(teov1,8),'[N.s/m^2]')
-    print('The kvisc value is',round(kvisc,8),'[m^2/s]')
-    print('The kvisc value from table is',round(teov2,8),'[m^2/s]','\n')
\ No newline at end of file
+    try:
+        print('The Z value is',value,'[m]')
+        b, Lmb, Tmb, Hb, H, Pb = f.table4(value)
+        print('The H value is',round(H*1000),'[m\']')
+        tm = f.tm(Tmb,Lmb,H,Hb)
+        p = f.p(Tmb,Lmb,H,Hb,Pb)
+        rho = f.rho(p,tm)
+        dvisc, kvisc = f.visc(tm,rho)
+        print('The dvisc value is',round(dvisc,8),'[N.s/m^2]')
+        print('The dvisc value from table is',round(teov1,8),'[N.s/m^2]')
+        print('The kvisc value is',round(kvisc,8),'[m^2/s]')
+        print('The kvisc value from table is',round(teov2,8),'[m^2/s]','\n')
+    except f.FncError as e:
+        print('The error is:',e,'\n')
@@ -40,10 +40,13 @@ aux = np.arange(1,len(testval)+1)
 
 for (index,value) in zip(aux,testval):
     print('Test Mistake #',index,' - ','The input geometric height is ',value,sep='')
-    print('The Z value is',value,'[m]')
-    b, Lmb, Tmb, Hb, H, Pb = f.table4(value)
-    print('The H value is',round(H*1000),'[m\']')
-    tm = f.tm(Tmb,Lmb,H,Hb)
-    Vs = f.Vs(tm)
-    print('The Vs value is',round(Vs,3),'[m/s]')
-    print('The Vs value from table is',teov,'[m/s]','\n')
\ No newline at end of file
+    try:
+        print('The Z value is',value,'[m]')
+        b, Lmb, Tmb, Hb, H, Pb = f.table4(value)
+        print('The H value is',round(H*1000),'[m\']')
+        tm = f.tm(Tmb,Lmb,H,Hb)
+        Vs = f.Vs(tm)
+        print('The Vs value is',round(Vs,3),'[m/s]')
+        print('The Vs value from table is',teov,'[m/s]','\n')
+    except f.FncError as e:
+        print('The error is:',e,'\n')
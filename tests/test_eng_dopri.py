@@ -0,0 +1,85 @@
+#%% Script information
+# Name: test_eng_dopri.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the function dopri and the class Dense
+# of the engine.py file, comparing the adaptive step with the fixed one.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+import numpy as np
+import c
+import fnc as f
+import engine as e
+import dynamics as d
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+print('Test #1 - Tolerance, harmonic oscillator over 10s')
+deriv = lambda t, y: np.array([y[1], -y[0]])
+for tol in [10**-4, 10**-6, 10**-8, 10**-10]:
+    out = e.Buffer(('x', 'v'))
+    t, y, stats = e.dopri(deriv, 0, [1, 0], 10, out, tol, tol)
+    print('tol =',tol,'- error:',abs(y[0]-np.cos(10)),'- stats:',stats)
+print()
+
+print('Test #2 - Tolerance per variable, x in [km] and v in [mm/s]')
+deriv2 = lambda t, y: np.array([10**-6*y[1], -10**6*y[0]])
+out = e.Buffer(('x', 'v'))
+t, y, stats = e.dopri(deriv2, 0, [1, 0], 10, out, 0, [10**-9, 10**-3])
+print('Errors:',abs(y[0]-np.cos(10)),'[km]',abs(y[1]+10**6*np.sin(10)),'[mm/s] - stats:',stats,'\n')
+
+print('Test #3 - Dense output')
+out = e.Buffer(('x', 'v'))
+dense = e.Dense(2)
+t, y, stats = e.dopri(deriv, 0, [1, 0], 10, out, 10**-8, 10**-8, dense=dense)
+tt = np.linspace(0, 10, 10001)
+print('Steps:',len(dense),'- largest error at 10001 times:',np.abs(dense(tt)[:,0]-np.cos(tt)).max())
+print('At a single time:',dense(np.pi),'- exact:',[-1, 0],'\n')
+
+print('Test #4 - Two-stage ascent, fixed vs adaptive step')
+def ascent(**opts):
+    out = e.Buffer(d.STATE)
+    y = d.launch_state(c.M_st1_i)
+    t = 0.
+    stats = {'h': None}
+    nfev = 0
+    segments = [(d.derivative(c.m_dot_st1, c.ISP_st1_V, c.ISP_st1_SL, steer=d.vertical), c.t_kick),
+                (d.derivative(c.m_dot_st1, c.ISP_st1_V, c.ISP_st1_SL), c.bt_st1),
+                (d.derivative(c.m_dot_st2, c.ISP_st2_V), c.bt_st1 + c.bt_st2)]
+    for (k, (deriv, t_end)) in enumerate(segments):
+        if k == 2:
+            y[6] = c.M_st2_i
+        t, y, stats = e.integrate(deriv, t, y, t_end, out, h0=stats['h'], **opts)
+        nfev += stats['nfev']
+    return y, nfev
+ref, nfev = ascent(dt=1/256)
+print('Reference: RK4 with dt = 1/256s,',nfev,'evaluations')
+atol = [10**-5]*3 + [10**-7]*3 + [10**-6]
+for opts in [dict(dt=0.25), dict(dt=0.125), dict(method='dopri', rtol=0, atol=atol)]:
+    t0 = time.perf_counter()
+    y, nfev = ascent(**opts)
+    t1 = time.perf_counter()
+    print(opts)
+    print('Evaluations:',nfev,'- cost:',round(t1-t0,3),'[s] - position error:',\
+          round(np.abs(y[:3]-ref[:3]).max(),3),'[m] - velocity error:',round(np.abs(y[3:6]-ref[3:6]).max(),5),'[m/s]')
+print()
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = ['euler', 'RK45']
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The method is ',value,sep='')
+    try:
+        print('The output is',e.integrate(deriv, 0, [1, 0], 10, e.Buffer(('x', 'v')), method=value),'\n')
+    except f.FncError as err:
+        print('The error is:',err,'\n')
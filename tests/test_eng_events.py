@@ -0,0 +1,96 @@
+#%% Script information
+# Name: test_eng_events.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the events of the engine.py file and the
+# events of the flight built in dynamics.py.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+import numpy as np
+import c
+import fnc as f
+import engine as e
+import dynamics as d
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+print('Test #1 - Vertical shot, v0 = 100m/s, apogee and impact')
+g = 9.81
+deriv = lambda t, y: np.array([y[1], -g])
+events = [e.Event('apogee', lambda t, y: y[1], -1),
+          e.Event('impact', lambda t, y: y[0], -1, 'stop')]
+for opts in [dict(dt=0.3), dict(method='dopri')]:
+    out = e.Buffer(('h', 'v'))
+    t, y, stats = e.integrate(deriv, 0, [0, 100], 60, out, events=events, **opts)
+    print(opts)
+    for hit in stats['hits']:
+        print(hit.name,'at',hit.t,'[s] - state:',hit.y)
+    print('Exact times:',100/g,200/g,'- last stored time:',out.t[-1],'\n')
+
+print('Test #2 - Direction and action of the events')
+deriv = lambda t, y: np.array([y[1], -y[0]])
+for (direction, action) in [(0, 'record'), (1, 'record'), (-1, 'record'), (1, 'switch')]:
+    out = e.Buffer(('x', 'v'))
+    events = [e.Event('x = 0', lambda t, y: y[0], direction, action)]
+    t, y, stats = e.rk4(deriv, 0, [1, 0], 10, 0.1, out, events=events)
+    print('direction =',direction,'- action =',action,'- times:',[hit.t for hit in stats['hits']],\
+          '- end:',t,'- stop:',stats['stop'] is not None)
+print('Exact times:',[np.pi/2*k for k in (1, 3, 5)],'\n')
+
+print('Test #3 - Ascent driven by the events, until the apogee')
+def flight(**opts):
+    out = e.Buffer(d.STATE)
+    dense = e.Dense(len(d.STATE))
+    y = d.launch_state(c.M_st1_i)
+    deriv1 = d.derivative(c.m_dot_st1, c.ISP_st1_V, c.ISP_st1_SL)
+    deriv2 = d.derivative(c.m_dot_st2, c.ISP_st2_V)
+    phases = [(d.derivative(c.m_dot_st1, c.ISP_st1_V, c.ISP_st1_SL, steer=d.vertical),
+               [e.Event('kick', lambda t, y: t - c.t_kick, 1, 'switch')]),
+              (deriv1, [d.mach_one(), d.max_q(deriv1), d.depletion(c.M_st1_f, 'burnout #1')]),
+              (deriv2, [d.depletion(c.M_st2_f, 'burnout #2')]),
+              (d.derivative(), [d.apogee('stop'), d.altitude()])]
+    t = 0.
+    stats = {'h': None}
+    hits = []
+    for (k, (deriv, events)) in enumerate(phases):
+        if k == 2:
+            y[6] = c.M_st2_i
+        t, y, stats = e.integrate(deriv, t, y, 10000, out, h0=stats['h'], dense=dense,
+                                  events=events, **opts)
+        hits += stats['hits']
+    return hits, dense
+atol = [10**-5]*3 + [10**-7]*3 + [10**-6]
+for opts in [dict(dt=0.25), dict(method='dopri', rtol=0, atol=atol)]:
+    t0 = time.perf_counter()
+    hits, dense = flight(**opts)
+    t1 = time.perf_counter()
+    print(opts,'- cost:',round(t1-t0,3),'[s]')
+    for hit in hits:
+        print('  ',hit.name,'at',round(hit.t,6),'[s] - height:',\
+              round(np.linalg.norm(hit.y[:3])-c.R_E,1),'[m] - mass:',round(hit.y[6],3),'[kg]')
+# Maximum of q on a fine grid of the dense output, to compare
+tt = np.linspace(20, 80, 60001)
+x, y, z, vx, vy, vz, m = dense(tt).T
+air = f.atmosphere(np.sqrt(x**2 + y**2 + z**2) - c.R_E, checked=False)
+q = 0.5*air.rho*((vx + c.w_E*y)**2 + (vy - c.w_E*x)**2 + vz**2)
+print('Burnout times expected:',c.bt_st1,c.bt_st1 + c.bt_st2,'- max q on a 1ms grid at',tt[np.argmax(q)],'[s]\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = ['end', 'STOP']
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The action is ',value,sep='')
+    try:
+        print('The output is',e.Event('impact', lambda t, y: y[0], -1, value),'\n')
+    except f.FncError as err:
+        print('The error is:',err,'\n')
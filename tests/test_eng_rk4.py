@@ -0,0 +1,72 @@
+#%% Script information
+# Name: test_eng_rk4.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the function rk4 and the class Buffer
+# of the engine.py file, and the two-stage ascent built with dynamics.py.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+import numpy as np
+import c
+import engine as e
+import dynamics as d
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+print('Test #1 - Order of the method, harmonic oscillator over 10s')
+deriv = lambda t, y: np.array([y[1], -y[0]])
+for dt in [0.4, 0.2, 0.1, 0.05]:
+    out = e.Buffer(('x', 'v'))
+    t, y, stats = e.rk4(deriv, 0, [1, 0], 10, dt, out)
+    err = abs(y[0] - np.cos(10))
+    print('dt =',dt,'- steps:',len(out)-1,'- final t:',t,'- error:',err)
+print('The error must drop about 16 times when dt is halved','\n')
+
+print('Test #2 - Buffer growth')
+out = e.Buffer(('x', 'v'), chunk=100)
+t, y, stats = e.rk4(deriv, 0, [1, 0], 100, 0.01, out)
+print('Steps stored:',len(out),'- capacity:',len(out.tdata))
+print('Contiguous arrays:',out.t.flags['C_CONTIGUOUS'],out['x'].flags['C_CONTIGUOUS'])
+print('Largest error of x(t):',np.abs(out['x']-np.cos(out.t)).max(),'\n')
+
+print('Test #3 - Two-stage ascent, dt = 0.25s')
+def ascent(dt):
+    out = e.Buffer(d.STATE)
+    y_0 = d.launch_state(c.M_st1_i)
+    t, y, stats = e.rk4(d.derivative(c.m_dot_st1, c.ISP_st1_V, c.ISP_st1_SL, steer=d.vertical),
+                 0, y_0, c.t_kick, dt, out)
+    t, y, stats = e.rk4(d.derivative(c.m_dot_st1, c.ISP_st1_V, c.ISP_st1_SL), t, y, c.bt_st1, dt, out)
+    y[6] = c.M_st2_i
+    t, y, stats = e.rk4(d.derivative(c.m_dot_st2, c.ISP_st2_V), t, y, c.bt_st1 + c.bt_st2, dt, out)
+    return out
+t0 = time.perf_counter()
+out = ascent(0.25)
+t1 = time.perf_counter()
+h = np.sqrt(out['x']**2 + out['y']**2 + out['z']**2) - c.R_E
+V = np.sqrt(out['vx']**2 + out['vy']**2 + out['vz']**2)
+print('The cost of the ascent is',round(t1-t0,3),'[s] for',len(out),'steps')
+print('Final time',out.t[-1],'[s] - height',round(h[-1]/1000,2),'[km] - speed',round(V[-1],1),'[m/s]')
+print('Final mass',round(out['m'][-1],3),'[kg] - expected',c.M_st2_f,'[kg]')
+i = np.flatnonzero(out.t==c.bt_st1)
+print('Mass before and after the separation:',out['m'][i],'[kg]')
+ref = ascent(0.0625)
+for dt in [0.125, 0.0625]:
+    ref = ascent(dt)
+    print('Difference in height with dt =',dt,'s:',round(abs(h[-1]-(np.sqrt(ref['x'][-1]**2
+          + ref['y'][-1]**2 + ref['z'][-1]**2) - c.R_E)),4),'[m]')
+print()
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+# A final time before the initial one gives no steps, only the initial state
+out = e.Buffer(('x', 'v'))
+print('Test Mistake #1 - t_end < t0')
+print('The output is',e.rk4(deriv, 10, [1, 0], 0, 0.1, out),'- steps:',len(out),'\n')
@@ -0,0 +1,111 @@
+#%% Script information
+# Name: test_ens_batch.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the lock step batches of the batch.py
+# file, against the same flights run one by one with Flight (rk4).
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+import numpy as np
+import c
+import fnc as f
+import accel as a
+import aero as ae
+import dynamics as d
+import vehicle as vh
+import propulsion as pr
+import Flight as fl
+import ensemble as en
+import batch as b
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+a.warmup()
+
+print('Test #1 - 3 members that end at different times, against Flight (rk4, dt = 0.25s)')
+consts = [{}, {'ISP_st2_V': 200.}, {'M_st2_f': 1400., 'bt_st2': 60., 'pitch_st2': 2.}]
+batch = b.Batch(consts, every=40).run()
+for (i, const) in enumerate(consts):
+    ref = en.run(const, dict(method='rk4', dt=0.25))
+    print('  ',const,'- end:',round(batch.t_end[i],6),round(ref['t'],6),'[s] - final position difference:',\
+          np.abs(batch.y[i,:3] - ref['y'][:3]).max(),'[m]')
+    print('      events:',[(hit.name, round(hit.t,4)) for hit in batch.hits[i]])
+t, y = batch.trajectory()
+print('Grid stored:',t.shape,y.shape,'- steps stored with each member done:',np.isnan(y[:,:,0]).sum(axis=0))
+print('Calls of the derivative:',batch.nfev,'\n')
+
+print('Test #2 - Cost per member, up to t = 300s')
+for N in (1, 32, 256):
+    t0 = time.perf_counter()
+    b.Batch([{'ISP_st1_SL': c.ISP_st1_SL + 0.01*i} for i in range(N)], t_max=300.).run()
+    print('   Batch of',N,':',round((time.perf_counter() - t0)/N*1000,3),'[ms]')
+t0 = time.perf_counter()
+for i in range(4):
+    en.run({'ISP_st1_SL': c.ISP_st1_SL + 0.01*i}, dict(method='rk4', dt=0.25, t_max=300.))
+print('   One by one:',round((time.perf_counter() - t0)/4*1000,3),'[ms]\n')
+
+print('Test #3 - Monte Carlo as a batch, against ensemble.monte_carlo')
+dist = {'ISP_st1_SL': ('normal', c.ISP_st1_SL, 2.), 'bt_st2': ('uniform', 110., 116.),
+        'lat_0': ('normal', c.lat_0, 0.01), 'rho': ('triangular', 0.9, 1., 1.1)}
+values, batch = b.monte_carlo(16, dist, seed=3, t_max=300.)
+samples = en.monte_carlo(16, dist, seed=3, method='rk4', dt=0.25, t_max=300.)
+print('Same values drawn:',all(v == s[0] for (v, s) in zip(values, samples)))
+print('Largest difference of the final states:',max(np.abs(r['y'] - s[1]['y']).max() for (r, s) in zip(batch.summaries(), samples)))
+print('Largest difference of the burnout #2 speeds:',max(abs(r['events']['burnout #2'][2] - s[1]['events']['burnout #2'][2])
+                                                         for (r, s) in zip(batch.summaries(), samples)),'[m/s]\n')
+
+print('Test #4 - Monte Carlo with a database of aerodynamic coefficients and the density dispersed')
+mach, re, aoa = np.array([0., 0.9, 1.1, 2., 6.]), np.array([1e5, 1e7, 1e8]), np.array([0., 5., 10.])
+Cd = (0.3 + 0.2*np.exp(-((mach - 1.)/0.2)**2))[:,None,None] - 0.02*np.log10(re)[None,:,None] \
+     + 0.004*aoa[None,None,:]**2
+Cl = 0.06*aoa[None,None,:]*np.ones((len(mach), len(re), 1))
+db = ae.Aero(mach, re, aoa, Cd, Cl)
+dist = {'bt_st2': ('uniform', 110., 116.), 'rho': ('uniform', 0.7, 1.3)}
+values, batch = b.monte_carlo(8, dist, seed=5, t_max=300., aero=db)
+samples = en.monte_carlo(8, dist, seed=5, const={'aero': db}, method='rk4', dt=0.25, t_max=300.)
+print('Largest difference of the final states:',max(np.abs(r['y'] - s[1]['y']).max() for (r, s) in zip(batch.summaries(), samples)))
+print('Largest difference of the burnout #2 speeds:',max(abs(r['events']['burnout #2'][2] - s[1]['events']['burnout #2'][2])
+                                                         for (r, s) in zip(batch.summaries(), samples)),'[m/s]\n')
+
+print('Test #5 - Another vehicle (kick, azimuth, Cd, reference area and masses), against Flight (rk4)')
+v2 = vh.update(vh.VEHICLE._replace(kick=4., azimuth=60., Cd=0.4, D_ref=0.7, A_ref=np.pi*0.7**2/4), M_st1_i=6000.)
+consts = [{}, {'pitch_st2': 3.}]
+batch = b.Batch(consts, t_max=300., v=v2).run()
+for (i, const) in enumerate(consts):
+    ref = fl.Flight(fl.ascent(v2, **const), t_max=300., method='rk4', dt=0.25, dense=False).run()
+    print('  ',const,'- initial mass:',batch.trajectory()[1][0,i,6],'[kg] - final state difference:',\
+          np.abs(batch.y[i] - ref.y).max())
+print()
+
+print('Test #6 - A vehicle with throttle tables in both stages, against Flight (rk4)')
+st1, st2 = vh.VEHICLE.stages
+v3 = vh.VEHICLE._replace(stages=(st1._replace(profile=pr.profile([0., 20., 30., 50.], [1., 1., 0.7, 1.])),
+                                 st2._replace(profile=pr.profile([0., 40.], [1., 0.8]))))
+batch = b.Batch(consts, t_max=300., v=v3).run()
+for (i, const) in enumerate(consts):
+    ref = fl.Flight(fl.ascent(v3, **const), t_max=300., method='rk4', dt=0.25, dense=False).run()
+    print('  ',const,'- burnout #2:',batch.summary(i)['events']['burnout #2'][0],'[s] - final state difference:',\
+          np.abs(batch.y[i] - ref.y).max())
+print()
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+print('Test Mistake #1 - A member has the constant Isp_st2')
+try:
+    print('The output is',b.Batch([{}, {'Isp_st2': 300.}]),'\n')
+except f.FncError as err:
+    print('The error is:',err,'\n')
+
+print('Test Mistake #2 - The density is dispersed with a Gaussian')
+try:
+    print('The output is',b.monte_carlo(4, {'rho': ('gauss', 1., 0.1)}),'\n')
+except f.FncError as err:
+    print('The error is:',err,'\n')
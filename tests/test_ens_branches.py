@@ -0,0 +1,67 @@
+#%% Script information
+# Name: test_ens_branches.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the branches of the ensemble.py file,
+# run from a shared stage #1 ascent, against the same flights run from the
+# launch pad.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+import numpy as np
+import c
+import fnc as f
+import accel as a
+import ensemble as en
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+a.warmup()
+variants = [{'M_st2_i': M, 'bt_st2': bt, 'ISP_st2_V': isp, 'pitch_st2': pitch}
+            for M in (1500., 1560.) for bt in (105., 113.) for isp in (320., 328.) for pitch in (0., 2.)]
+opts = dict(t_max=300.)
+
+print('Test #1 - 16 variants of stage #2, up to t = 300s')
+t0 = time.perf_counter()
+ref = en.fresh(variants, **opts)
+t1 = time.perf_counter()
+res = en.branches(variants, **opts)
+t2 = time.perf_counter()
+print('From the launch pad:',round(t1-t0,3),'[s] - as branches:',round(t2-t1,3),'[s] - ratio:',round((t2-t1)/(t1-t0),2))
+print('Largest difference of the final states:',max(np.abs(r['y'] - b['y']).max() for (r, b) in zip(ref, res)))
+for (variant, r) in list(zip(variants, res))[::5]:
+    print('  ',variant,'- burnout #2 at',round(r['events']['burnout #2'][0],3),'[s],',\
+          round(r['events']['burnout #2'][1]/1000,3),'[km],',round(r['events']['burnout #2'][2],3),'[m/s]')
+print()
+
+print('Test #2 - Same branches over a pool of 2 processes, with the steps of each flight')
+t0 = time.perf_counter()
+res2 = en.branches(variants[:4], workers=2, full=True, **opts)
+t1 = time.perf_counter()
+print('Cost:',round(t1-t0,3),'[s] - same summaries:',all(np.array_equal(r['y'], b[0]['y']) for (r, b) in zip(res, res2)))
+print('Steps of each flight:',[b[1].shape for b in res2])
+print('Same shared part in each:',all(np.array_equal(b[1][:,:500][:,b[1][0,:500] < 106], res2[0][1][:,:500][:,res2[0][1][0,:500] < 106]) for b in res2),'\n')
+
+print('Test #3 - Branches after the rise, with a change of the stage #1 ISP in the shared part')
+res3 = en.branches([{'ISP_st2_V': 320.}, {}], until='stage 1', const={'ISP_st1_V': 290.}, **opts)
+ref3 = en.fresh([{'ISP_st2_V': 320.}, {}], const={'ISP_st1_V': 290.}, **opts)
+print('Largest difference of the final states:',max(np.abs(r['y'] - b['y']).max() for (r, b) in zip(ref3, res3)),'\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [{'bt_st1': 100.}, {'M_st1_i': 6000.}, {'Isp_st2': 300.}]
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The variant is ',value,sep='')
+    try:
+        print('The output is',en.branches([value], **opts),'\n')
+    except f.FncError as err:
+        print('The error is:',err,'\n')
@@ -0,0 +1,76 @@
+#%% Script information
+# Name: test_ens_montecarlo.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the Monte Carlo of the ensemble.py file
+# (reproducible samples, one after the other and over a pool of processes).
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+import numpy as np
+import c
+import fnc as f
+import accel as a
+import ensemble as en
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+a.warmup()
+dist = {'M_st1_i': ('normal', c.M_st1_i, 20.),
+        'ISP_st1_SL': ('normal', c.ISP_st1_SL, 2.),
+        'ISP_st1_V': ('normal', c.ISP_st1_V, 2.),
+        'bt_st1': ('uniform', c.bt_st1 - 1., c.bt_st1 + 1.),
+        'lat_0': ('normal', c.lat_0, 0.01),
+        'rho': ('triangular', 0.9, 1., 1.1)}
+opts = dict(t_max=300.)
+
+print('Test #1 - 24 samples, one after the other')
+t0 = time.perf_counter()
+samples = en.monte_carlo(24, dist, seed=2024, **opts)
+t1 = time.perf_counter()
+print('Cost:',round(t1-t0,3),'[s]')
+v = np.array([s[1]['events']['burnout #1'][2] for s in samples])
+Z = np.array([s[1]['events']['burnout #1'][1] for s in samples])
+print('Stage #1 burnout speed: mean',round(v.mean(),2),'- std',round(v.std(),2),'[m/s]')
+print('Stage #1 burnout height: mean',round(Z.mean()/1000,3),'- std',round(Z.std()/1000,3),'[km]')
+for (values, r) in samples[:3]:
+    print('  ',{name: round(x,4) for (name, x) in values.items()})
+print()
+
+print('Test #2 - Same seed over a pool of 2 processes')
+samples2 = en.monte_carlo(24, dist, seed=2024, workers=2, **opts)
+print('Same values drawn:',all(s[0] == p[0] for (s, p) in zip(samples, samples2)))
+print('Same flights:',all(np.array_equal(s[1]['y'], p[1]['y']) for (s, p) in zip(samples, samples2)),'\n')
+
+print('Test #3 - The first samples do not depend on the number of samples, another seed does')
+samples3 = en.monte_carlo(5, dist, seed=2024, full=True, **opts)
+print('Same first 5 samples:',all(np.array_equal(s[1]['y'], p[1][0]['y']) for (s, p) in zip(samples, samples3)))
+print('Steps of each flight:',[p[1][1].shape for p in samples3])
+samples4 = en.monte_carlo(5, dist, seed=2025, **opts)
+print('Same first 5 samples with another seed:',any(s[0] == p[0] for (s, p) in zip(samples, samples4)),'\n')
+
+print('Test #4 - Only the density of the air is dispersed')
+samples5 = en.monte_carlo(6, {'rho': ('uniform', 0.8, 1.2)}, seed=7, **opts)
+for (values, r) in samples5:
+    print('   rho x',round(values['rho'],3),'- max q at',round(r['events']['max q'][0],3),'[s] - burnout #1 speed',\
+          round(r['events']['burnout #1'][2],3),'[m/s]')
+print()
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [{'Isp_st1': ('normal', 270., 2.)}, {'bt_st1': ('gauss', 106., 1.)}, {'bt_st1': 106.}]
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The distributions are ',value,sep='')
+    try:
+        print('The output is',en.monte_carlo(2, value, **opts),'\n')
+    except f.FncError as err:
+        print('The error is:',err,'\n')
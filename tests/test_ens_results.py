@@ -0,0 +1,71 @@
+#%% Script information
+# Name: test_ens_results.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the class Results of the ensemble.py
+# file (steps of the flights of a pool written into shared memory or into a
+# file mapped in memory) against the steps sent back by pickling them.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import os
+import time
+import pickle
+import tempfile
+import numpy as np
+import c
+import fnc as f
+import accel as a
+import ensemble as en
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+a.warmup()
+dist = {'ISP_st1_SL': ('normal', c.ISP_st1_SL, 2.), 'bt_st2': ('uniform', 110., 116.)}
+opts = dict(method='rk4', dt=0.02, t_max=400., dense=False)
+n = 8
+
+print('Test #1 - Monte Carlo of',n,'samples over 2 processes, rk4 with dt = 0.02s')
+t0 = time.perf_counter()
+pickled = en.monte_carlo(n, dist, seed=1, workers=2, full=True, **opts)
+t1 = time.perf_counter()
+block = en.Results(n, 20010)
+shared = en.monte_carlo(n, dist, seed=1, workers=2, full=block, **opts)
+t2 = time.perf_counter()
+print('Steps of each sample:',block.steps,'- block:',block.data.nbytes/2**20,'[MB]')
+print('Pickled:',round(t1-t0,3),'[s] - shared memory:',round(t2-t1,3),'[s]')
+print('Bytes sent back by each sample - pickled:',len(pickle.dumps(pickled[0])),'- shared memory:',len(pickle.dumps(shared[0])))
+print('Same steps:',all(np.array_equal(p[1][1], block[i]) for (i, p) in enumerate(pickled)))
+print('Same summaries:',all(np.array_equal(p[1][0]['y'], s[1]['y']) for (p, s) in zip(pickled, shared)))
+print('Views, not copies:',np.shares_memory(block[0], block.data),np.shares_memory(block.channel(3, 'q'), block.data))
+print('Max q of each sample:',np.round([block.channel(i, 'q').max() for i in range(n)],1),'[N/m^2]')
+block.close()
+print()
+
+print('Test #2 - Branches written into a file mapped in memory, one after the other')
+path = os.path.join(tempfile.mkdtemp(), 'branches.f8')
+variants = [{'M_st2_i': M} for M in (1500., 1530., 1560.)]
+block = en.Results(len(variants), 4096, path)
+res = en.branches(variants, full=block, t_max=300.)
+ref = en.branches(variants, full=True, t_max=300.)
+print('Steps of each branch:',block.steps,'- file size:',os.path.getsize(path),'[bytes]')
+print('Same steps:',all(np.array_equal(r[1], block[i]) for (i, r) in enumerate(ref)))
+block.close()
+data = np.memmap(path, dtype=float, mode='r', shape=(3, 14, 4096))
+print('Read back from the file:',all(np.array_equal(r[1], data[i,:,:len(r[1][0])]) for (i, r) in enumerate(ref)),'\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+print('Test Mistake #1 - The block has room for 100 steps of each flight')
+block = en.Results(2, 100)
+try:
+    print('The output is',en.fresh([{}, {'bt_st2': 110.}], workers=2, full=block, t_max=300.),'\n')
+except f.FncError as err:
+    print('The error is:',err,'\n')
+block.close()
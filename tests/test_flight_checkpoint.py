@@ -0,0 +1,76 @@
+#%% Script information
+# Name: test_flight_checkpoint.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the checkpoints of the class Flight of
+# the Flight.py file (snapshot, restore, save, load and checkpoints).
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import os
+import tempfile
+import numpy as np
+import fnc as f
+import accel as a
+import Flight as fl
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+a.warmup()
+
+def same(f1, f2):
+    # True if both flights are bit for bit the same
+    n = len(f1.out)
+    return (f1.t == f2.t and np.array_equal(f1.y, f2.y) and n == len(f2.out)
+            and np.array_equal(f1.out.data[:,:n], f2.out.data[:,:n])
+            and [(h.name, h.t) for h in f1.hits] == [(h.name, h.t) for h in f2.hits]
+            and f1.rng.bit_generator.state == f2.rng.bit_generator.state
+            and (f1.dense is None or np.array_equal(f1.dense.rdata[:f1.dense.n], f2.dense.rdata[:f2.dense.n])))
+
+for (index, opts) in enumerate([dict(), dict(method='rk4', dt=0.25, policy='nth', every=7)]):
+    print('Test #%d - Checkpoints every 500s and at the end of each phase,' % (index+1), opts)
+    folder = tempfile.mkdtemp()
+    ref = fl.Flight(checkpoint=folder, interval=500., seed=1, **opts).run()
+    files = fl.checkpoints(folder)
+    print('Checkpoints:',len(files),'- at',[round(fl.load(file)['t'],3) for file in files])
+    results = []
+    for file in files:
+        snap = fl.load(file)
+        flight = fl.Flight(checkpoint=tempfile.mkdtemp(), interval=500., seed=99, **opts).restore(snap)
+        flight.run()
+        results.append(same(ref, flight))
+    print('Resumed from each checkpoint, bit for bit the same:',results)
+    free = fl.Flight(seed=1, **opts).run()
+    print('Without checkpoints (not split at 500s) - impact time difference:',\
+          abs(free.hit('impact').t - ref.hit('impact').t),'[s]')
+    print()
+
+print('Test #3 - Content of a snapshot')
+flight = fl.Flight(seed=5, epoch=f.JD(2024, 3, 1, 12, 0, 0))
+flight.advance(150.)
+flight.rng.normal(size=3)
+snap = flight.snapshot()
+print('Keys:',sorted(snap))
+print('Time:',snap['t'],'- phase:',flight.phases[snap['k']].name,'- TJD:',snap['tjd'],\
+      '- GMST:',f.tjd2gmst(snap['tjd']))
+resumed = fl.Flight(seed=0).restore(snap)
+print('Random numbers after the snapshot:',flight.rng.normal(size=2),resumed.rng.normal(size=2))
+print('Steps buffered:',snap['out']['data'].shape[1],'- interpolants:',len(snap['dense'][0]),'\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [os.path.join(folder, 'flight_99999.ckpt'), folder]
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The checkpoint is ',value,sep='')
+    try:
+        print('The output is',fl.load(value),'\n')
+    except f.FncError as err:
+        print('The error is:',err,'\n')
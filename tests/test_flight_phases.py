@@ -0,0 +1,80 @@
+#%% Script information
+# Name: test_flight_phases.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the classes Phase and Flight of the
+# Flight.py file.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+from functools import partial
+import numpy as np
+import c
+import fnc as f
+import accel as a
+import dynamics as d
+import Flight as fl
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+a.warmup()
+
+print('Test #1 - Default flight (adaptive step), phase by phase')
+flight = fl.Flight()
+data = flight.out.data
+t0 = time.perf_counter()
+flight.run()
+t1 = time.perf_counter()
+print('Cost:',round(t1-t0,3),'[s] - steps:',len(flight.out),'- end:',flight.t,'[s]')
+for (name, start, end, stats) in flight.log:
+    print('  ',name,'from',round(start,3),'to',round(end,3),'[s] -',\
+          'no integration' if stats is None else str(stats['nfev'])+' evaluations')
+for hit in flight.hits:
+    print('  ',hit.name,'at',round(hit.t,3),'[s] - height:',\
+          round(np.linalg.norm(hit.y[:3])-c.R_E,1),'[m] - mass:',round(hit.y[6],3),'[kg]')
+print('Same buffer as allocated:',flight.out.data is data,'\n')
+
+print('Test #2 - Same flight with a fixed step, up to t = 300s')
+flight2 = fl.Flight(method='rk4', dt=0.25, t_max=300.).run()
+print('Phases run:',[name for (name, start, end, stats) in flight2.log],'- end:',flight2.t,'[s]')
+y_ref = flight.dense(300.)
+print('Position difference at 300s:',round(np.abs(flight2.y[:3]-y_ref[:3]).max(),3),'[m]\n')
+
+print('Test #3 - Atmosphere of fnc.py instead of the compiled one')
+flight3 = fl.Flight(t_max=300., atm=partial(f.atmosphere, checked=False)).run()
+print('Position difference at 300s:',round(np.abs(flight3.y[:3]-y_ref[:3]).max(),6),'[m]\n')
+
+print('Test #4 - Flight run up to given times')
+flight4 = fl.Flight(t_max=300.)
+for t_stop in [5., 106., 150., 300.]:
+    flight4.advance(t_stop)
+    print('   up to',t_stop,'[s] - time:',round(flight4.t,3),'[s] - phase:',flight4.phases[min(flight4.k, 4)].name,\
+          '- phases done:',len(flight4.log),'- flight over:',flight4.done)
+print('Difference with Test #3:',np.abs(flight4.y-flight3.y).max(),'\n')
+
+print('Test #5 - Ballistic flight, a single coast until the impact')
+y0 = d.launch_state(100.)
+y0[3:6] += 500*y0[:3]/np.linalg.norm(y0[:3])
+flight5 = fl.Flight([fl.Phase('coast', events=[d.apogee(), d.altitude()])], y0=y0).run()
+for hit in flight5.hits:
+    print('  ',hit.name,'at',round(hit.t,3),'[s] - height:',round(np.linalg.norm(hit.y[:3])-c.R_E,3),'[m]')
+print()
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = ['euler', 'RK45']
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The method is ',value,sep='')
+    try:
+        print('The output is',fl.Flight(method=value).run(),'\n')
+    except f.FncError as err:
+        print('The error is:',err,'\n')
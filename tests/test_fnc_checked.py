@@ -0,0 +1,122 @@
+#%% Script information
+# Name: test_fnc_checked.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the checked and unchecked modes of the
+# functions in the fnc.py file, comparing their results and measuring the
+# cost of the input control of each function.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import fnc as f
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+# Calls made by one step of a simulation, as (name, function, arguments)
+b, Lmb, Tmb, Hb, H, Pb = f.table4(5000.)
+date = datetime(2023,3,15,12,30,45)
+calls = [
+    ('layer', f.layer, (5000.,)),
+    ('table4', f.table4, (5000.,)),
+    ('tm', f.tm, (Tmb,Lmb,H,Hb)),
+    ('p', f.p, (Tmb,Lmb,H,Hb,Pb)),
+    ('rho', f.rho, (54048.3,255.676)),
+    ('Vs', f.Vs, (255.676,)),
+    ('visc', f.visc, (255.676,0.73643)),
+    ('g', f.g, (5000.,)),
+    ('upper', f.upper, (150000.,)),
+    ('atmosphere', f.atmosphere, (5000.,)),
+    ('AtmCursor', f.AtmCursor(), (5000.,)),
+    ('mach', f.mach, (300.,320.545)),
+    ('re', f.re, (300.,1.5e-5,1.2)),
+    ('Tge', f.Tge, (0.5,-0.6)),
+    ('Tei', f.Tei, (0.3,)),
+    ('Tmv', f.Tmv, (0.2,)),
+    ('Tvg', f.Tvg, (0.1,0.4)),
+    ('date_parts', f.date_parts, (date,)),
+    ('JD', f.JD, (2023,3,15,12,30,45)),
+    ('jd2tjd', f.jd2tjd, (2460019.021,)),
+    ('tjd2gmst', f.tjd2gmst, (0.2320,)),
+    ('add_timestep', f.add_timestep, (date,timedelta(seconds=0.1))),
+    ]
+
+n = 20000
+print('Test #1 - Same results in both modes, cost of a call for',n,'calls')
+print('Function       checked [us]   unchecked [us]   saved [%]   same')
+total = [0, 0]
+for (name, fn, args) in calls:
+    cost = []
+    for checked in (True, False):
+        t0 = time.perf_counter()
+        for k in range(n):
+            out = fn(*args, checked=checked)
+        cost.append((time.perf_counter()-t0)/n*10**6)
+    one, two = fn(*args, checked=True), fn(*args, checked=False)
+    if name in ('date_parts', 'add_timestep'):
+        same = one == two
+    else:
+        same = np.allclose(np.hstack([np.ravel(v) for v in np.atleast_1d(one)]),
+                           np.hstack([np.ravel(v) for v in np.atleast_1d(two)]), rtol=1e-15)
+    total[0] += cost[0]
+    total[1] += cost[1]
+    print(name.ljust(14), str(round(cost[0],3)).ljust(14), str(round(cost[1],3)).ljust(16),
+          str(round(100*(1-cost[1]/cost[0]),1)).ljust(11), same)
+print('All the functions'.ljust(14), str(round(total[0],3)).ljust(14), str(round(total[1],3)).ljust(16),
+      round(100*(1-total[1]/total[0]),1),'\n')
+
+print('Test #2 - Mode of the whole module')
+old = f.set_checked(False)
+t0 = time.perf_counter()
+for k in range(n):
+    out = f.atmosphere(5000.)
+t1 = time.perf_counter()
+f.set_checked(old)
+print('The cost of atmosphere() with set_checked(False) is',round((t1-t0)/n*10**6,3),'[us]')
+print('The module is back in checked mode:',f.CHECKED,'\n')
+
+print('Test #3 - Array inputs in both modes')
+Z = np.linspace(0,80000,10**5)
+for checked in (True, False):
+    t0 = time.perf_counter()
+    air = f.atmosphere(Z, checked=checked)
+    t1 = time.perf_counter()
+    print('checked =',checked,'- the cost of 1e5 heights is',round((t1-t0)*10**3,3),'[ms]')
+print()
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [('layer', f.layer, (-15,)),
+           ('table4', f.table4, ('string',)),
+           ('tm', f.tm, ('string',0,1,0)),
+           ('rho', f.rho, (-5,200)),
+           ('Vs', f.Vs, (-200,)),
+           ('g', f.g, (-50,)),
+           ('upper', f.upper, (50000,)),
+           ('atmosphere', f.atmosphere, (1200000,)),
+           ('atmosphere', f.atmosphere, (np.array([-15, 5000]),)),
+           ('mach', f.mach, (300,0)),
+           ('re', f.re, ('string',1.5e-5,1.2)),
+           ('thrust', f.thrust, (-10,2000,5e4,1e5,0.05)),
+           ('Tge', f.Tge, ('string',0.1)),
+           ('date_parts', f.date_parts, ('2023-03-15',)),
+           ('JD', f.JD, (2023,13,15,12,30,45)),
+           ('tjd2gmst', f.tjd2gmst, ('string',)),
+           ('add_timestep', f.add_timestep, (date,0.1)),
+           ]
+aux = np.arange(1,len(testval)+1)
+
+for (index,(name, fn, args)) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The inputs of ',name,' are ',args,sep='')
+    try:
+        print('The output is',fn(*args),'\n')
+    except f.FncError as e:
+        print('The error is:',type(e).__name__,'-',e,'\n')
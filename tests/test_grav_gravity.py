@@ -0,0 +1,81 @@
+#%% Script information
+# Name: test_grav_gravity.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the function gravity of the gravity.py
+# file, comparing it with the gradient of the potential and with fnc.g.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+import numpy as np
+import c
+import fnc as f
+import gravity as gr
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+print('Test #1 - Equator and pole at sea level')
+for (name, r) in [('Equator', [c.R_E, 0, 0]), ('Pole', [0, 0, 6356752.3])]:
+    a = gr.gravity(r)
+    print(name,'- the acceleration is',a,'[m/s^2]')
+    print(name,'- the magnitude is',round(np.linalg.norm(a),5),'[m/s^2]')
+print('The J2 term makes gravity stronger at the poles (about 9.83 vs 9.81 m/s^2)','\n')
+
+print('Test #2 - Gradient of the potential, 1000 random positions from 0km to 2000km')
+rng = np.random.default_rng(0)
+r = rng.normal(size=(1000,3))
+r = r/np.linalg.norm(r,axis=1)[:,None]*rng.uniform(c.R_E,c.R_E+2*10**6,(1000,1))
+h = 1.
+for degree in (0, 2, 3, 4):
+    a = gr.gravity(r, degree)
+    grad = np.stack([(gr.potential(r+h*e,degree)-gr.potential(r-h*e,degree))/(2*h)
+                     for e in np.eye(3)],1)
+    print('Degree',degree,'- the largest difference is',np.abs(a-grad).max(),'[m/s^2]')
+print()
+
+print('Test #3 - Single positions and N x 3 stacks give the same results')
+single = np.array([gr.gravity(x) for x in r])
+print('The largest difference is',np.abs(single-gr.gravity(r)).max(),'\n')
+
+print('Test #4 - Point mass vs fnc.g (radius ro of the Standard)')
+ro = 6356766
+for Z in [0, 10**5, 10**6]:
+    a = gr.gravity([0, ro+Z, 0], 0)
+    print('Z =',Z,'[m] - the magnitude is',round(np.linalg.norm(a),4),\
+          '- fnc.g is',round(f.g(Z),4),'[m/s^2]')
+print('The small difference is due to mu_E/ro^2 =',round(c.mu_E/ro**2,4),'vs go = 9.80665','\n')
+
+print('Test #5 - Cost of an evaluation')
+n = 10000
+for checked in (True, False):
+    t0 = time.perf_counter()
+    for k in range(n):
+        a = gr.gravity(r[0], checked=checked)
+    t1 = time.perf_counter()
+    print('checked =',checked,'- single position:',round((t1-t0)/n*10**6,3),'[us]')
+r = np.tile(r,(10,1))
+t0 = time.perf_counter()
+for k in range(100):
+    a = gr.gravity(r, checked=False)
+t1 = time.perf_counter()
+print('Stack of',len(r),'positions:',round((t1-t0)/100*10**3,3),'[ms] -',\
+      round((t1-t0)/100/len(r)*10**9,1),'[ns] per position','\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [[0, 0, 0], [c.R_E, 0], 'string', np.ones((2,2,3))]
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The input position is ',value,sep='')
+    try:
+        print('The output is',gr.gravity(value),'\n')
+    except f.FncError as e:
+        print('The error is:',e,'\n')
@@ -0,0 +1,110 @@
+#%% Script information
+# Name: test_prop_engine.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the engines of the propulsion.py file
+# (throttle tables, thrust with the ambient pressure, engines of many
+# members and their use in a flight).
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import time
+import numpy as np
+import c
+import fnc as f
+import accel as a
+import dynamics as d
+import vehicle as vh
+import propulsion as pr
+import Flight as fl
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+a.warmup()
+st1, st2 = vh.VEHICLE.stages
+
+print('Test #1 - Stage #1 with no profile')
+eng = pr.engine(st1)
+print('Thrust at SL and in vacuum:',round(eng.thrust(0., d.P_SL),1),round(eng.thrust(50., 0.),1),\
+      '[N] - F_SL, F_V:',round(st1.F_SL,1),round(st1.F_V,1),'[N]')
+Z = np.array([-10., 0., 10000., 40000., 2e6])
+print('Thrust at Z =',Z,'[m]:',np.round(eng.ambient(10., Z),1),'[N]')
+print('Same one by one:',np.allclose([eng.ambient(10., float(z)) for z in Z], eng.ambient(10., Z)))
+print('Burnout:',round(eng.time(st1.M_prop),6),'[s] - bt:',st1.bt,'[s]\n')
+
+print('Test #2 - Throttle table')
+prof = pr.profile([0., 20., 30., 50., 60.], [1., 1., 0.7, 0.7, 1.])
+v = vh.VEHICLE._replace(stages=(vh.stage(st1.M_i, st1.M_f, st1.bt, st1.ISP_V, st1.ISP_SL, st1.Pe, profile=prof), st2))
+eng = pr.engine(v.stages[0])
+t = np.array([-1., 0., 10., 25., 40., 55., 60., 200.])
+print('t =',t,'[s]')
+print('Throttle:',eng.throttle(t))
+print('Mass flow:',np.round(eng.flow(t),4),'[kg/s]')
+print('Same one by one:',np.allclose([eng.throttle(float(s)) for s in t], eng.throttle(t)))
+s = np.linspace(0., 200., 200001)
+k = eng.throttle(s)
+print('Burned at 200 s:',round(eng.burned(200.),4),'[kg] - trapezoids:',\
+      round(st1.m_dot*np.sum(0.5*(k[1:] + k[:-1])*np.diff(s)),4),'[kg]')
+tb = eng.time(st1.M_prop)
+print('Burnout:',round(tb,6),'[s] - burned then:',round(eng.burned(tb),6),'[kg]')
+print('From a thrust table:',pr.thrust_profile(st1, [0., 30.], [st1.F_V, 0.8*st1.F_V]),'\n')
+
+print('Test #3 - Engine of many members')
+n = 10000
+rng = np.random.default_rng(0)
+stages = [vh.update(vh.VEHICLE, bt_st1=bt).stages[0] for bt in rng.normal(st1.bt, 2., n)]
+eng = pr.engine(stages)
+Z = rng.uniform(0., 80000., n)
+t = rng.uniform(0., 100., n)
+F = eng.ambient(t, Z)
+print('Same as one member at a time:',np.allclose(F[:50], [pr.engine(st).ambient(float(ti), float(zi))
+                                                        for (st, ti, zi) in zip(stages[:50], t[:50], Z[:50])]))
+P = f.atmosphere(Z, checked=False).P
+tic = time.perf_counter()
+for i in range(1000):
+    eng.thrust(t, P)
+print('Thrust of',n,'members:',round((time.perf_counter() - tic)*1e3,3),'[us] per call')
+eng1 = pr.engine(v.stages[0])
+tic = time.perf_counter()
+for i in range(100000):
+    eng1.throttle(37.5)
+print('Throttle of one member:',round((time.perf_counter() - tic)*10,3),'[us] per call\n')
+
+print('Test #4 - Flight with a throttle table')
+ref = fl.Flight(t_max=400.).run()
+flat = vh.update(vh.VEHICLE)._replace(stages=tuple(st._replace(profile=((0.,), (1.,))) for st in vh.VEHICLE.stages))
+same = fl.Flight(fl.ascent(flat), t_max=400.).run()
+print('A throttle of 1 flies the same:',np.array_equal(ref.y, same.y))
+flight = fl.Flight(fl.ascent(v), t_max=400., y0=d.launch_state(v.stages[0].M_i)).run()
+for name in ('burnout #1', 'burnout #2'):
+    print(name,'- throttled at',round(flight.hit(name).t,3),'[s] - nominal at',round(ref.hit(name).t,3),'[s]')
+out = flight.out
+i = np.searchsorted(out['t'], 40.)
+print('Thrust at t =',round(out['t'][i],3),'[s]:',round(out['thrust'][i],1),'[N] - engine:',\
+      round(eng1.ambient(out['t'][i], np.linalg.norm([out['x'][i], out['y'][i], out['z'][i]]) - c.R_E,
+                         atm=a.atmosphere),1),'[N]\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [('profile', pr.profile, ([1., 2.], [1., 1.])),
+           ('profile', pr.profile, ([0., 20., 10.], [1., 1., 1.])),
+           ('profile', pr.profile, ([0., 10.], [1., -0.5])),
+           ('profile', pr.profile, ([0., 10.], [1.])),
+           ('profile', pr.profile, (['a'], [1.])),
+           ('stage', vh.stage, (1000., 100., 50., 300., None, 0., None, None, ([0., 5.], [1., 1., 1.]))),
+           ('engine', pr.engine, ([st1, v.stages[0]],)),
+           ('engine', pr.engine, ([],))]
+aux = np.arange(1,len(testval)+1)
+
+for (index,(name, fn, args)) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The inputs of ',name,' are ',args,sep='')
+    try:
+        print('The output is',fn(*args),'\n')
+    except f.FncError as err:
+        print('The error is:',err,'\n')
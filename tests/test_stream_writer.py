@@ -0,0 +1,72 @@
+#%% Script information
+# Name: test_stream_writer.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the method stream of the class Flight
+# and the subscribers of the stream.py file.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import os
+import tempfile
+import numpy as np
+import c
+import fnc as f
+import accel as a
+import stream as st
+import Flight as fl
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+a.warmup()
+path = os.path.join(tempfile.mkdtemp(), 'run')
+
+print('Test #1 - Default flight as a stream, to disk and to the subscribers')
+flight = fl.Flight(dense=False, capacity=256)
+blocks = []
+def count(block):
+    blocks.append(block.shape[1])
+count.close = lambda: len(blocks)
+below = lambda block: np.sqrt(block[1]**2 + block[2]**2 + block[3]**2) < c.R_E - 1
+results = st.publish(flight.stream(500.), st.Writer(path), st.Stats(), st.Sample(10),
+                     st.Check('below ground', below), count)
+written, stats, sample, check, n = results
+print('Blocks:',n,'- steps per block:',blocks)
+print('Largest buffer held:',flight.out.data.shape[1],'steps - steps written:',sum(blocks))
+print('Largest q:',round(stats['q'][1],1),'[N/m^2] - mean mass:',round(stats['m'][2],3),'[kg]')
+print('Sample:',sample.shape,'- check:',check)
+print('Impact:',flight.hit('impact').t,'[s]\n')
+
+print('Test #2 - Stream vs a single run')
+ref = fl.Flight().run()
+print('Adaptive step - steps:',len(ref.out),'vs',sum(blocks),'- impact time difference:',\
+      abs(ref.hit('impact').t - flight.hit('impact').t),'[s]')
+ref = fl.Flight(method='rk4', t_max=1000.).run()
+out = np.concatenate(list(fl.Flight(method='rk4', t_max=1000.).stream(50.)), axis=1)
+print('Fixed step - steps:',len(ref.out),'vs',out.shape[1],'- largest difference:',\
+      np.abs(out - ref.out.data[:,:len(ref.out)]).max(),'\n')
+
+print('Test #3 - Channels read back from disk')
+data = st.read(written)
+print('Channels:',len(data),'- type:',type(data['t']).__name__,'- steps:',len(data['t']))
+window = (data['t'] >= 100) & (data['t'] <= 110)
+print('Mass between 100s and 110s:',np.round(data['m'][window], 3))
+print('Same as the sample:',np.array_equal(data['q'][::10], sample[13]),'\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [os.path.dirname(path), os.path.join(path, 'missing')]
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The directory is ',value,sep='')
+    try:
+        print('The output is',st.read(value),'\n')
+    except f.FncError as err:
+        print('The error is:',err,'\n')
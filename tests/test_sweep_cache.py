@@ -0,0 +1,79 @@
+#%% Script information
+# Name: test_sweep_cache.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the sweeps of the sweep.py file and
+# their cache of results on disk (keys, hits, LRU eviction and stats).
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import os
+import time
+import tempfile
+import numpy as np
+import c
+import fnc as f
+import accel as a
+import sweep as sw
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+a.warmup()
+cache = sw.Cache(tempfile.mkdtemp())
+configs = sw.grid(bt_st2=[110., 116.], ISP_st2_V=[320., 326.], t_max=[300.])
+
+print('Test #1 - Grid of 4 configurations, run twice')
+t0 = time.perf_counter()
+first = sw.sweep(configs, cache, workers=2)
+t1 = time.perf_counter()
+second = sw.sweep(configs, cache, workers=2)
+t2 = time.perf_counter()
+print('First:',round(t1-t0,3),'[s] - second:',round(t2-t1,3),'[s]')
+print('Same results:',all(np.array_equal(r['y'], s['y']) for (r, s) in zip(first, second)))
+print(cache.report(),'\n')
+
+print('Test #2 - Overlapping sweep, with the values of c.py given and a repeated configuration')
+configs2 = sw.grid(bt_st2=[110., 113., 116.], ISP_st2_V=[320.], t_max=[300.]) + [{'t_max': 300.},
+           {'t_max': 300., 'M_st2_i': c.M_st2_i, 'method': 'dopri'}, {'t_max': 300., 'bt_st2': 113.}]
+res = sw.sweep(configs2, cache)
+print('Same as the first sweep:',np.array_equal(res[0]['y'], first[0]['y']),np.array_equal(res[2]['y'], first[2]['y']))
+print('Defaults given or not, same result:',np.array_equal(res[3]['y'], res[4]['y']))
+print('Burnout #2 speeds:',[round(r['events']['burnout #2'][2],3) for r in res],'[m/s]')
+print(cache.report(),'\n')
+
+print('Test #3 - Same configuration with other code, or with the steps of the flight')
+r = sw.resolve({'bt_st2': 113.})
+print('Keys:',sw.key(r, sw.version())[:16],sw.key(r, 'other version')[:16],sw.key(sw.resolve({'bt_st2': 113.}, True), sw.version())[:16])
+full = sw.sweep([{'bt_st2': 113., 't_max': 300.}], cache, full=True)[0]
+print('Steps of the flight:',full[1].shape,'- same summary:',np.array_equal(full[0]['y'], res[5]['y']),'\n')
+
+print('Test #4 - Cache with room for 3 results, the first one used again before each new one')
+small = sw.Cache(tempfile.mkdtemp())
+sw.sweep([{'t_max': 50.}], small)
+small.size = 3.5*small.stats()['bytes']
+for t_max in (60., 70., 80., 90.):
+    time.sleep(0.01)
+    sw.sweep([{'t_max': 50.}], small)
+    time.sleep(0.01)
+    sw.sweep([{'t_max': t_max}], small)
+there = lambda t_max: os.path.exists(small.file(sw.key(sw.resolve({'t_max': t_max}), sw.version())))
+print('Results left:',small.stats()['entries'],'- still there:',{t_max: there(t_max) for t_max in (50., 60., 70., 80., 90.)})
+print(small.report(),'\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [{'Isp_st2': 300.}, {'atm': None}, {'dt': print}]
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The configuration is ',value,sep='')
+    try:
+        print('The output is',sw.sweep([value], cache),'\n')
+    except f.FncError as err:
+        print('The error is:',err,'\n')
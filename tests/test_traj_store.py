@@ -0,0 +1,72 @@
+#%% Script information
+# Name: test_traj_store.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the class Trajectory of the
+# trajectory.py file and its recording policies.
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import sys
+import numpy as np
+import fnc as f
+import accel as a
+import trajectory as tr
+import Flight as fl
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+a.warmup()
+
+print('Test #1 - Every step of the default flight')
+flight = fl.Flight(method='rk4', dt=0.25).run()
+out = flight.out
+lists = [list(out[name]) for name in tr.CHANNELS]
+size = sum(sys.getsizeof(l) + sum(sys.getsizeof(v) for v in l) for l in lists)
+print('Steps:',len(out),'- channels:',len(tr.CHANNELS),'- memory:',out.data[:,:len(out)].nbytes,\
+      '[bytes] - as lists of floats:',size,'[bytes]')
+k = np.argmax(out['q'][out.t < 219])
+print('Largest q of the ascent stored:',round(out['q'][k],1),'[N/m^2] at',out.t[k],'[s] - max q event at',\
+      round(flight.hit('max q').t,3),'[s]')
+k = np.argmin(np.abs(out['mach'] - 1))
+print('Mach closest to 1:',round(out['mach'][k],4),'at',out.t[k],'[s] - mach 1 event at',\
+      round(flight.hit('mach 1').t,3),'[s]')
+print('Thrust at the start and at the end of stage #1:',out['thrust'][0],out['thrust'][out.t <= 106][-1],'[N]')
+print('Position and velocity views:',out.position.shape,out.velocity.shape,'\n')
+
+print('Test #2 - Policies')
+for opts in [dict(policy='nth', every=10), dict(policy='events'),
+             dict(policy='threshold', threshold={'q': 1000, 'm': 50, 'x': 10000})]:
+    f2 = fl.Flight(method='rk4', dt=0.25, **opts).run()
+    print(opts,'- steps:',len(f2.out),'- last time:',f2.out.t[-1],'[s] - same last state:',\
+          np.array_equal(f2.out.y[:,-1], out.y[:,-1]))
+print()
+
+print('Test #3 - Chunked growth')
+traj = tr.Trajectory(chunk=16)
+caps = set()
+for k in range(1000):
+    traj.append(float(k), np.full(7, float(k)))
+    caps.add(traj.data.shape[1])
+print('Steps:',len(traj),'- capacities used:',sorted(caps),'- outputs without bind:',traj['q'][:3])
+traj.compact()
+print('After compact:',traj.data.shape,'- last:',traj.last(),'\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+testval = [dict(policy='all'), dict(policy='nth', every=0), dict(policy='nth', every=2.5),
+           dict(policy='threshold'), dict(policy='threshold', threshold={'speed': 1})]
+aux = np.arange(1,len(testval)+1)
+
+for (index,value) in zip(aux,testval):
+    print('Test Mistake #',index,' - ','The inputs are ',value,sep='')
+    try:
+        print('The output is',tr.Trajectory(**value),'\n')
+    except f.FncError as err:
+        print('The error is:',err,'\n')
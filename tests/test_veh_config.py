@@ -0,0 +1,93 @@
+#%% Script information
+# Name: test_veh_config.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this script is to test the configurations of the vehicle.py
+# file (stages and vehicles, their files and their use in Flight.ascent).
+#%% Clear Console
+cls = lambda: print("\033[2J\033[;H", end='')
+cls()
+
+import os
+import json
+import tempfile
+import numpy as np
+import c
+import fnc as f
+import accel as a
+import dynamics as d
+import vehicle as vh
+import Flight as fl
+
+#%% Tests that are meant to work
+print('====== Tests that should work ======','\n')
+
+a.warmup()
+folder = tempfile.mkdtemp()
+
+print('Test #1 - Vehicle of c.py')
+for (k, st) in enumerate(vh.VEHICLE.stages):
+    print('Stage #',k+1,': M_prop =',st.M_prop,'[kg] - m_dot =',round(st.m_dot,4),'[kg/s] - F_SL =',round(st.F_SL,1),\
+          '[N] - F_V =',round(st.F_V,1),'[N] - Ae =',round(st.Ae,5),'[m^2] - Ve =',round(st.Ve,2),'[m/s]',sep='')
+    print('   Thrust at SL, 50000 N/m^2 and in vacuum:',np.round(vh.thrust(st, np.array([d.P_SL, 5e4, 0.])),1),'[N]')
+print('A_ref =',round(vh.VEHICLE.A_ref,5),'[m^2] - same as c.py:',vh.VEHICLE.A_ref == c.A_ref,'\n')
+
+print('Test #2 - Vehicles are values')
+v2 = vh.update(vh.VEHICLE, bt_st2=120., ISP_st2_V=320.)
+print('Hashable:',len({vh.VEHICLE: 'c.py', v2: 'variant', vh.update(vh.VEHICLE): 'c.py again'}),'vehicles as keys')
+print('Equal when built again:',vh.update(v2, bt_st2=113., ISP_st2_V=328.) == vh.VEHICLE)
+print('Stage #2 of the variant: m_dot =',round(v2.stages[1].m_dot,4),'[kg/s], F_V =',round(v2.stages[1].F_V,1),'[N]')
+try:
+    v2.stages[1].bt = 100.
+except AttributeError as err:
+    print('Immutable:',err)
+print()
+
+print('Test #3 - Vehicle written to a file and read back')
+path = vh.save(v2, os.path.join(folder, 'variant.json'))
+print('Same vehicle:',vh.load(path) == v2)
+light = json.load(open(path))
+light['stages'][1] = {'M_i': 1400., 'M_f': 200., 'bt': 110., 'ISP_V': 330.}
+light['M_payload'] = 50.
+json.dump(light, open(os.path.join(folder, 'light.json'), 'w'))
+v3 = vh.load(os.path.join(folder, 'light.json'))
+print('Lighter stage #2:',v3.stages[1],'\n')
+
+print('Test #4 - Two vehicles flown in the same process')
+for v in (vh.VEHICLE, v2, v3):
+    flight = fl.Flight(fl.ascent(v), t_max=400., y0=d.launch_state(v.stages[0].M_i)).run()
+    hit = flight.hit('burnout #2')
+    print('   Burnout #2 at',round(hit.t,3),'[s] -',round(np.linalg.norm(hit.y[3:6]),3),'[m/s]')
+ref = fl.Flight(fl.ascent(bt_st2=120., ISP_st2_V=320.), t_max=400.).run()
+print('Same as the constants given to ascent:',np.array_equal(ref.y, fl.Flight(fl.ascent(v2), t_max=400.).run().y))
+heavy = vh.update(vh.VEHICLE, M_st1_i=6326.)
+print('Initial mass of a flight with no y0:',fl.Flight(fl.ascent(heavy)).y[6],'[kg] - vehicle:',heavy.stages[0].M_i,'[kg]\n')
+
+#%% Tests that are NOT meant to work
+print('====== Tests that should NOT work ======','\n')
+
+with open(os.path.join(folder, 'bad.json'), 'w') as file:
+    file.write('M_i = 5826')
+with open(os.path.join(folder, 'wrong.json'), 'w') as file:
+    json.dump({'stages': [{'M_i': 1000., 'M_f': 100., 'bt': 50., 'ISP_V': 300., 'thrust': 1e4}]}, file)
+
+testval = [('load', vh.load, (os.path.join(folder, 'bad.json'),)),
+           ('load', vh.load, (os.path.join(folder, 'wrong.json'),)),
+           ('stage', vh.stage, (1000., 2000., 50., 300.)),
+           ('stage', vh.stage, (2000., 1000., 50., 300., 320.)),
+           ('stage', vh.stage, (c.M_st1_i, c.M_st1_f, c.bt_st1, c.ISP_st1_V, c.ISP_st1_SL, c.Pe_st1)),
+           ('update', vh.update, (vh.VEHICLE,)),
+           ('ascent', fl.ascent, (vh.vehicle([vh.VEHICLE.stages[0]]),)),
+           ('thrust', vh.thrust, (vh.VEHICLE.stages[0], -1.))]
+kwargs = [{}, {}, {}, {}, {}, {'Isp_st2': 300.}, {}, {}]
+aux = np.arange(1,len(testval)+1)
+
+for (index,(name, fn, args),kw) in zip(aux,testval,kwargs):
+    print('Test Mistake #',index,' - ','The inputs of ',name,' are ',args,kw,sep='')
+    try:
+        print('The output is',fn(*args, **kw),'\n')
+    except f.FncError as err:
+        print('The error is:',err,'\n')
@@ -0,0 +1,183 @@
+#%% Script information
+# Name: trajectory.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is storing the results of a flight. Every value is
+# kept in a single float64 array with one row per channel (structure of
+# arrays): 8 bytes per value, instead of the 32 bytes or more of a Python
+# float in a list, and each channel is already a contiguous array, ready to
+# be analysed without any conversion.
+#
+# The channels are the time, the state vector (position, velocity and mass,
+# see dynamics.STATE) and the outputs of dynamics.outputs (thrust, drag,
+# lift, Mach, Reynolds and dynamic pressure).
+#
+# The array grows in chunks, like engine.Buffer, and a Trajectory can be
+# used wherever a Buffer is (it is filled by the integrator through append).
+# Not every step has to be stored, which keeps long runs and large ensembles
+# in memory. The recording policies are:
+#   step        every step
+#   nth         one step out of every N (and the last one, see finish)
+#   events      only the events of the flight (see event)
+#   threshold   a step is stored when a channel changed by more than its
+#               threshold since the last step stored (and the last one)
+#
+# The steps stored can also be taken out in blocks (take), to be passed on
+# while the flight goes on (see stream.py), so that only one block is held
+# in memory.
+#
+#%% Packages
+import numpy as np
+import fnc as f
+
+#%% Channels
+
+CHANNELS = ('t', 'x', 'y', 'z', 'vx', 'vy', 'vz', 'm',
+            'thrust', 'drag', 'lift', 'mach', 're', 'q')
+UNITS = ('s', 'm', 'm', 'm', 'm/s', 'm/s', 'm/s', 'kg',
+         'N', 'N', 'N', 'adim', 'adim', 'N/m^2')
+INDEX = {name: i for (i, name) in enumerate(CHANNELS)}
+N_STATE = 7                          # Channels of the state, after t
+POLICIES = ('step', 'nth', 'events', 'threshold')
+
+#%% Trajectory
+
+class Trajectory:
+    # The aim of this class is storing the channels of the steps of a
+    # flight, with a recording policy.
+    # === INPUTS ===
+    # policy [str]      Recording policy: 'step', 'nth', 'events' or
+    #                   'threshold'
+    # every [adim]      N of the policy 'nth'
+    # threshold [dict]  {channel: change} of the policy 'threshold', in the
+    #                   units of each channel
+    # chunk [adim]      Number of steps allocated at once
+    # === ATTRIBUTES ===
+    # data [n_ch x cap] Stored values, one row per channel
+    # n [adim]          Number of steps stored
+    # fn [function]     Outputs of the current phase (see bind)
+
+    def __init__(self, policy='step', every=1, threshold=None, chunk=4096):
+        if policy not in POLICIES:
+            raise f.InputError("Fn: Trajectory. policy must be 'step', 'nth', 'events' or 'threshold'.")
+        if policy == 'nth' and not (isinstance(every, (int, np.integer)) and every >= 1):
+            raise f.RangeError('Fn: Trajectory. every must be an integer greater than 0.')
+        if policy == 'threshold':
+            if not threshold or any(name not in INDEX for name in threshold):
+                raise f.InputError('Fn: Trajectory. threshold must be a dict of {channel: change}.')
+            self.rows = np.array([INDEX[name] for name in threshold])
+            self.delta = np.array([float(threshold[name]) for name in threshold])
+        self.policy = policy
+        self.every = every
+        self.chunk = chunk
+        self.data = np.empty((len(CHANNELS), chunk))
+        self.n = 0
+        self.calls = 0
+        self.fn = None
+        self.pending = None
+        self.ref = None
+
+    def bind(self, fn):
+        # Sets the outputs of the steps that follow, fn(t, y) -> thrust,
+        # drag, lift, Mach, Reynolds and q (see dynamics.outputs). Without
+        # it, the outputs are stored as NaN.
+        self.fn = fn
+
+    def grow(self):
+        # Makes room for more steps (see engine.Buffer.grow).
+        cap = self.data.shape[1]
+        data = np.empty((len(CHANNELS), cap + max(self.chunk, cap//2)))
+        data[:,:cap] = self.data[:,:cap]
+        self.data = data
+
+    def row(self, t, y):
+        # All the channels of the step (t, y).
+        r = np.empty(len(CHANNELS))
+        r[0] = t
+        r[1:N_STATE+1] = y
+        r[N_STATE+1:] = np.nan if self.fn is None else self.fn(t, y)
+        return r
+
+    def store(self, r):
+        # Stores the channels r as the next step.
+        if self.n == self.data.shape[1]:
+            self.grow()
+        self.data[:,self.n] = r
+        self.n += 1
+        self.pending = None
+        self.ref = r
+
+    def append(self, t, y):
+        # The aim of this method is to receive a step of the integrator and
+        # to store it or not, according to the policy.
+        self.calls += 1
+        if self.policy == 'step':
+            self.store(self.row(t, y))
+        elif self.policy == 'nth':
+            if (self.calls - 1) % self.every == 0:
+                self.store(self.row(t, y))
+            else:
+                self.pending = (t, np.array(y, dtype=float))
+        elif self.policy == 'threshold':
+            r = self.row(t, y)
+            if self.ref is None or np.any(np.abs(r[self.rows] - self.ref[self.rows]) > self.delta):
+                self.store(r)
+            else:
+                self.pending = r
+
+    def event(self, hit):
+        # The aim of this method is to receive an event of the flight
+        # (engine.Hit), which is stored with the policy 'events'. The events
+        # are not steps, so the other policies skip them.
+        if self.policy == 'events':
+            self.store(self.row(hit.t, hit.y))
+
+    def finish(self):
+        # The aim of this method is to store the last step received, if the
+        # policy skipped it, at the end of a run.
+        if self.pending is not None:
+            r = self.pending
+            self.store(self.row(*r) if isinstance(r, tuple) else r)
+
+    def take(self):
+        # The aim of this method is to take out the steps stored so far, as
+        # a block (n_ch x n array, a copy), and to empty the trajectory. The
+        # memory allocated is kept for the steps that follow.
+        block = self.data[:,:self.n].copy()
+        self.n = 0
+        return block
+
+    def compact(self):
+        # Releases the memory allocated beyond the stored steps.
+        self.data = self.data[:,:self.n].copy()
+
+    @property
+    def t(self):
+        return self.data[0,:self.n]
+
+    @property
+    def y(self):
+        # State at each step, one row per variable (view)
+        return self.data[1:N_STATE+1,:self.n]
+
+    @property
+    def position(self):
+        return self.data[1:4,:self.n]
+
+    @property
+    def velocity(self):
+        return self.data[4:7,:self.n]
+
+    def __getitem__(self, name):
+        # Time history of the channel name, as a contiguous array (view).
+        return self.data[INDEX[name],:self.n]
+
+    def __len__(self):
+        return self.n
+
+    def last(self):
+        # Time and state of the last step stored (copy).
+        return self.data[0,self.n-1], self.data[1:N_STATE+1,self.n-1].copy()
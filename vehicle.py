@@ -0,0 +1,211 @@
+#%% Script information
+# Name: vehicle.py
+# Authors: Trajectory Team (Matias Pellegrini, Pablo Lobo)
+# Owner: LIA Aerospace
+#
+#%% Script description
+#
+# The aim of this module is describing a launch vehicle as a value: a
+# Vehicle is a tuple of Stage objects and the constants of the whole
+# vehicle (payload, aerodynamics and guidance). Both are immutable and
+# hashable (named tuples), so several vehicles can be used in the same
+# process, and a vehicle can be a key of a dict or of a cache. A change of
+# a constant gives a new vehicle (see update), it never changes the one in
+# use.
+#
+# The quantities that follow from the constants (propellant mass, mass
+# flow, thrust at SL and in vacuum, exit area of the nozzle) are computed
+# once, when the stage is built. The exit area comes from the two ISPs:
+# the thrust drops from vacuum to SL by Ae*P_SL, i.e.
+#   Ae = m_dot*g0*(ISP_V - ISP_SL)/P_SL
+# and it is 0 for a stage with a single ISP (vacuum engine), unless it is
+# given. Pe is the pressure at the exit of the nozzle, and the exhaust
+# velocity follows from it: F_V = m_dot*Ve + Pe*Ae, so Pe*Ae must be less
+# than F_V.
+#
+# A stage can also have a throttle table (profile, see propulsion.py), the
+# mass flow over its nominal value as a function of the time since
+# ignition. m_dot, F_SL and F_V are then the ones at a throttle of 1.
+#
+# VEHICLE is the vehicle of c.py. Vehicles can also be written to and read
+# from JSON files (save, load).
+#
+#%% Packages
+import json
+from collections import namedtuple
+import numpy as np
+import c
+import fnc as f
+import propulsion as pr
+
+#%% Constants
+
+P_SL = 101325.                   # [N/m^2] - Pressure at SL (ISP_SL reference)
+
+# Constants given, and the ones computed from them
+Stage = namedtuple('Stage', 'M_i M_f bt ISP_SL ISP_V Pe M_prop m_dot F_SL F_V Ae Ve profile',
+                   defaults=(None,))
+Vehicle = namedtuple('Vehicle', 'stages M_payload D_ref A_ref Cd t_kick kick azimuth pitch')
+
+#%% Stages
+
+def stage(M_i, M_f, bt, ISP_V, ISP_SL=None, Pe=0., m_dot=None, Ae=None, profile=None):
+    # The aim of this function is to build a stage, with the quantities
+    # that follow from its constants.
+    # === INPUTS ===
+    # M_i [kg]          Initial mass (with the upper stages)
+    # M_f [kg]          Final mass (with the upper stages)
+    # bt [s]            Burning time
+    # ISP_V [s]         ISP in vacuum
+    # ISP_SL [s]        ISP at SL (ISP_V if None)
+    # Pe [N/m^2]        Pressure at the exit of the nozzle
+    # m_dot [kg/s]      Mass flow ((M_i - M_f)/bt if None)
+    # Ae [m^2]          Exit area of the nozzle (from the ISPs if None)
+    # profile [tuple]   Throttle table, (times [s], throttles [adim]) (None
+    #                   for a throttle of 1, see propulsion.profile)
+    # === OUTPUTS ===
+    # stage [Stage]     Stage, with:
+    #                   M_prop [kg]    Propellant mass
+    #                   F_SL, F_V [N]  Thrust at SL and in vacuum
+    #                   Ve [m/s]       Exhaust velocity that gives, with Pe
+    #                                  and Ae, the thrust of the ISPs (see
+    #                                  fnc.thrust)
+    M_i, M_f, bt, ISP_V = float(M_i), float(M_f), float(bt), float(ISP_V)
+    ISP_SL = ISP_V if ISP_SL is None else float(ISP_SL)
+    if not (M_i > M_f > 0 and bt > 0):
+        raise f.RangeError('Fn: stage. M_i must be greater than M_f, and M_f and bt greater than 0.')
+    if ISP_SL > ISP_V:
+        raise f.RangeError('Fn: stage. ISP_SL must not be greater than ISP_V.')
+    M_prop = M_i - M_f
+    m_dot = M_prop/bt if m_dot is None else float(m_dot)
+    F_V = m_dot*c.g0*ISP_V
+    F_SL = m_dot*c.g0*ISP_SL
+    Ae = (F_V - F_SL)/P_SL if Ae is None else float(Ae)
+    Pe = float(Pe)
+    if Pe*Ae >= F_V:
+        raise f.RangeError('Fn: stage. Pe*Ae must be less than F_V (Pe is the pressure at the exit of the nozzle).')
+    Ve = (F_V - Pe*Ae)/m_dot
+    if profile is not None:
+        profile = pr.profile(*profile, fn='stage')
+    return Stage(M_i, M_f, bt, ISP_SL, ISP_V, Pe, M_prop, m_dot, F_SL, F_V, Ae, Ve, profile)
+
+def thrust(st, Po, checked=None):
+    # The aim of this function is to obtain the thrust of a stage at the
+    # ambient pressure Po (value or array), with fnc.thrust, at a throttle
+    # of 1 (see propulsion.Engine for the profile).
+    # === INPUTS ===
+    # st [Stage]        Stage
+    # Po [N/m^2]        Pressure outside the nozzle
+    # === OUTPUTS ===
+    # thrust [N]
+    return f.thrust(st.m_dot, st.Ve, st.Pe, Po, st.Ae, checked)
+
+#%% Vehicles
+
+def vehicle(stages, M_payload=0., D_ref=c.D_ref, Cd=c.Cd, t_kick=c.t_kick,
+            kick=c.kick, azimuth=c.azimuth_0, pitch=0.):
+    # The aim of this function is to build a vehicle.
+    # === INPUTS ===
+    # stages [list]     Stages, from the first one (Stage, or dict of the
+    #                   inputs of stage)
+    # M_payload [kg]    Payload mass
+    # D_ref [m]         Reference diameter (the reference area follows)
+    # Cd [adim]         Drag coefficient
+    # t_kick [s]        Time of the pitch kick
+    # kick [deg]        Pitch kick angle
+    # azimuth [deg]     Launch azimuth (from North)
+    # pitch [deg]       Pitch of the thrust over the velocity, last stage
+    # === OUTPUTS ===
+    # vehicle [Vehicle]
+    stages = tuple(st if isinstance(st, Stage) else stage(**st) for st in stages)
+    if not stages:
+        raise f.InputError('Fn: vehicle. A vehicle must have at least one stage.')
+    return Vehicle(stages, float(M_payload), float(D_ref), float(np.pi*D_ref**2/4), float(Cd),
+                   float(t_kick), float(kick), float(azimuth), float(pitch))
+
+# Vehicle of c.py. Pe_st1 and Pe_st2 (200 bar) are the pressures of the
+# chambers, not the ones at the exit of the nozzles, so they are not used:
+# the loss of thrust with the ambient pressure is all in Ae (from the two
+# ISPs), and the exhaust velocity is the one of the ISP in vacuum
+VEHICLE = vehicle([stage(c.M_st1_i, c.M_st1_f, c.bt_st1, c.ISP_st1_V, c.ISP_st1_SL, m_dot=c.m_dot_st1),
+                   stage(c.M_st2_i, c.M_st2_f, c.bt_st2, c.ISP_st2_V, None, m_dot=c.m_dot_st2)],
+                  c.M_payload, c.D_ref, c.Cd, c.t_kick, c.kick, c.azimuth_0)
+
+# Names of the constants of Flight.ascent, as (stage, field) of a Vehicle
+# (stage None for the constants of the whole vehicle)
+NAMES = {'M_st1_i': (0, 'M_i'), 'M_st1_f': (0, 'M_f'), 'bt_st1': (0, 'bt'), 'm_dot_st1': (0, 'm_dot'),
+         'ISP_st1_SL': (0, 'ISP_SL'), 'ISP_st1_V': (0, 'ISP_V'), 't_kick': (None, 't_kick'),
+         'M_st2_i': (1, 'M_i'), 'M_st2_f': (1, 'M_f'), 'bt_st2': (1, 'bt'), 'm_dot_st2': (1, 'm_dot'),
+         'ISP_st2_V': (1, 'ISP_V'), 'pitch_st2': (None, 'pitch')}
+
+def update(v, **const):
+    # The aim of this function is to build a vehicle like v with some of
+    # its constants changed, named as in Flight.ascent. As there, the mass
+    # flows follow from the masses and burning times unless they are given
+    # (here or when v was built).
+    # === INPUTS ===
+    # v [Vehicle]       Vehicle
+    # const             New values, e.g. update(VEHICLE, bt_st2=120.)
+    # === OUTPUTS ===
+    # vehicle [Vehicle]
+    if not const:
+        return v
+    stages = []
+    for st in v.stages:
+        base = stage(st.M_i, st.M_f, st.bt, st.ISP_V, st.ISP_SL, st.Pe)
+        stages.append(dict(M_i=st.M_i, M_f=st.M_f, bt=st.bt, ISP_V=st.ISP_V, Pe=st.Pe,
+                           # A single ISP is kept single, and only the mass
+                           # flow and exit area that were given are kept
+                           ISP_SL=None if st.ISP_SL == st.ISP_V else st.ISP_SL,
+                           m_dot=None if st.m_dot == base.m_dot else st.m_dot,
+                           Ae=None if st.Ae == base.Ae else st.Ae, profile=st.profile))
+    other = {}
+    for (name, value) in const.items():
+        if name not in NAMES:
+            raise f.InputError('Fn: update. ' + str(name) + ' is not one of ' + ', '.join(NAMES) + '.')
+        k, field = NAMES[name]
+        if k is None:
+            other[field] = value
+        elif k >= len(stages):
+            raise f.InputError('Fn: update. The vehicle has no stage #' + str(k+1) + '.')
+        else:
+            stages[k][field] = value
+    return v._replace(stages=tuple(stage(**st) for st in stages), **{name: float(x) for (name, x) in other.items()})
+
+#%% Files
+
+def save(v, path):
+    # The aim of this function is to write a vehicle to a JSON file (only
+    # the constants given, the rest are computed again by load).
+    # === INPUTS ===
+    # v [Vehicle]       Vehicle
+    # path [str]        Path of the file
+    data = {'stages': [{'M_i': st.M_i, 'M_f': st.M_f, 'bt': st.bt, 'ISP_V': st.ISP_V, 'ISP_SL': st.ISP_SL,
+                        'Pe': st.Pe, 'm_dot': st.m_dot, 'Ae': st.Ae, 'profile': st.profile}
+                       for st in v.stages],
+            'M_payload': v.M_payload, 'D_ref': v.D_ref, 'Cd': v.Cd, 't_kick': v.t_kick,
+            'kick': v.kick, 'azimuth': v.azimuth, 'pitch': v.pitch}
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=2)
+    return path
+
+def load(path):
+    # The aim of this function is to read a vehicle from a JSON file, with
+    # the inputs of vehicle (and the stages as dicts of the inputs of stage).
+    # === INPUTS ===
+    # path [str]        Path of the file
+    # === OUTPUTS ===
+    # vehicle [Vehicle]
+    try:
+        with open(path) as file:
+            data = json.load(file)
+    except ValueError:
+        raise f.InputError('Fn: load. ' + path + ' is not a JSON file.')
+    if not isinstance(data, dict) or 'stages' not in data:
+        raise f.InputError('Fn: load. ' + path + ' has no stages.')
+    try:
+        return vehicle(**data)
+    except TypeError as err:
+        if isinstance(err, f.FncError):
+            raise
+        raise f.InputError('Fn: load. ' + path + ' is not a vehicle (' + str(err) + ').')